@@ -4,10 +4,70 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+# ETag / Last-Modified of every page fetched, per spider and URL
+VALIDATOR_TABLE = "scrape_validators"
+VALIDATOR_PAGE_SIZE = 1000
+
+
+class NotModified(IgnoreRequest):
+    """A 304: the page has not changed since it was last fetched.
+
+    The request's callback is not called, so nothing is parsed or written.
+    Spiders that still need to note the check handle it in an errback.
+    """
+
+
+class PageValidators:
+    """Validators of the pages a spider parsed, saved once its rows are written.
+
+    The downloader middleware leaves a page's new validators in its meta
+    ("validators") rather than saving them: saved on download, a page
+    whose parse or upsert then failed would be answered with a 304 on
+    every later run and never written. Spiders `add` each page once its
+    rows are batched, call `failed` when an upsert fails and `commit` in
+    closed(), after the final flush. After a failure nothing more is
+    saved, so the run's pages are fetched in full next time.
+    """
+
+    def __init__(self, spider):
+        self.spider = spider
+        self.failures = 0
+        self._pending: dict[str, dict] = {}
+
+    def add(self, response) -> None:
+        entry = response.meta.get("validators")
+        if entry and not self.failures:
+            self._pending[entry["url"]] = {**entry, "spider": self.spider.name}
+
+    def failed(self) -> None:
+        self.failures += 1
+        self._pending = {}
+
+    def commit(self) -> None:
+        pending, self._pending = list(self._pending.values()), {}
+        supabase = getattr(self.spider, "supabase", None)
+        if not pending or supabase is None:
+            return
+        for start in range(0, len(pending), VALIDATOR_PAGE_SIZE):
+            batch = pending[start : start + VALIDATOR_PAGE_SIZE]
+            try:
+                (
+                    supabase.table(VALIDATOR_TABLE)
+                    .upsert(batch, on_conflict="spider,url", returning="minimal")
+                    .execute()
+                )
+            except Exception as e:
+                # Those pages are fetched in full next run; nothing is lost
+                self.spider.logger.warning(
+                    f"Failed to save {len(pending) - start} validators: {e}"
+                )
+                return
+
 
 class LivgolfScraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -57,47 +117,113 @@ class LivgolfScraperSpiderMiddleware:
 
 
 class LivgolfScraperDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+    """Conditional requests from the validators of earlier runs.
+
+    Validators are read from scrape_validators once per spider, on its
+    first request, and pages are requested with If-None-Match /
+    If-Modified-Since. A 304 raises NotModified and is counted in the
+    spider's results as "pages_not_modified"; validators of 200s are
+    handed to the spider's PageValidators through the request's meta.
+    Needs the spider's Supabase client; spiders run with `full` or with
+    the HTTP cache on (see httpcache), and requests with meta
+    "conditional": False, fetch unconditionally.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.enabled = True
+        self.validators: dict[str, dict] | None = None
+        self.not_modified = 0
 
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        s = cls(crawler.stats)
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
         return s
 
     def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
-
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
+        if not self._conditional(request, spider):
+            return None
+        stored = self._load(spider).get(request.url)
+        if stored and stored.get("etag"):
+            request.headers.setdefault("If-None-Match", stored["etag"])
+        if stored and stored.get("last_modified"):
+            request.headers.setdefault("If-Modified-Since", stored["last_modified"])
         return None
 
     def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
-
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
+        if not self._conditional(request, spider) or self.validators is None:
+            return response
+        conditional = request.headers.get("If-None-Match") or request.headers.get(
+            "If-Modified-Since"
+        )
+        if response.status == 304 and conditional:
+            self.not_modified += 1
+            self.stats.inc_value("conditional/not_modified", spider=spider)
+            results = getattr(spider, "results_dict", None)
+            if isinstance(results, dict):
+                results["pages_not_modified"] = self.not_modified
+            raise NotModified(f"Not modified since last fetched: {request.url}")
+        if response.status == 200:
+            self._remember(request, response)
         return response
 
-    def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
-
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
-
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+    def spider_closed(self, spider):
+        if self.not_modified:
+            spider.logger.info(f"{self.not_modified} pages not modified since last run")
+
+    def _conditional(self, request, spider) -> bool:
+        return (
+            self.enabled
+            and request.meta.get("conditional", True)
+            and not getattr(spider, "full", False)
+            and getattr(spider, "supabase", None) is not None
+            # A 304 could not be cached or replayed; the cache stands in
+            and not spider.settings.getbool("HTTPCACHE_ENABLED")
+        )
+
+    def _load(self, spider) -> dict[str, dict]:
+        if self.validators is not None:
+            return self.validators
+        self.validators = {}
+        start = 0
+        try:
+            while True:
+                resp = (
+                    spider.supabase.table(VALIDATOR_TABLE)
+                    .select("url,etag,last_modified")
+                    .eq("spider", spider.name)
+                    # Stable order, or pages can skip or repeat rows
+                    .order("url")
+                    .range(start, start + VALIDATOR_PAGE_SIZE - 1)
+                    .execute()
+                )
+                rows = resp.data or []
+                for r in rows:
+                    self.validators[r["url"]] = r
+                if len(rows) < VALIDATOR_PAGE_SIZE:
+                    break
+                start += VALIDATOR_PAGE_SIZE
+        except Exception as e:
+            spider.logger.warning(f"Failed to load validators; fetching in full: {e}")
+            self.enabled = False
+        return self.validators
+
+    def _remember(self, request, response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": request.url,
+            "etag": etag.decode("latin-1") if etag else None,
+            "last_modified": last_modified.decode("latin-1") if last_modified else None,
+        }
+        if self.validators.get(request.url) != entry:
+            # Saved by the spider once the page's rows are written
+            request.meta["validators"] = entry
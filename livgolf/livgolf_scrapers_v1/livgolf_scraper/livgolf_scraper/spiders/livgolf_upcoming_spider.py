@@ -7,6 +7,11 @@ import logging
 from dotenv import load_dotenv, find_dotenv
 from supabase import create_client, Client
 
+from ..feed_cache import invalidate_feed_cache
+from ..fingerprints import RowFingerprints
+from ..httpcache import CACHE_SCHEDULE_SECS, httpcache_settings, replay_safe
+from ..middlewares import LivgolfScraperDownloaderMiddleware, PageValidators
+
 
 load_dotenv(find_dotenv())
 
@@ -18,6 +23,9 @@ class LivgolfUpcomingSpiderSpider(scrapy.Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS": 4,
+        # Conditional requests, so unchanged pages are not downloaded again
+        "DOWNLOADER_MIDDLEWARES": {LivgolfScraperDownloaderMiddleware: 543},
+        **httpcache_settings(CACHE_SCHEDULE_SECS),
     }
 
     def __init__(self, *args, **kwargs):
@@ -29,6 +37,11 @@ class LivgolfUpcomingSpiderSpider(scrapy.Spider):
         self._batch: list[dict] = []
         self.supabase: Client | None = None
         self.tournaments_processed = 0
+        self.tournaments_changed = 0
+        self.tournaments_unchanged = 0
+        self.fingerprints: RowFingerprints | None = None
+        # Validators of parsed pages, saved once their rows are written
+        self.validators = PageValidators(self)
         self.results_dict = (
             kwargs.get("results_dict", {})
             if isinstance(kwargs.get("results_dict", {}), dict)
@@ -37,6 +50,9 @@ class LivgolfUpcomingSpiderSpider(scrapy.Spider):
 
     def start_requests(self):
         self._init_supabase()
+        self.fingerprints = RowFingerprints(
+            self.supabase, "livgolf_tournaments", ["tournament_id"]
+        )
 
         url = "https://www.livgolf.com/schedule"
 
@@ -97,7 +113,9 @@ class LivgolfUpcomingSpiderSpider(scrapy.Spider):
 
         if self._batch:
             self._flush_batch()
+        self.validators.add(response)
         self.tournaments_processed += emitted
+        self.results_dict["tournaments"] = self.tournaments_processed
         self.logger.info(f"LIV tournaments processed: {emitted}")
 
     # Mapping helpers
@@ -201,7 +219,7 @@ class LivgolfUpcomingSpiderSpider(scrapy.Spider):
             self.supabase = None
             return
         try:
-            self.supabase = create_client(url, key)
+            self.supabase = replay_safe(create_client(url, key))
             self.logger.info("Supabase client initialized for LIV upserts.")
         except Exception as e:
             self.logger.error(f"Failed to init Supabase: {e}")
@@ -217,19 +235,31 @@ class LivgolfUpcomingSpiderSpider(scrapy.Spider):
             self._batch = []
             return
         try:
-            self.logger.info(f"Upserting {len(self._batch)} LIV rows to Supabase")
+            # Tournaments unchanged since the last run are not rewritten
+            changed, unchanged = self.fingerprints.split(self._batch)
+            self.tournaments_changed += len(changed)
+            self.tournaments_unchanged += len(unchanged)
+            self.results_dict["tournaments_changed"] = self.tournaments_changed
+            self.results_dict["tournaments_unchanged"] = self.tournaments_unchanged
+            if not changed:
+                return
+            self.logger.info(
+                f"Upserting {len(changed)} LIV rows to Supabase "
+                f"({len(unchanged)} unchanged)"
+            )
             max_attempts = 3
             for attempt in range(1, max_attempts + 1):
                 try:
                     (
                         self.supabase.table("livgolf_tournaments")
                         .upsert(
-                            self._batch,
+                            changed,
                             on_conflict="tournament_id",
                             returning="minimal",
                         )
                         .execute()
                     )
+                    self.fingerprints.save(changed)
                     break
                 except Exception as up_e:
                     if attempt == max_attempts:
@@ -246,6 +276,7 @@ class LivgolfUpcomingSpiderSpider(scrapy.Spider):
                         pass
         except Exception as e:
             self.logger.error(f"Supabase upsert failed: {e}")
+            self.validators.failed()
         finally:
             self._batch = []
 
@@ -395,11 +426,17 @@ class LivgolfUpcomingSpiderSpider(scrapy.Spider):
                 self._flush_batch()
         except Exception:
             pass
+        self.validators.commit()
         try:
             if isinstance(self.results_dict, dict):
                 self.results_dict["tournaments"] = int(self.tournaments_processed or 0)
+                self.results_dict["tournaments_changed"] = self.tournaments_changed
+                self.results_dict["tournaments_unchanged"] = self.tournaments_unchanged
         except Exception:
             pass
+        # Feed APIs cache tournaments reads until told they changed
+        if self.tournaments_changed:
+            invalidate_feed_cache(self.supabase, "tournaments")
         self.logger.info(
             f"LIV tournaments spider closed: {reason}; processed={self.tournaments_processed}"
         )
@@ -1,14 +1,19 @@
 import os
 import logging
+from datetime import datetime
+from typing import Dict, Optional
 
 # Scrapy/Crochet setup
 os.environ["SCRAPY_SETTINGS_MODULE"] = "livgolf_scraper.livgolf_scraper.settings"
 os.environ["TWISTED_REACTOR"] = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 
-from fastapi import FastAPI, HTTPException, Depends, status, Header
+from fastapi import FastAPI, HTTPException, Depends, Request, status, Header
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from scrapy.crawler import CrawlerRunner
-from crochet import setup, wait_for
+from crochet import setup
+
+from jobs import Job, JobConflict, JobRegistry, Scrape
 
 from livgolf_scraper.livgolf_scraper.spiders.livgolf_upcoming_spider import (
     LivgolfUpcomingSpiderSpider,
@@ -32,19 +37,69 @@ setup()
 app = FastAPI(title="LIV Golf Scrapers API", version="1.0.0")
 
 
-class TournamentsResponse(BaseModel):
+class JobAccepted(BaseModel):
     message: str
-    tournaments_processed: int
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobProgress(BaseModel):
+    rows_processed: int
+    rows_total: Optional[int] = None
+    rate_per_second: float
+    elapsed_seconds: float
+    eta_seconds: Optional[float] = None
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    name: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: JobProgress
+    counts: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
 
 
-spider_results: dict = {}
 runner = CrawlerRunner()
+jobs = JobRegistry(runner)
+
+TOURNAMENTS = Scrape(
+    "livgolf/scrape/tournaments",
+    LivgolfUpcomingSpiderSpider,
+    {
+        "tournaments": "tournaments_processed",
+        "pages_not_modified": "tournaments_not_modified",
+        "tournaments_changed": "tournaments_changed",
+        "tournaments_unchanged": "tournaments_unchanged",
+    },
+    timeout=300.0,
+)
+
 
+def accepted(job: Job, message: str) -> JobAccepted:
+    return JobAccepted(
+        message=message,
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/livgolf/jobs/{job.id}",
+    )
 
-@wait_for(timeout=300.0)
-def run_livgolf_upcoming():
-    kwargs = {"results_dict": spider_results}
-    return runner.crawl(LivgolfUpcomingSpiderSpider, **kwargs)
+
+@app.exception_handler(JobConflict)
+async def job_conflict(request: Request, exc: JobConflict) -> JSONResponse:
+    """409 naming the run in the way, so the caller can poll it instead."""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={
+            "detail": str(exc),
+            "job_id": exc.job.id,
+            "status_url": f"/livgolf/jobs/{exc.job.id}",
+        },
+    )
 
 
 async def authorize_request(x_api_key: str = Header(None)):
@@ -78,25 +133,23 @@ async def startup_event():
 
 
 # This endpoint is used to scrape the upcoming LIV tournaments
-@app.post("/livgolf/scrape/tournaments", response_model=TournamentsResponse)
+@app.post(
+    "/livgolf/scrape/tournaments",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
 # async def scrape_livgolf_tournaments(api_key: str = Depends(authorize_request)):
 async def scrape_livgolf_tournaments():
-    try:
-        logging.info("livgolf/scrape/tournaments started")
-        spider_results["tournaments"] = 0
-        run_livgolf_upcoming()
-        tournaments_processed = int(spider_results.get("tournaments", 0))
-        if "tournaments" in spider_results:
-            del spider_results["tournaments"]
-        logging.info(
-            f"livgolf/scrape/tournaments completed (tournaments_processed={tournaments_processed})"
-        )
-        return TournamentsResponse(
-            message="Tournaments scraped successfully",
-            tournaments_processed=tournaments_processed,
-        )
-    except Exception as e:
-        logging.error(f"Error during LIV tournament scraping: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"LIV tournament scraping failed: {str(e)}"
-        )
+    """Queue a scrape of LIV tournaments"""
+    job = jobs.submit(TOURNAMENTS)
+    return accepted(job, "Tournament scrape accepted")
+
+
+@app.get("/livgolf/jobs/{job_id}", response_model=JobStatusResponse)
+# async def get_job(job_id: str, api_key: str = Depends(authorize_request)):
+async def get_job(job_id: str):
+    """Progress of a scrape job while it runs, and its counts once finished"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.snapshot()
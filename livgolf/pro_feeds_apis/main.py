@@ -1,70 +1,73 @@
 import logging
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException, Query
-from deps import get_supabase_client
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from supabase import AsyncClient
+from conditional import conditional
+from responses import CompressionMiddleware, row_response
+from deps import authorize_request, get_supabase_client, lifespan, sparse_fields
+from services.cache import cache_stats, invalidate
+from services.pagination import CountMode
 from services.tournaments import (
     fetch_tournaments,
     fetch_tournament_by_id,
     fetch_upcoming_ticket_urls,
 )
 from models import (
+    CacheInvalidateRequest,
+    CacheInvalidateResponse,
+    CacheStatsResponse,
     TournamentsFeedResponse,
     TournamentModel,
-    CourseModel,
     TicketUrlResponse,
-    TicketUrlItem,
+    ticket_row,
+    tournament_row,
 )
 
-app = FastAPI(title="LIV Golf Feeds API", version="1.0.0")
+app = FastAPI(title="LIV Golf Feeds API", version="1.0.0", lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
 
 
 # This endpoint is used to get the LIV tournaments from the database
 @app.get("/livgolf/tournaments", response_model=TournamentsFeedResponse)
 async def get_livgolf_tournaments(
+    request: Request,
+    response: Response,
     year: int = Query(description="Tournament year (e.g., 2025)"),
     status_filter: Optional[str] = Query(
         default=None, alias="status", description="UPCOMING|COMPLETED|IN_PROGRESS"
     ),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(tournament_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
 ):
     try:
-        sb = get_supabase_client()
-        rows, total = fetch_tournaments(sb, year, status_filter, page, page_size)
-
-        tournaments: list[TournamentModel] = []
-        for r in rows:
-            tournaments.append(
-                TournamentModel(
-                    id=str(r.get("id") or r.get("tournament_id")),
-                    name=r.get("tournament_name", ""),
-                    year=(int(r["year"]) if r.get("year") is not None else None),
-                    start_date=r.get("start_date"),
-                    end_date=r.get("end_date"),
-                    status=r.get("status"),
-                    tournament_url=r.get("tournament_url"),
-                    ticket_url=r.get("ticket_url"),
-                    course=CourseModel(
-                        name=r.get("course_name"),
-                        address=r.get("address"),
-                        city=r.get("city"),
-                        country=r.get("country"),
-                        zipcode=r.get("zipcode"),
-                    ),
-                )
-            )
-
-        has_more = False
-        if total is not None:
-            has_more = (page * page_size) < total
-        else:
-            has_more = len(rows) == page_size
+        result = await fetch_tournaments(
+            sb,
+            year,
+            status_filter,
+            page,
+            page_size,
+            count,
+            tournament_row.columns_for(fields),
+        )
+        not_modified = conditional(request, response, fields, result)
+        if not_modified:
+            return not_modified
 
-        return TournamentsFeedResponse(
-            tournaments=tournaments,
-            page=page,
-            page_size=page_size,
-            has_more=has_more,
+        map_row = tournament_row.only(fields)
+        return row_response(
+            {
+                "tournaments": [map_row(r) for r in result.rows],
+                "page": page,
+                "page_size": page_size,
+                "has_more": result.has_more,
+                "total": result.total,
+            },
+            response,
         )
     except Exception as e:
         logging.error(f"Error fetching LIV tournaments: {e}", exc_info=True)
@@ -73,30 +76,22 @@ async def get_livgolf_tournaments(
 
 # Get tournament by id
 @app.get("/livgolf/tournaments/{tournament_id}", response_model=TournamentModel)
-async def get_tournament(tournament_id: str):
+async def get_tournament(
+    tournament_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[List[str]] = Depends(sparse_fields(tournament_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+):
     try:
-        sb = get_supabase_client()
-        r = fetch_tournament_by_id(sb, tournament_id)
+        r = await fetch_tournament_by_id(sb, tournament_id)
         if not r:
             raise HTTPException(status_code=404, detail="Not found")
+        not_modified = conditional(request, response, fields, r)
+        if not_modified:
+            return not_modified
 
-        return TournamentModel(
-            id=str(r.get("id") or r.get("tournament_id")),
-            name=r.get("tournament_name", ""),
-            year=(int(r["year"]) if r.get("year") is not None else None),
-            start_date=r.get("start_date"),
-            end_date=r.get("end_date"),
-            status=r.get("status"),
-            tournament_url=r.get("tournament_url"),
-            ticket_url=r.get("ticket_url"),
-            course=CourseModel(
-                name=r.get("course_name"),
-                address=r.get("address"),
-                city=r.get("city"),
-                country=r.get("country"),
-                zipcode=r.get("zipcode"),
-            ),
-        )
+        return row_response(tournament_row.only(fields)(r), response)
     except HTTPException:
         raise
     except Exception as e:
@@ -109,36 +104,53 @@ async def get_tournament(tournament_id: str):
 # Get ticket URLs for upcoming tournaments
 @app.get("/livgolf/tickets", response_model=TicketUrlResponse)
 async def get_ticket_urls(
+    request: Request,
+    response: Response,
     year: int = Query(description="Tournament year (e.g., 2025)"),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(ticket_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
 ):
     try:
-        sb = get_supabase_client()
-        rows, total = fetch_upcoming_ticket_urls(sb, year, page, page_size)
-
-        ticket_urls: List[TicketUrlItem] = []
-        for r in rows:
-            ticket_urls.append(
-                TicketUrlItem(
-                    tournament_id=r.get("tournament_id"),
-                    tournament_name=r.get("tournament_name", ""),
-                    year=(int(r["year"]) if r.get("year") is not None else None),
-                    start_date=(r.get("start_date") or None),
-                    end_date=(r.get("end_date") or None),
-                    ticket_url=r.get("ticket_url"),
-                )
-            )
-
-        # Determine has_more
-        if total is not None:
-            has_more = (page * page_size) < total
-        else:
-            has_more = len(rows) == page_size
+        result = await fetch_upcoming_ticket_urls(
+            sb, year, page, page_size, count, ticket_row.columns_for(fields)
+        )
+        not_modified = conditional(request, response, fields, result)
+        if not_modified:
+            return not_modified
 
-        return TicketUrlResponse(
-            tickets=ticket_urls, page=page, page_size=page_size, has_more=has_more
+        map_row = ticket_row.only(fields)
+        return row_response(
+            {
+                "tickets": [map_row(r) for r in result.rows],
+                "page": page,
+                "page_size": page_size,
+                "has_more": result.has_more,
+                "total": result.total,
+            },
+            response,
         )
     except Exception as e:
         logging.error(f"Error fetching LIV ticket URLs: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch LIV ticket URLs")
+
+
+# Drop cached tournament reads; called by the scraper from closed()
+@app.post("/livgolf/cache/invalidate", response_model=CacheInvalidateResponse)
+async def invalidate_cache(
+    body: CacheInvalidateRequest = CacheInvalidateRequest(),
+    _: None = Depends(authorize_request),
+):
+    return CacheInvalidateResponse(invalidated=invalidate(body.entities))
+
+
+# Cache sizes and hit/miss counters
+@app.get("/livgolf/cache/stats", response_model=CacheStatsResponse)
+async def get_cache_stats(
+    _: None = Depends(authorize_request),
+):
+    return CacheStatsResponse(caches=cache_stats())
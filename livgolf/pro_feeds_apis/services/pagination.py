@@ -0,0 +1,54 @@
+import re
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Sequence
+
+from postgrest.exceptions import APIError
+
+
+CountMode = Literal["exact", "planned", "estimated", "none"]
+
+# PostgREST answers 416 with this code when the offset is past the last row
+RANGE_NOT_SATISFIABLE = "PGRST103"
+_TOTAL_FROM_DETAILS = re.compile(r"only (\d+) rows")
+
+
+class Page(NamedTuple):
+    rows: List[Dict[str, Any]]
+    total: Optional[int]
+    has_more: bool
+
+
+def count_method(count: CountMode) -> Optional[str]:
+    """Map the public count mode to PostgREST's Prefer: count=... value."""
+    return None if count == "none" else count
+
+
+def select_columns(
+    columns: Optional[Sequence[str]], default: str, keys: Sequence[str] = ()
+) -> str:
+    """PostgREST select for a sparse fieldset, or `default` without one.
+
+    `keys` are added because paging (cursors, versions) reads them even
+    when the client did not ask for them.
+    """
+    if not columns:
+        return default
+    return ",".join(dict.fromkeys([*columns, *keys]))
+
+
+async def fetch_page(query, page: int, page_size: int) -> Page:
+    """Fetch one page of `query` (rows and count) in a single round trip.
+
+    One extra row is requested so has_more is known without relying on the
+    count, which may be estimated or skipped entirely.
+    """
+    start = (page - 1) * page_size
+    try:
+        resp = await query.range(start, start + page_size).execute()
+    except APIError as e:
+        if e.code != RANGE_NOT_SATISFIABLE:
+            raise
+        match = _TOTAL_FROM_DETAILS.search(e.details or "")
+        return Page([], int(match.group(1)) if match else None, False)
+
+    rows: List[Dict[str, Any]] = resp.data or []
+    return Page(rows[:page_size], getattr(resp, "count", None), len(rows) > page_size)
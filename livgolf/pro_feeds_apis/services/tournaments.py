@@ -1,6 +1,16 @@
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import date
+from typing import Any, Dict, List, Optional
 
-from supabase import Client
+from supabase import AsyncClient
+
+from services.cache import cached
+from services.pagination import (
+    CountMode,
+    Page,
+    count_method,
+    fetch_page,
+    select_columns,
+)
 
 
 SELECT_FIELDS = (
@@ -9,26 +19,67 @@ SELECT_FIELDS = (
 )
 
 
-def fetch_tournaments(
-    sb: Client, year: Optional[int], page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+async def fetch_tournaments(
+    sb: AsyncClient,
+    year: Optional[int],
+    status_filter: Optional[str],
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    columns: Optional[List[str]] = None,
+) -> Page:
+    """One page of tournaments; only `columns` when given."""
     base = (
         sb.table("livgolf_tournaments")
-        .select(SELECT_FIELDS, count="exact")
+        .select(select_columns(columns, SELECT_FIELDS), count=count_method(count))
         .order("start_date", desc=False)
     )
     if year is not None:
         base = base.eq("year", year)
+    if status_filter:
+        base = base.eq("status", status_filter)
+
+    return await fetch_page(base, page, page_size)
+
+
+@cached("tournaments")
+async def fetch_tournament_by_id(
+    sb: AsyncClient, tournament_id: str
+) -> Optional[Dict[str, Any]]:
+    resp = await (
+        sb.table("livgolf_tournaments")
+        .select(SELECT_FIELDS)
+        .eq("tournament_id", tournament_id)
+        .limit(1)
+        .execute()
+    )
+    rows: List[Dict[str, Any]] = resp.data or []
+    return rows[0] if rows else None
+
 
-    start = (page - 1) * page_size
-    end = start + page_size - 1
+TICKET_URL_SELECT_FIELDS = (
+    "tournament_id,tournament_name,year,start_date,end_date,ticket_url,status"
+)
 
-    count_resp = base.range(0, 0).execute()
-    total_count: Optional[int] = getattr(count_resp, "count", None)
-    if total_count is not None and start >= total_count:
-        return [], total_count
 
-    resp = base.range(start, end).execute()
-    return resp.data or [], (
-        total_count if total_count is not None else getattr(resp, "count", None)
+async def fetch_upcoming_ticket_urls(
+    sb: AsyncClient,
+    year: int,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    columns: Optional[List[str]] = None,
+) -> Page:
+    base_query = (
+        sb.table("livgolf_tournaments")
+        .select(
+            select_columns(columns, TICKET_URL_SELECT_FIELDS),
+            count=count_method(count),
+        )
+        .eq("year", year)
+        .gte("end_date", date.today().isoformat())
+        .not_.is_("ticket_url", "null")
+        .order("start_date", desc=False)
     )
+
+    return await fetch_page(base_query, page, page_size)
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+
+class FakeQuery:
+    """Records a PostgREST builder chain and answers it with canned rows."""
+
+    def __init__(
+        self,
+        rows: Optional[List[Dict[str, Any]]] = None,
+        count: Optional[int] = None,
+        error: Optional[Exception] = None,
+    ):
+        self.rows = rows or []
+        self.count = count
+        self.error = error
+        self.calls: List[tuple] = []
+
+    def __getattr__(self, name: str):
+        def call(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+
+        return call
+
+    @property
+    def not_(self):
+        return self
+
+    def called(self, name: str) -> List[tuple]:
+        return [c[1:] for c in self.calls if c[0] == name]
+
+    async def execute(self):
+        if self.error is not None:
+            raise self.error
+        limit = None
+        for name, *args in self.calls:
+            if name == "range":
+                limit = args[1] - args[0] + 1
+            elif name == "limit":
+                limit = args[0]
+        rows = self.rows if limit is None else self.rows[:limit]
+        return SimpleNamespace(data=rows, count=self.count)
+
+
+class FakeClient:
+    """Supabase client whose tables answer from `tables` or raise from `errors`."""
+
+    def __init__(
+        self,
+        tables: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        errors: Optional[Dict[str, Exception]] = None,
+    ):
+        self.tables = tables or {}
+        self.errors = errors or {}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self.tables.get(name, []), error=self.errors.get(name))
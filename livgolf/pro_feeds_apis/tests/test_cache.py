@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from services import cache
+from services.cache import CACHES, TTLCache, cached
+from tests.fakes import FakeClient
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    for c in CACHES.values():
+        c.clear()
+    monkeypatch.setattr(cache, "_versions", None)
+    monkeypatch.setattr(cache, "_checked_at", float("-inf"))
+    monkeypatch.setattr(cache, "CACHE_VERSION_CHECK_SECS", 0)
+    yield
+    for c in CACHES.values():
+        c.clear()
+
+
+def make_fetcher(calls):
+    @cached("tournaments")
+    async def fetch_tournament(sb, tournament_id):
+        calls.append(tournament_id)
+        return {"id": tournament_id} if tournament_id != "missing" else None
+
+    return fetch_tournament
+
+
+def test_cached_serves_repeat_calls_and_skips_none():
+    calls = []
+    fetch_tournament = make_fetcher(calls)
+    sb = FakeClient()
+
+    async def run():
+        for tournament_id in ("T1", "T1", "missing", "missing"):
+            await fetch_tournament(sb, tournament_id)
+
+    asyncio.run(run())
+    assert calls == ["T1", "missing", "missing"]
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl = TTLCache("test", ttl=10)
+    ttl.set("k", "v")
+    now[0] = 109.0
+    assert ttl.get("k") == "v"
+    now[0] = 111.0
+    assert ttl.get("k", None) is None
+
+
+def test_version_stamps_drop_the_cache_only_when_they_change():
+    calls = []
+    fetch_tournament = make_fetcher(calls)
+    stamps = [{"entity": "tournaments", "changed_at": "t1"}]
+    sb = FakeClient({"feed_cache_versions": stamps})
+
+    async def run():
+        await fetch_tournament(sb, "T1")
+        await fetch_tournament(sb, "T1")
+        stamps[0] = {"entity": "tournaments", "changed_at": "t2"}
+        await fetch_tournament(sb, "T1")
+        await fetch_tournament(sb, "T1")
+
+    asyncio.run(run())
+    assert calls == ["T1", "T1"]
+
+
+def test_unreadable_versions_leave_the_cache_to_its_ttl():
+    calls = []
+    fetch_tournament = make_fetcher(calls)
+    sb = FakeClient(errors={"feed_cache_versions": RuntimeError("down")})
+
+    async def run():
+        await fetch_tournament(sb, "T1")
+        await fetch_tournament(sb, "T1")
+
+    asyncio.run(run())
+    assert calls == ["T1"]
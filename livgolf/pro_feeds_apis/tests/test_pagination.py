@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from postgrest.exceptions import APIError
+
+from services.pagination import fetch_page, select_columns
+from tests.fakes import FakeQuery
+
+
+def rows(n):
+    return [{"player_id": 100 + i} for i in range(n)]
+
+
+def test_fetch_page_requests_one_extra_row():
+    query = FakeQuery(rows(11), count=40)
+    page = asyncio.run(fetch_page(query, 2, 10))
+    assert query.called("range") == [(10, 20)]
+    assert len(page.rows) == 10
+    assert page.has_more
+    assert page.total == 40
+
+
+def test_fetch_page_last_page_has_no_more():
+    page = asyncio.run(fetch_page(FakeQuery(rows(4), count=14), 2, 10))
+    assert len(page.rows) == 4
+    assert not page.has_more
+
+
+def test_fetch_page_past_the_end_returns_empty_page_with_total():
+    error = APIError(
+        {
+            "code": "PGRST103",
+            "message": "Requested range not satisfiable",
+            "details": "An offset of 40 was requested, but there are only 12 rows.",
+        }
+    )
+    page = asyncio.run(fetch_page(FakeQuery(error=error), 5, 10))
+    assert page.rows == []
+    assert page.total == 12
+    assert not page.has_more
+
+
+def test_fetch_page_reraises_other_errors():
+    error = APIError({"code": "42703", "message": "column does not exist"})
+    with pytest.raises(APIError):
+        asyncio.run(fetch_page(FakeQuery(error=error), 1, 10))
+
+
+def test_select_columns_adds_keys_only_to_sparse_selects():
+    assert select_columns(None, "a,b") == "a,b"
+    assert select_columns(["b"], "a,b", ("player_id",)) == "b,player_id"
+    assert select_columns(["player_id", "b"], "a,b", ("player_id",)) == "player_id,b"
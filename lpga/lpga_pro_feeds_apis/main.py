@@ -1,308 +1,391 @@
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Union
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 
-from deps import authorize_request, get_supabase_client
+from supabase import AsyncClient
+
+from conditional import conditional
+from responses import CompressionMiddleware, row_response, stream_response
+from deps import (
+    authorize_request,
+    batch_ids,
+    get_supabase_client,
+    lifespan,
+    sparse_fields,
+)
 from models import (
-    CourseInfo,
+    CacheInvalidateRequest,
+    CacheInvalidateResponse,
+    CacheStatsResponse,
     TournamentOut,
     TournamentsResponse,
     LeaderboardResponse,
-    LeaderboardRow,
+    LeaderboardFullResponse,
+    LeaderboardDeltaResponse,
     PlayersResponse,
-    PlayerListItem,
+    PlayersBatchResponse,
     PlayerProfile,
-    PlayerTournamentRow,
     TicketUrlResponse,
-    TicketUrlItem,
+    leaderboard_row,
+    player_list_row,
+    player_profile_row,
+    ticket_row,
+    tournament_row,
 )
 from services.tournaments import (
     fetch_tournaments,
     fetch_tournament_by_id,
     fetch_upcoming_ticket_urls,
 )
-from services.leaderboards import fetch_leaderboard_rows, fetch_tournament_header
+from services.leaderboards import (
+    fetch_full_leaderboard,
+    fetch_leaderboard,
+    fetch_leaderboard_changes,
+    latest_version,
+)
+from services.cache import cache_stats, invalidate
+from services.pagination import CountMode, InvalidCursor
 from services.players import (
     fetch_players,
     fetch_player_profile,
+    fetch_player_profiles,
     fetch_player_tournaments,
+    fetch_players_tournaments,
 )
 
 
-app = FastAPI(title="LPGA Feeds API", version="1.0.0")
+app = FastAPI(title="LPGA Feeds API", version="1.0.0", lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
 
 
 @app.get("/lpga/tournaments", response_model=TournamentsResponse)
 async def list_tournaments(
+    request: Request,
+    response: Response,
     year: int = Query(description="Tournament year (e.g., 2025)"),
     status_filter: Optional[str] = Query(
         default=None, alias="status", description="UPCOMING|COMPLETED"
     ),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(tournament_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
-    rows, total = fetch_tournaments(sb, year, status_filter, page, page_size)
-
-    tournaments: List[TournamentOut] = []
-    for r in rows:
-        tournaments.append(
-            TournamentOut(
-                id=r.get("tournament_id"),
-                name=r.get("name", ""),
-                year=(int(r["year"]) if r.get("year") is not None else None),
-                month=r.get("month"),
-                date_range=r.get("date_range"),
-                start_date=r.get("start_date"),
-                end_date=r.get("end_date"),
-                purse_text=r.get("purse_text"),
-                purse_amount=(
-                    float(r["purse_amount"])
-                    if r.get("purse_amount") is not None
-                    else None
-                ),
-                points=(int(r["points"]) if r.get("points") is not None else None),
-                status=("COMPLETE" if r.get("is_complete") else "UPCOMING"),
-                winners=r.get("winners"),
-                tournament_url=r.get("tournament_url"),
-                tournament_logo=r.get("tournament_logo"),
-                ticket_url=r.get("ticket_url"),
-                course=CourseInfo(name=r.get("course"), location=r.get("location")),
-            )
-        )
-
-    has_more = False
-    if total is not None:
-        has_more = (page * page_size) < total
-    else:
-        has_more = len(rows) == page_size
+    result = await fetch_tournaments(
+        sb,
+        year,
+        status_filter,
+        page,
+        page_size,
+        count,
+        tournament_row.columns_for(fields),
+    )
+    not_modified = conditional(request, response, fields, result)
+    if not_modified:
+        return not_modified
 
-    return TournamentsResponse(
-        tournaments=tournaments, page=page, page_size=page_size, has_more=has_more
+    map_row = tournament_row.only(fields)
+    return row_response(
+        {
+            "tournaments": [map_row(r) for r in result.rows],
+            "page": page,
+            "page_size": page_size,
+            "has_more": result.has_more,
+            "total": result.total,
+        },
+        response,
     )
 
 
 @app.get("/lpga/tournaments/{tournament_id}", response_model=TournamentOut)
-# async def get_tournament(tournament_id: str, _: None = Depends(authorize_request)):
-async def get_tournament(tournament_id: str):
-    sb = get_supabase_client()
-    r = fetch_tournament_by_id(sb, tournament_id)
+async def get_tournament(
+    tournament_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[List[str]] = Depends(sparse_fields(tournament_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    r = await fetch_tournament_by_id(sb, tournament_id)
     if not r:
         raise HTTPException(status_code=404, detail="Not found")
-    return TournamentOut(
-        id=r.get("tournament_id"),
-        name=r.get("name", ""),
-        year=(int(r["year"]) if r.get("year") is not None else None),
-        month=r.get("month"),
-        date_range=r.get("date_range"),
-        start_date=r.get("start_date"),
-        end_date=r.get("end_date"),
-        purse_text=r.get("purse_text"),
-        purse_amount=(
-            float(r["purse_amount"]) if r.get("purse_amount") is not None else None
-        ),
-        points=(int(r["points"]) if r.get("points") is not None else None),
-        status=("COMPLETE" if r.get("is_complete") else "UPCOMING"),
-        winners=r.get("winners"),
-        tournament_url=r.get("tournament_url"),
-        tournament_logo=r.get("tournament_logo"),
-        ticket_url=r.get("ticket_url"),
-        course=CourseInfo(name=r.get("course"), location=r.get("location")),
-    )
+    not_modified = conditional(request, response, fields, r)
+    if not_modified:
+        return not_modified
+
+    return row_response(tournament_row.only(fields)(r), response)
 
 
 @app.get(
-    "/lpga/tournaments/{tournament_id}/leaderboard", response_model=LeaderboardResponse
+    "/lpga/tournaments/{tournament_id}/leaderboard",
+    response_model=Union[LeaderboardResponse, LeaderboardDeltaResponse],
 )
 async def get_leaderboard(
     tournament_id: str,
+    request: Request,
+    response: Response,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    since_version: Optional[int] = Query(
+        default=None,
+        ge=0,
+        description="Return only rows changed after this version (see `version`)",
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(leaderboard_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
+    columns = leaderboard_row.columns_for(fields)
+    map_row = leaderboard_row.only(fields)
+    if since_version is not None:
+        delta = await fetch_leaderboard_changes(
+            sb, tournament_id, since_version, columns
+        )
+        if not delta:
+            raise HTTPException(status_code=404, detail="Not found")
+        header, rows, removals = delta
+        not_modified = conditional(request, response, fields, header, rows, removals)
+        if not_modified:
+            return not_modified
+
+        return row_response(
+            {
+                "tournament_id": header.get("tournament_id"),
+                "since_version": since_version,
+                "version": latest_version(rows + removals, since_version),
+                "changed": [map_row(r) for r in rows],
+                "removed": [r["player_id"] for r in removals],
+            },
+            response,
+        )
 
-    header = fetch_tournament_header(sb, tournament_id)
-    if not header:
+    lb = await fetch_leaderboard(sb, tournament_id, page, page_size, count, columns)
+    if not lb:
         raise HTTPException(status_code=404, detail="Not found")
+    header, result = lb
+    not_modified = conditional(request, response, fields, header, result)
+    if not_modified:
+        return not_modified
 
-    rows, total = fetch_leaderboard_rows(sb, tournament_id, page, page_size)
-    leaderboard = [
-        LeaderboardRow(
-            player_id=int(r.get("player_id")),
-            first_name=r.get("first_name"),
-            last_name=r.get("last_name"),
-            position=r.get("position"),
-            to_par=r.get("to_par"),
-            r1=r.get("r1"),
-            r2=r.get("r2"),
-            r3=r.get("r3"),
-            r4=r.get("r4"),
-            strokes=r.get("strokes"),
-            points=(float(r["points"]) if r.get("points") is not None else None),
-            prize_money=r.get("prize_money"),
-            country_flag=r.get("country_abbr"),
-            player_url=r.get("player_url"),
-        )
-        for r in rows
-    ]
-
-    has_more = False
-    if total is not None:
-        has_more = (page * page_size) < total
-    else:
-        has_more = len(rows) == page_size
-
-    return LeaderboardResponse(
-        tournament_id=header.get("tournament_id"),
-        tournament_name=header.get("name", ""),
-        start_date=header.get("start_date"),
-        end_date=header.get("end_date"),
-        status=("COMPLETE" if header.get("is_complete") else "UPCOMING"),
-        year=int(header["year"]) if header.get("year") is not None else None,
-        leaderboard=leaderboard,
-        page=page,
-        page_size=page_size,
-        has_more=has_more,
+    return row_response(
+        {
+            "tournament_id": header.get("tournament_id"),
+            "tournament_name": header.get("name", ""),
+            "start_date": header.get("start_date"),
+            "end_date": header.get("end_date"),
+            "status": ("COMPLETE" if header.get("is_complete") else "UPCOMING"),
+            "year": int(header["year"]) if header.get("year") is not None else None,
+            "leaderboard": [map_row(r) for r in result.rows],
+            "page": page,
+            "page_size": page_size,
+            "has_more": result.has_more,
+            "total": result.total,
+        },
+        response,
+    )
+
+
+# Whole field in one cached, streamed response
+@app.get(
+    "/lpga/tournaments/{tournament_id}/leaderboard/full",
+    response_model=LeaderboardFullResponse,
+)
+async def get_full_leaderboard(
+    tournament_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[List[str]] = Depends(sparse_fields(leaderboard_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    full = await fetch_full_leaderboard(sb, tournament_id)
+    if not full:
+        raise HTTPException(status_code=404, detail="Not found")
+    header, rows, version = full
+    not_modified = conditional(request, response, fields, header, rows)
+    if not_modified:
+        return not_modified
+
+    return stream_response(
+        {
+            "tournament_id": header.get("tournament_id"),
+            "tournament_name": header.get("name", ""),
+            "start_date": header.get("start_date"),
+            "end_date": header.get("end_date"),
+            "status": ("COMPLETE" if header.get("is_complete") else "UPCOMING"),
+            "year": int(header["year"]) if header.get("year") is not None else None,
+            "total": len(rows),
+            "version": version,
+        },
+        "leaderboard",
+        map(leaderboard_row.only(fields), rows),
+        response,
     )
 
 
 @app.get("/lpga/players", response_model=PlayersResponse)
 async def list_players(
+    request: Request,
+    response: Response,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    cursor: Optional[str] = Query(
+        default=None, description="Opaque next_cursor from a previous page"
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(player_list_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
-    rows, total = fetch_players(sb, page, page_size)
-
-    items: list[PlayerListItem] = []
-    for r in rows:
-        items.append(
-            PlayerListItem(
-                id=int(r.get("player_id")),
-                first_name=r.get("first_name"),
-                last_name=r.get("last_name"),
-                age=(int(r["age"]) if r.get("age") is not None else None),
-                rookie_year=(
-                    int(r["rookie_year"]) if r.get("rookie_year") is not None else None
-                ),
-                year_joined=(
-                    int(r["year_joined"]) if r.get("year_joined") is not None else None
-                ),
-                country=r.get("country"),
-                country_flag=r.get("country_flag"),
-                image_url=r.get("image_url"),
-            )
+    try:
+        result = await fetch_players(
+            sb, page, page_size, count, cursor, player_list_row.columns_for(fields)
         )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    not_modified = conditional(request, response, fields, result)
+    if not_modified:
+        return not_modified
 
-    if total is not None:
-        has_more = (page * page_size) < total
-    else:
-        has_more = len(rows) == page_size
-
-    return PlayersResponse(
-        players=items, page=page, page_size=page_size, has_more=has_more
+    map_row = player_list_row.only(fields)
+    return row_response(
+        {
+            "players": [map_row(r) for r in result.rows],
+            "page": page,
+            "page_size": page_size,
+            "has_more": result.has_more,
+            "total": result.total,
+            "next_cursor": result.next_cursor,
+        },
+        response,
     )
 
 
 @app.get("/lpga/players/{player_id}/profile", response_model=PlayerProfile)
-# async def get_player_profile(player_id: int, _: None = Depends(authorize_request)):
-async def get_player_profile(player_id: int):
-    sb = get_supabase_client()
-    s = fetch_player_profile(sb, player_id)
+async def get_player_profile(
+    player_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[List[str]] = Depends(sparse_fields(player_profile_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    # Profile and tournament history are independent; fetch them concurrently,
+    # and skip the history when the fieldset leaves it out
+    fetches = [fetch_player_profile(sb, player_id)]
+    if fields is None or "tournaments" in fields:
+        fetches.append(fetch_player_tournaments(sb, player_id))
+    s, *history = await asyncio.gather(*fetches)
+    tournaments_rows = history[0] if history else []
     if not s:
         raise HTTPException(status_code=404, detail="Not found")
+    not_modified = conditional(request, response, fields, s, tournaments_rows)
+    if not_modified:
+        return not_modified
 
-    tournaments_rows = fetch_player_tournaments(sb, player_id)
-    tournaments: list[PlayerTournamentRow] = []
-    for t in tournaments_rows:
-        tournaments.append(
-            PlayerTournamentRow(
-                tournament_name=t.get("tournament_name"),
-                start_date=t.get("start_date"),
-                position=t.get("position"),
-                to_par=t.get("to_par"),
-                official_money_text=t.get("official_money_text"),
-                official_money_amount=(
-                    float(t["official_money_amount"])
-                    if t.get("official_money_amount") is not None
-                    else None
-                ),
-                r1=t.get("r1"),
-                r2=t.get("r2"),
-                r3=t.get("r3"),
-                r4=t.get("r4"),
-                total=t.get("total"),
-                cme_points=(
-                    float(t["cme_points"]) if t.get("cme_points") is not None else None
-                ),
-            )
-        )
+    return row_response(
+        player_profile_row.only(fields)({**s, "tournaments": tournaments_rows}),
+        response,
+    )
+
+
+# Get player profiles for many player_ids in one request
+@app.get("/lpga/players:batch", response_model=PlayersBatchResponse)
+async def get_players_batch(
+    request: Request,
+    response: Response,
+    ids: List[str] = Depends(batch_ids),
+    fields: Optional[List[str]] = Depends(sparse_fields(player_profile_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    try:
+        player_ids = [int(i) for i in ids]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Player ids must be integers")
+    # One `in` query per table, run concurrently
+    fetches = [fetch_player_profiles(sb, player_ids)]
+    if fields is None or "tournaments" in fields:
+        fetches.append(fetch_players_tournaments(sb, player_ids))
+    profiles, *history = await asyncio.gather(*fetches)
+    tournaments = history[0] if history else {}
+    not_modified = conditional(request, response, fields, profiles, tournaments)
+    if not_modified:
+        return not_modified
 
-    return PlayerProfile(
-        id=int(s.get("player_id")),
-        first_name=s.get("first_name"),
-        last_name=s.get("last_name"),
-        age=(int(s["age"]) if s.get("age") is not None else None),
-        rookie_year=(
-            int(s["rookie_year"]) if s.get("rookie_year") is not None else None
-        ),
-        year_joined=(
-            int(s["year_joined"]) if s.get("year_joined") is not None else None
-        ),
-        country=s.get("country"),
-        country_flag=s.get("country_flag"),
-        starts=s.get("starts"),
-        cuts_made=s.get("cuts_made"),
-        top_10=s.get("top_10"),
-        wins=s.get("wins"),
-        low_round=s.get("low_round"),
-        official_earnings_amount=(
-            float(s["official_earnings_amount"])
-            if s.get("official_earnings_amount") is not None
-            else None
-        ),
-        cme_points_rank=s.get("cme_points_rank"),
-        cme_points=s.get("cme_points"),
-        image_url=s.get("image_url"),
-        tournaments=tournaments,
+    map_row = player_profile_row.only(fields)
+    return row_response(
+        {
+            "players": {
+                str(pid): map_row(
+                    {**profiles[pid], "tournaments": tournaments.get(pid)}
+                )
+                for pid in player_ids
+                if pid in profiles
+            },
+            "missing": [pid for pid in player_ids if pid not in profiles],
+        },
+        response,
     )
 
 
 # Get ticket URLs for upcoming tournaments
 @app.get("/lpga/tickets", response_model=TicketUrlResponse)
 async def get_ticket_urls(
+    request: Request,
+    response: Response,
     year: int = Query(description="Tournament year (e.g., 2025)"),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(ticket_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
-    rows, total = fetch_upcoming_ticket_urls(sb, year, page, page_size)
-
-    ticket_urls: List[TicketUrlItem] = []
-    for r in rows:
-        ticket_urls.append(
-            TicketUrlItem(
-                tournament_id=r.get("tournament_id"),
-                tournament_name=r.get("name", ""),
-                year=(int(r["year"]) if r.get("year") is not None else None),
-                month=r.get("month"),
-                start_date=(r.get("start_date") or None),
-                end_date=(r.get("end_date") or None),
-                ticket_url=r.get("ticket_url"),
-                tournament_logo=r.get("tournament_logo"),
-            )
-        )
-
-    # Determine has_more
-    if total is not None:
-        has_more = (page * page_size) < total
-    else:
-        has_more = len(rows) == page_size
+    result = await fetch_upcoming_ticket_urls(
+        sb, year, page, page_size, count, ticket_row.columns_for(fields)
+    )
+    not_modified = conditional(request, response, fields, result)
+    if not_modified:
+        return not_modified
 
-    return TicketUrlResponse(
-        tickets=ticket_urls, page=page, page_size=page_size, has_more=has_more
+    map_row = ticket_row.only(fields)
+    return row_response(
+        {
+            "tickets": [map_row(r) for r in result.rows],
+            "page": page,
+            "page_size": page_size,
+            "has_more": result.has_more,
+            "total": result.total,
+        },
+        response,
     )
+
+
+# Drop cached tournament/player reads; called by the scrapers from closed()
+@app.post("/lpga/cache/invalidate", response_model=CacheInvalidateResponse)
+async def invalidate_cache(
+    body: CacheInvalidateRequest = CacheInvalidateRequest(),
+    _: None = Depends(authorize_request),
+):
+    return CacheInvalidateResponse(invalidated=invalidate(body.entities))
+
+
+# Cache sizes and hit/miss counters
+@app.get("/lpga/cache/stats", response_model=CacheStatsResponse)
+async def get_cache_stats(
+    _: None = Depends(authorize_request),
+):
+    return CacheStatsResponse(caches=cache_stats())
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, get_args
 from pydantic import BaseModel
 
 
@@ -31,6 +31,7 @@ class TournamentsResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    total: Optional[int] = None
 
 
 class LeaderboardRow(BaseModel):
@@ -61,6 +62,27 @@ class LeaderboardResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    total: Optional[int] = None
+
+
+class LeaderboardFullResponse(BaseModel):
+    tournament_id: str
+    tournament_name: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    status: Optional[str] = None
+    year: Optional[int] = None
+    total: int
+    version: int = 0
+    leaderboard: List[LeaderboardRow]
+
+
+class LeaderboardDeltaResponse(BaseModel):
+    tournament_id: str
+    since_version: int
+    version: int
+    changed: List[LeaderboardRow]
+    removed: List[int] = []
 
 
 class PlayerListItem(BaseModel):
@@ -80,6 +102,8 @@ class PlayersResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class PlayerTournamentRow(BaseModel):
@@ -118,6 +142,11 @@ class PlayerProfile(BaseModel):
     tournaments: List[PlayerTournamentRow]
 
 
+class PlayersBatchResponse(BaseModel):
+    players: Dict[str, PlayerProfile]
+    missing: List[int]
+
+
 class TicketUrlItem(BaseModel):
     tournament_id: str
     tournament_name: str
@@ -134,3 +163,157 @@ class TicketUrlResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    total: Optional[int] = None
+
+
+class CacheInvalidateRequest(BaseModel):
+    entities: Optional[List[str]] = None
+
+
+class CacheInvalidateResponse(BaseModel):
+    invalidated: Dict[str, int]
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+
+
+class CacheStatsResponse(BaseModel):
+    caches: Dict[str, CacheStats]
+
+
+# Row -> response mapping. List routes return these dicts directly (see
+# responses.row_response), so rows are not built into models per request.
+
+RowMapper = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _number_type(annotation: Any) -> Optional[type]:
+    for t in (annotation, *get_args(annotation)):
+        if t in (int, float):
+            return t
+    return None
+
+
+def reads(*columns: str) -> Callable[[RowMapper], RowMapper]:
+    """Declare the columns a computed source reads (see row_mapper)."""
+
+    def decorator(fn: RowMapper) -> RowMapper:
+        fn.columns = columns
+        return fn
+
+    return decorator
+
+
+def blank_to_none(column: str) -> RowMapper:
+    """Source for a field whose empty-string column value means unset."""
+    return reads(column)(lambda row: row.get(column) or None)
+
+
+def _source_columns(model: Type[BaseModel], name: str, source: Any) -> Tuple[str, ...]:
+    columns = getattr(source, "columns", None)
+    if columns is None:
+        raise ValueError(f"{model.__name__}.{name}: declare its columns with @reads")
+    if isinstance(columns, dict):
+        # A nested row_mapper reads all of its own fields' columns
+        return tuple(dict.fromkeys(c for cols in columns.values() for c in cols))
+    return tuple(columns)
+
+
+def _compile(plan: List[Tuple[str, Optional[str], Any]]) -> RowMapper:
+    def map_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        out = {}
+        for name, column, convert in plan:
+            if column is None:
+                out[name] = convert(row)
+            else:
+                value = row.get(column)
+                if value is not None and convert is not None:
+                    value = convert(value)
+                out[name] = value
+        return out
+
+    return map_row
+
+
+def row_mapper(model: Type[BaseModel], **sources: Any) -> RowMapper:
+    """Precompile a mapping from a DB row to a dict shaped like `model`.
+
+    Each field reads the column of the same name unless `sources` names
+    another column or gives a callable taking the whole row (computed and
+    nested fields). int/float fields are coerced the way the routes did;
+    extra columns are dropped, so the output matches the model's schema.
+
+    For sparse `?fields=` responses the mapper also carries `columns`
+    (field -> the columns it reads; computed sources declare theirs with
+    @reads), `columns_for(fields)`, the columns to select for `fields`,
+    and `only(fields)`, the mapping restricted to `fields`. Both treat
+    fields=None as every field.
+    """
+    plan = []
+    columns: Dict[str, Tuple[str, ...]] = {}
+    for name, field in model.model_fields.items():
+        source = sources.pop(name, name)
+        if callable(source):
+            plan.append((name, None, source))
+            columns[name] = _source_columns(model, name, source)
+        else:
+            plan.append((name, source, _number_type(field.annotation)))
+            columns[name] = (source,)
+    if sources:
+        raise ValueError(f"{model.__name__} has no fields {sorted(sources)}")
+
+    map_row = _compile(plan)
+
+    def columns_for(fields: Optional[List[str]]) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        return list(dict.fromkeys(c for f in fields for c in columns[f]))
+
+    def only(fields: Optional[List[str]]) -> RowMapper:
+        if fields is None:
+            return map_row
+        return _compile([step for step in plan if step[0] in fields])
+
+    map_row.columns = columns
+    map_row.columns_for = columns_for
+    map_row.only = only
+    return map_row
+
+
+@reads("is_complete")
+def _tournament_status(row: Dict[str, Any]) -> str:
+    return "COMPLETE" if row.get("is_complete") else "UPCOMING"
+
+
+tournament_row = row_mapper(
+    TournamentOut,
+    id="tournament_id",
+    status=_tournament_status,
+    course=row_mapper(CourseInfo, name="course"),
+)
+leaderboard_row = row_mapper(LeaderboardRow, country_flag="country_abbr")
+player_list_row = row_mapper(PlayerListItem, id="player_id")
+player_tournament_row = row_mapper(PlayerTournamentRow)
+
+
+# Not a column: the route merges the player's tournament rows into the profile
+@reads()
+def _profile_tournaments(row: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [player_tournament_row(t) for t in row.get("tournaments") or []]
+
+
+# Maps {**profile_row, "tournaments": tournament_rows}
+player_profile_row = row_mapper(
+    PlayerProfile, id="player_id", tournaments=_profile_tournaments
+)
+ticket_row = row_mapper(
+    TicketUrlItem,
+    tournament_name="name",
+    start_date=blank_to_none("start_date"),
+    end_date=blank_to_none("end_date"),
+)
@@ -0,0 +1,226 @@
+import os
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from anyio import to_thread
+import brotli
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+# Bodies at least this large are compressed off the event loop
+COMPRESS_THREAD_MIN_SIZE = 256 * 1024
+# Rows encoded per chunk by stream_response
+STREAM_CHUNK_ROWS = 50
+
+# Streams must reach the client chunk by chunk, so they are never buffered
+_SKIP_CONTENT_TYPES = ("text/event-stream",)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, for payloads built from raw rows."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def row_response(content: Any, response: Response) -> ORJSONResponse:
+    """Send `content` (built by the models' row mappers) as-is.
+
+    FastAPI neither validates a returned Response against response_model
+    nor merges the injected `response` into it, so the headers set there
+    (ETag, Cache-Control, ...) are copied over.
+    """
+    return ORJSONResponse(content, headers=_carried_headers(response))
+
+
+def _carried_headers(response: Response) -> Dict[str, str]:
+    return {k: v for k, v in response.headers.items() if k != "content-length"}
+
+
+def iter_json_document(
+    fields: Dict[str, Any],
+    key: str,
+    rows: Iterable[Any],
+    chunk_size: int = STREAM_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """Encode `{**fields, key: [*rows]}` as JSON, `chunk_size` rows at a time."""
+    head = orjson.dumps(fields, option=orjson.OPT_NON_STR_KEYS)[:-1]
+    yield head + (b"," if fields else b"") + orjson.dumps(key) + b":["
+    chunk: List[bytes] = []
+    first = True
+    for row in rows:
+        chunk.append(orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS))
+        if len(chunk) == chunk_size:
+            yield (b"" if first else b",") + b",".join(chunk)
+            chunk, first = [], False
+    if chunk:
+        yield (b"" if first else b",") + b",".join(chunk)
+    yield b"]}"
+
+
+def stream_response(
+    fields: Dict[str, Any], key: str, rows: Iterable[Any], response: Response
+) -> StreamingResponse:
+    """Stream a document whose bulk is one array, mapping rows lazily.
+
+    Only one chunk of encoded rows is held at a time, so the encoded body
+    never sits in memory whole; `rows` themselves are the caller's. Headers
+    set on `response` are kept.
+    """
+    return StreamingResponse(
+        iter_json_document(fields, key, rows),
+        media_type="application/json",
+        headers=_carried_headers(response),
+    )
+
+
+def _accepted_encodings(header: str) -> List[Tuple[str, float]]:
+    accepted = []
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted.append((name.strip().lower(), q))
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from Accept-Encoding (br wins ties), else None."""
+    if not header:
+        return None
+    weights = dict(_accepted_encodings(header))
+    star = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ("br", "gzip"):
+        q = weights.get(encoding, star)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._gz = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Negotiated brotli/gzip response compression with a size threshold.
+
+    Responses smaller than `minimum_size`, already encoded, event streams
+    and bodiless statuses pass through untouched. A strong ETag is made
+    weak on compressed responses, since the bytes differ per encoding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        await _CompressingSend(self.app, encoding, self.minimum_size)(
+            scope, receive, send
+        )
+
+
+class _CompressingSend:
+    def __init__(self, app: ASGIApp, encoding: Optional[str], minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.wrapped_send)
+
+    def _headers(self) -> MutableHeaders:
+        return MutableHeaders(raw=self.start["headers"])
+
+    def _mark_encoded(self) -> MutableHeaders:
+        headers = self._headers()
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        return headers
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "").partition(";")[0]
+            self.start = message
+            self.passthrough = (
+                self.encoding is None
+                or "content-encoding" in headers
+                or content_type.strip().lower() in _SKIP_CONTENT_TYPES
+                or message["status"] in (204, 206, 304)
+            )
+            if self.passthrough:
+                if message["status"] == 304 and self.encoding is not None:
+                    # Revalidates the compressed representation sent earlier
+                    self._mark_encoded()
+                    del self._headers()["Content-Encoding"]
+                elif "content-encoding" not in headers:
+                    self._headers().add_vary_header("Accept-Encoding")
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self._headers().add_vary_header("Accept-Encoding")
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers = self._mark_encoded()
+            compressed = await self._compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start)
+        else:
+            compressed = await self._compress(body, final=not more_body)
+        await self.send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+    async def _compress(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= COMPRESS_THREAD_MIN_SIZE:
+            return await to_thread.run_sync(self.compressor.compress, body, final)
+        return self.compressor.compress(body, final)
@@ -1,40 +1,53 @@
+import asyncio
 from typing import Any, Dict, List, Optional, Tuple
 
-from supabase import Client
+from postgrest.exceptions import APIError
+from supabase import AsyncClient
 
+from services.cache import cached
+from services.pagination import (
+    CountMode,
+    Page,
+    count_method,
+    fetch_page,
+    select_columns,
+)
 
+
+# No `version`: only since_version and the full leaderboard's version read
+# it, so paged leaderboards work on tables that predate the column
 LB_SELECT = "player_id,first_name,last_name,position,to_par,r1,r2,r3,r4,strokes,points,prize_money,country_abbr,player_url"
+# Postgres error for a missing column, e.g. `version` before it is added
+UNDEFINED_COLUMN = "42703"
+# Missing table, e.g. the removals before they are created (Postgres, PostgREST)
+UNDEFINED_TABLE = ("42P01", "PGRST205")
 
 
-def fetch_leaderboard_rows(
-    sb: Client, tournament_id: str, page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+async def fetch_leaderboard_rows(
+    sb: AsyncClient,
+    tournament_id: str,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    columns: Optional[List[str]] = None,
+) -> Page:
     base = (
         sb.table("lpga_tournament_leaderboards")
-        .select(LB_SELECT, count="exact")
+        .select(select_columns(columns, LB_SELECT), count=count_method(count))
         .eq("tournament_id", tournament_id)
         .order("position", desc=False)
     )
-
-    start = (page - 1) * page_size
-    end = start + page_size - 1
-
-    count_resp = base.range(0, 0).execute()
-    total_count: Optional[int] = getattr(count_resp, "count", None)
-    if total_count is not None and start >= total_count:
-        return [], total_count
-
-    resp = base.range(start, end).execute()
-    return resp.data or [], (
-        total_count if total_count is not None else getattr(resp, "count", None)
-    )
+    return await fetch_page(base, page, page_size)
 
 
 TRN_SELECT = "tournament_id,name,start_date,end_date,is_complete,year"
 
 
-def fetch_tournament_header(sb: Client, tournament_id: str) -> Optional[Dict[str, Any]]:
-    resp = (
+@cached("tournaments")
+async def fetch_tournament_header(
+    sb: AsyncClient, tournament_id: str
+) -> Optional[Dict[str, Any]]:
+    resp = await (
         sb.table("lpga_tournaments")
         .select(TRN_SELECT)
         .eq("tournament_id", tournament_id)
@@ -43,3 +56,134 @@ def fetch_tournament_header(sb: Client, tournament_id: str) -> Optional[Dict[str
     )
     rows: List[Dict[str, Any]] = resp.data or []
     return rows[0] if rows else None
+
+
+async def fetch_leaderboard(
+    sb: AsyncClient,
+    tournament_id: str,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    columns: Optional[List[str]] = None,
+) -> Optional[Tuple[Dict[str, Any], Page]]:
+    """Tournament header and one page of rows, or None if no tournament.
+
+    The page request already carries its count, and it runs concurrently
+    with the (usually cached) header lookup: one round trip instead of
+    header, then rows.
+    """
+    header, result = await asyncio.gather(
+        fetch_tournament_header(sb, tournament_id),
+        fetch_leaderboard_rows(sb, tournament_id, page, page_size, count, columns),
+    )
+    if not header:
+        return None
+    return header, result
+
+
+def latest_version(rows: List[Dict[str, Any]], floor: int = 0) -> int:
+    """Highest row version, or `floor` (rows from before versioning have none)."""
+    return max([floor, *(r["version"] for r in rows if r.get("version") is not None)])
+
+
+async def fetch_leaderboard_changes(
+    sb: AsyncClient,
+    tournament_id: str,
+    since_version: int,
+    columns: Optional[List[str]] = None,
+) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Tournament header, then the rows and removals above `since_version`.
+
+    The leaderboard spider stamps a new version only on rows it changed,
+    so this is the change set since a client's last poll. Removals are
+    the tombstones of players dropped from the field, less those added
+    back since (their row is newer than the tombstone).
+    """
+    header, resp, removals = await asyncio.gather(
+        fetch_tournament_header(sb, tournament_id),
+        sb.table("lpga_tournament_leaderboards")
+        .select(
+            select_columns(columns, f"{LB_SELECT},version", ("version", "player_id"))
+        )
+        .eq("tournament_id", tournament_id)
+        .gt("version", since_version)
+        .order("position", desc=False)
+        .execute(),
+        fetch_leaderboard_removals(sb, tournament_id, since_version),
+    )
+    if not header:
+        return None
+    rows = resp.data or []
+    current = {r["player_id"] for r in rows}
+    return header, rows, [r for r in removals if r["player_id"] not in current]
+
+
+async def fetch_leaderboard_removals(
+    sb: AsyncClient, tournament_id: str, since_version: int
+) -> List[Dict[str, Any]]:
+    """Tombstones (player_id, version) written after `since_version`.
+
+    Empty before the removals table is created.
+    """
+    try:
+        resp = await (
+            sb.table("lpga_leaderboard_removals")
+            .select("player_id,version")
+            .eq("tournament_id", tournament_id)
+            .gt("version", since_version)
+            .order("player_id", desc=False)
+            .execute()
+        )
+    except APIError as e:
+        if e.code not in UNDEFINED_TABLE:
+            raise
+        return []
+    return resp.data or []
+
+
+async def fetch_latest_version(sb: AsyncClient, tournament_id: str) -> int:
+    """Highest row version of a tournament's leaderboard.
+
+    0 while no row is versioned, including before the column is added.
+    """
+    try:
+        resp = await (
+            sb.table("lpga_tournament_leaderboards")
+            .select("version")
+            .eq("tournament_id", tournament_id)
+            .not_.is_("version", "null")
+            .order("version", desc=True)
+            .limit(1)
+            .execute()
+        )
+    except APIError as e:
+        if e.code != UNDEFINED_COLUMN:
+            raise
+        return 0
+    return latest_version(resp.data or [])
+
+
+@cached("leaderboards")
+async def fetch_full_leaderboard(
+    sb: AsyncClient, tournament_id: str
+) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], int]]:
+    """Tournament header, the whole field (unpaged, uncounted) and its version.
+
+    The header usually comes from the tournaments cache; the rows and the
+    version run concurrently with it. The field is read and cached whole
+    rather than paged inside the response stream: it is a few hundred rows
+    at most, and one cached read is shared by every poller until the next
+    scrape.
+    """
+    header, resp, version = await asyncio.gather(
+        fetch_tournament_header(sb, tournament_id),
+        sb.table("lpga_tournament_leaderboards")
+        .select(LB_SELECT)
+        .eq("tournament_id", tournament_id)
+        .order("position", desc=False)
+        .execute(),
+        fetch_latest_version(sb, tournament_id),
+    )
+    if not header:
+        return None
+    return header, resp.data or [], version
@@ -1,34 +1,55 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-from supabase import Client
+from supabase import AsyncClient
 
+from services.cache import cached, cached_many
+from services.pagination import (
+    CountMode,
+    Page,
+    count_method,
+    fetch_after,
+    fetch_all,
+    fetch_page,
+    select_columns,
+)
 
-def fetch_players(
-    sb: Client, page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
-    base = sb.table("lpga_players_stats").select(
-        "player_id,first_name,last_name,age,rookie_year,year_joined,country,country_flag,image_url",
-        count="exact",
-    )
-
-    start = (page - 1) * page_size
-    end = start + page_size - 1
-
-    count_resp = base.range(0, 0).execute()
-    total: Optional[int] = getattr(count_resp, "count", None)
-    if total is not None and start >= total:
-        return [], total
 
-    resp = base.order("player_id", desc=False).range(start, end).execute()
-    return resp.data or [], total
+PLAYER_CURSOR_KEYS = ("player_id",)
+LIST_SELECT = "player_id,first_name,last_name,age,rookie_year,year_joined,country,country_flag,image_url"
 
 
-def fetch_player_profile(sb: Client, player_id: int) -> Optional[Dict[str, Any]]:
-    resp = (
+async def fetch_players(
+    sb: AsyncClient,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    cursor: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+) -> Page:
+    base = (
         sb.table("lpga_players_stats")
         .select(
-            "player_id,first_name,last_name,age,rookie_year,year_joined,country,country_flag,starts,cuts_made,top_10,wins,low_round,official_earnings_amount,cme_points_rank,cme_points,image_url"
+            select_columns(columns, LIST_SELECT, PLAYER_CURSOR_KEYS),
+            count=count_method(count),
         )
+        .order("player_id", desc=False)
+    )
+    if cursor:
+        return await fetch_after(base, cursor, page_size, PLAYER_CURSOR_KEYS)
+    return await fetch_page(base, page, page_size, PLAYER_CURSOR_KEYS)
+
+
+PROFILE_SELECT = "player_id,first_name,last_name,age,rookie_year,year_joined,country,country_flag,starts,cuts_made,top_10,wins,low_round,official_earnings_amount,cme_points_rank,cme_points,image_url"
+PLAYER_TOURNAMENTS_SELECT = "tournament_name,start_date,position,to_par,official_money_text,official_money_amount,r1,r2,r3,r4,total,cme_points"
+
+
+@cached("players")
+async def fetch_player_profile(
+    sb: AsyncClient, player_id: int
+) -> Optional[Dict[str, Any]]:
+    resp = await (
+        sb.table("lpga_players_stats")
+        .select(PROFILE_SELECT)
         .eq("player_id", player_id)
         .limit(1)
         .execute()
@@ -39,14 +60,48 @@ def fetch_player_profile(sb: Client, player_id: int) -> Optional[Dict[str, Any]]
     return rows[0]
 
 
-def fetch_player_tournaments(sb: Client, player_id: int) -> List[Dict[str, Any]]:
-    resp = (
-        sb.table("lpga_players_tournaments")
-        .select(
-            "tournament_name,start_date,position,to_par,official_money_text,official_money_amount,r1,r2,r3,r4,total,cme_points"
-        )
+@cached("players")
+async def fetch_player_tournaments(
+    sb: AsyncClient, player_id: int
+) -> List[Dict[str, Any]]:
+    return await fetch_all(
+        lambda: sb.table("lpga_players_tournaments")
+        .select(PLAYER_TOURNAMENTS_SELECT)
         .eq("player_id", player_id)
         .order("start_date", desc=True)
+        .order("tournament_id")
+    )
+
+
+@cached_many("players", fetch_player_profile)
+async def fetch_player_profiles(
+    sb: AsyncClient, player_ids: List[int]
+) -> Dict[int, Dict[str, Any]]:
+    resp = await (
+        sb.table("lpga_players_stats")
+        .select(PROFILE_SELECT)
+        .in_("player_id", player_ids)
         .execute()
     )
-    return resp.data or []
+    return {int(r["player_id"]): r for r in resp.data or []}
+
+
+@cached_many("players", fetch_player_tournaments)
+async def fetch_players_tournaments(
+    sb: AsyncClient, player_ids: List[int]
+) -> Dict[int, List[Dict[str, Any]]]:
+    # Histories of a full batch run past max-rows, so they are read in
+    # ranges; every list is complete before any of them is cached
+    rows = await fetch_all(
+        lambda: sb.table("lpga_players_tournaments")
+        .select("player_id," + PLAYER_TOURNAMENTS_SELECT)
+        .in_("player_id", player_ids)
+        .order("start_date", desc=True)
+        .order("player_id")
+        .order("tournament_id")
+    )
+    by_player: Dict[int, List[Dict[str, Any]]] = {pid: [] for pid in player_ids}
+    for r in rows:
+        # Same row shape as fetch_player_tournaments, whose cache this fills
+        by_player.setdefault(int(r.pop("player_id")), []).append(r)
+    return by_player
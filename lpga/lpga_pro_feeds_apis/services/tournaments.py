@@ -1,6 +1,15 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-from supabase import Client
+from supabase import AsyncClient
+
+from services.cache import cached
+from services.pagination import (
+    CountMode,
+    Page,
+    count_method,
+    fetch_page,
+    select_columns,
+)
 
 
 SELECT_FIELDS = (
@@ -10,12 +19,19 @@ SELECT_FIELDS = (
 )
 
 
-def fetch_tournaments(
-    sb: Client, year: int, status_filter: Optional[str], page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+async def fetch_tournaments(
+    sb: AsyncClient,
+    year: int,
+    status_filter: Optional[str],
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    columns: Optional[List[str]] = None,
+) -> Page:
+    """One page of tournaments; only `columns` when given."""
     base = (
         sb.table("lpga_tournaments")
-        .select(SELECT_FIELDS, count="exact")
+        .select(select_columns(columns, SELECT_FIELDS), count=count_method(count))
         .eq("year", year)
         .order("start_date", desc=False)
     )
@@ -25,22 +41,14 @@ def fetch_tournaments(
         elif status_filter == "COMPLETED":
             base = base.eq("is_complete", True)
 
-    start = (page - 1) * page_size
-    end = start + page_size - 1
-
-    count_resp = base.range(0, 0).execute()
-    total_count: Optional[int] = getattr(count_resp, "count", None)
-    if total_count is not None and start >= total_count:
-        return [], total_count
-
-    resp = base.range(start, end).execute()
-    return resp.data or [], (
-        total_count if total_count is not None else getattr(resp, "count", None)
-    )
+    return await fetch_page(base, page, page_size)
 
 
-def fetch_tournament_by_id(sb: Client, tournament_id: str) -> Optional[Dict[str, Any]]:
-    resp = (
+@cached("tournaments")
+async def fetch_tournament_by_id(
+    sb: AsyncClient, tournament_id: str
+) -> Optional[Dict[str, Any]]:
+    resp = await (
         sb.table("lpga_tournaments")
         .select(SELECT_FIELDS)
         .eq("tournament_id", tournament_id)
@@ -56,27 +64,24 @@ TICKET_URL_SELECT_FIELDS = (
 )
 
 
-def fetch_upcoming_ticket_urls(
-    sb: Client, year: int, page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+async def fetch_upcoming_ticket_urls(
+    sb: AsyncClient,
+    year: int,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    columns: Optional[List[str]] = None,
+) -> Page:
     base_query = (
         sb.table("lpga_tournaments")
-        .select(TICKET_URL_SELECT_FIELDS, count="exact")
+        .select(
+            select_columns(columns, TICKET_URL_SELECT_FIELDS),
+            count=count_method(count),
+        )
         .eq("year", year)
         .eq("is_complete", False)
         .not_.is_("ticket_url", "null")
         .order("start_date", desc=False)
     )
 
-    start = (page - 1) * page_size
-    end = start + page_size - 1
-    count_resp = base_query.range(0, 0).execute()
-    total_count: Optional[int] = getattr(count_resp, "count", None)
-
-    if total_count is not None and start >= total_count:
-        return [], total_count
-
-    resp = base_query.range(start, end).execute()
-    return resp.data or [], (
-        total_count if total_count is not None else getattr(resp, "count", None)
-    )
+    return await fetch_page(base_query, page, page_size)
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from services import cache
+from services.cache import CACHES, TTLCache, cached, cached_many
+from tests.fakes import FakeClient
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    for c in CACHES.values():
+        c.clear()
+    monkeypatch.setattr(cache, "_versions", None)
+    monkeypatch.setattr(cache, "_checked_at", float("-inf"))
+    monkeypatch.setattr(cache, "CACHE_VERSION_CHECK_SECS", 0)
+    yield
+    for c in CACHES.values():
+        c.clear()
+
+
+def make_fetcher(calls):
+    @cached("players")
+    async def fetch_player(sb, player_id):
+        calls.append(player_id)
+        return {"id": player_id} if player_id != 404 else None
+
+    return fetch_player
+
+
+def test_cached_serves_repeat_calls_and_skips_none():
+    calls = []
+    fetch_player = make_fetcher(calls)
+    sb = FakeClient()
+
+    async def run():
+        for player_id in (1, 1, 404, 404):
+            await fetch_player(sb, player_id)
+
+    asyncio.run(run())
+    assert calls == [1, 404, 404]
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl = TTLCache("test", ttl=10)
+    ttl.set("k", "v")
+    now[0] = 109.0
+    assert ttl.get("k") == "v"
+    now[0] = 111.0
+    assert ttl.get("k", None) is None
+
+
+def test_changed_version_stamp_drops_only_that_entity():
+    calls = []
+    fetch_player = make_fetcher(calls)
+    stamps = [{"entity": "players", "changed_at": "t1"}]
+    sb = FakeClient({"feed_cache_versions": stamps})
+    CACHES["tournaments"].set(("fetch_tournament_by_id", "T1"), {"id": "T1"})
+
+    async def run():
+        await fetch_player(sb, 1)
+        await fetch_player(sb, 1)
+        stamps[0] = {"entity": "players", "changed_at": "t2"}
+        await fetch_player(sb, 1)
+
+    asyncio.run(run())
+    assert calls == [1, 1]
+    assert CACHES["tournaments"].get(("fetch_tournament_by_id", "T1")) == {"id": "T1"}
+
+
+def test_invalidate_all_and_unknown_entities():
+    CACHES["players"].set("k", "v")
+    assert cache.invalidate(["players", "nope"]) == {"players": 1}
+    CACHES["tournaments"].set("k", "v")
+    assert cache.invalidate()["tournaments"] == 1
+
+
+def test_cached_many_shares_entries_with_single_fetcher():
+    calls = []
+    fetch_player = make_fetcher(calls)
+
+    @cached_many("players", fetch_player)
+    async def fetch_players(sb, player_ids):
+        calls.append(list(player_ids))
+        return {p: {"id": p} for p in player_ids if p != 404}
+
+    sb = FakeClient()
+
+    async def run():
+        await fetch_player(sb, 1)
+        found = await fetch_players(sb, [1, 2, 404])
+        # Warmed by the batch: no further fetch
+        assert await fetch_player(sb, 2) == {"id": 2}
+        return found
+
+    assert asyncio.run(run()) == {1: {"id": 1}, 2: {"id": 2}}
+    assert calls == [1, [2, 404]]
@@ -0,0 +1,41 @@
+from fastapi import Request, Response
+
+from conditional import conditional, make_etag
+
+ROWS = [{"player_id": 1, "position": "1"}]
+
+
+def request(**headers):
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_first_request_gets_etag_and_no_304():
+    response = Response()
+    assert conditional(request(), response, ROWS) is None
+    assert response.headers["etag"] == make_etag(ROWS)
+    assert "last-modified" not in response.headers
+
+
+def test_matching_if_none_match_answers_304():
+    etag = make_etag(ROWS)
+    not_modified = conditional(request(if_none_match=etag), Response(), ROWS)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+
+def test_weak_and_listed_etags_match():
+    etag = make_etag(ROWS)
+    header = f'"other", W/{etag}'
+    assert conditional(request(if_none_match=header), Response(), ROWS) is not None
+
+
+def test_changed_rows_are_sent_in_full():
+    etag = make_etag(ROWS)
+    changed = [{"player_id": 1, "position": "2"}]
+    assert conditional(request(if_none_match=etag), Response(), changed) is None
+
+
+def test_if_modified_since_is_ignored():
+    header = "Wed, 21 Oct 2099 07:28:00 GMT"
+    assert conditional(request(if_modified_since=header), Response(), ROWS) is None
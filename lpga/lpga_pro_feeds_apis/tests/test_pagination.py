@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from postgrest.exceptions import APIError
+
+from services.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    fetch_after,
+    fetch_all,
+    fetch_page,
+    select_columns,
+)
+from tests.fakes import FakeQuery
+
+
+KEYS = ("player_id",)
+
+
+def rows(n):
+    return [{"player_id": 100 + i} for i in range(n)]
+
+
+def test_fetch_page_requests_one_extra_row():
+    query = FakeQuery(rows(11), count=40)
+    page = asyncio.run(fetch_page(query, 2, 10))
+    assert query.called("range") == [(10, 20)]
+    assert len(page.rows) == 10
+    assert page.has_more
+    assert page.total == 40
+
+
+def test_fetch_page_last_page_has_no_more():
+    page = asyncio.run(fetch_page(FakeQuery(rows(4), count=14), 2, 10))
+    assert len(page.rows) == 4
+    assert not page.has_more
+
+
+def test_fetch_page_past_the_end_returns_empty_page_with_total():
+    error = APIError(
+        {
+            "code": "PGRST103",
+            "message": "Requested range not satisfiable",
+            "details": "An offset of 40 was requested, but there are only 12 rows.",
+        }
+    )
+    page = asyncio.run(fetch_page(FakeQuery(error=error), 5, 10))
+    assert page.rows == []
+    assert page.total == 12
+    assert not page.has_more
+
+
+def test_fetch_page_reraises_other_errors():
+    error = APIError({"code": "42703", "message": "column does not exist"})
+    with pytest.raises(APIError):
+        asyncio.run(fetch_page(FakeQuery(error=error), 1, 10))
+
+
+def test_next_cursor_points_at_last_row_of_page():
+    page = asyncio.run(fetch_page(FakeQuery(rows(11)), 1, 10, KEYS))
+    assert decode_cursor(page.next_cursor, KEYS) == [109]
+    last = asyncio.run(fetch_page(FakeQuery(rows(4)), 2, 10, KEYS))
+    assert last.next_cursor is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor({"player_id": None}, KEYS),
+        encode_cursor({"player_id": "1);drop"}, KEYS),
+        encode_cursor({"a": 1, "player_id": 1}, ("a", "player_id")),  # wrong arity
+    ],
+)
+def test_decode_cursor_rejects_bad_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, KEYS)
+
+
+def test_fetch_after_filters_past_the_cursor():
+    query = FakeQuery(rows(11))
+    page = asyncio.run(
+        fetch_after(query, encode_cursor({"player_id": 105}, KEYS), 10, KEYS)
+    )
+    assert query.called("gt") == [("player_id", 105)]
+    assert query.called("limit") == [(11,)]
+    assert page.has_more
+    assert decode_cursor(page.next_cursor, KEYS) == [109]
+
+
+class RangedQuery(FakeQuery):
+    """Answers .range(start, end) with that slice of its rows."""
+
+    async def execute(self):
+        start, end = self.called("range")[-1]
+        return SimpleNamespace(data=self.rows[start : end + 1], count=None)
+
+
+def test_fetch_all_reads_ranges_until_one_comes_back_short():
+    built = []
+
+    def build():
+        built.append(RangedQuery(rows(5)))
+        return built[-1]
+
+    found = asyncio.run(fetch_all(build, chunk=2))
+    assert found == rows(5)
+    assert [q.called("range") for q in built] == [[(0, 1)], [(2, 3)], [(4, 5)]]
+
+
+def test_select_columns_adds_keys_only_to_sparse_selects():
+    assert select_columns(None, "a,b") == "a,b"
+    assert select_columns(["b"], "a,b", ("player_id",)) == "b,player_id"
+    assert select_columns(["player_id", "b"], "a,b", ("player_id",)) == "player_id,b"
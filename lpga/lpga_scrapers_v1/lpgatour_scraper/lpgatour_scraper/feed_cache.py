@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+import urllib.request
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv, find_dotenv
+from twisted.internet.threads import deferToThread
+
+from .httpcache import REPLAY
+
+load_dotenv(find_dotenv())
+
+logger = logging.getLogger(__name__)
+
+# One row per (feed, entity), stamped whenever a scrape rewrites the entity.
+# Every feed API instance polls it (see the feed API's services/cache.py),
+# so all of them drop stale entries, however many are running.
+CACHE_VERSION_TABLE = "feed_cache_versions"
+FEED = "lpga"
+
+# Optional, comma-separated: feed API instances to also POST to, so they
+# drop their caches at once instead of at their next version check,
+# e.g. https://feeds.example.com/lpga/cache/invalidate
+FEEDS_CACHE_INVALIDATE_URLS = [
+    u.strip()
+    for u in os.environ.get("FEEDS_CACHE_INVALIDATE_URLS", "").split(",")
+    if u.strip()
+]
+FEEDS_ACCESS_KEY = os.environ.get("FEEDS_ACCESS_KEY")
+FEEDS_CACHE_TIMEOUT = float(os.environ.get("FEEDS_CACHE_TIMEOUT", "3"))
+
+
+def invalidate_feed_cache(supabase, *entities: str) -> None:
+    """Tell the feed APIs that `entities` were rewritten by a scrape.
+
+    Best effort: if the versions cannot be stamped, the feed APIs serve
+    their cached reads until the TTLs expire, so failures are logged and
+    never fail the spider. The POSTs run in a thread, off the reactor.
+    """
+    # A replay wrote nothing, so the feed APIs have nothing to drop
+    if REPLAY:
+        return
+    if supabase is not None:
+        changed_at = datetime.now(timezone.utc).isoformat()
+        try:
+            (
+                supabase.table(CACHE_VERSION_TABLE)
+                .upsert(
+                    [
+                        {"feed": FEED, "entity": e, "changed_at": changed_at}
+                        for e in entities
+                    ],
+                    on_conflict="feed,entity",
+                    returning="minimal",
+                )
+                .execute()
+            )
+            logger.info(f"Feed cache versions stamped ({', '.join(entities)})")
+        except Exception as e:
+            logger.warning(f"Failed to stamp feed cache versions: {e}")
+    if FEEDS_CACHE_INVALIDATE_URLS:
+        deferToThread(_post_invalidations, entities)
+
+
+def _post_invalidations(entities) -> None:
+    body = json.dumps({"entities": list(entities)}).encode()
+    headers = {"content-type": "application/json"}
+    if FEEDS_ACCESS_KEY:
+        headers["x-api-key"] = FEEDS_ACCESS_KEY
+    for url in FEEDS_CACHE_INVALIDATE_URLS:
+        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=FEEDS_CACHE_TIMEOUT):
+                pass
+            logger.info(f"Feed cache invalidated ({', '.join(entities)}) at {url}")
+        except Exception as e:
+            logger.warning(f"Feed cache invalidation failed for {url}: {e}")
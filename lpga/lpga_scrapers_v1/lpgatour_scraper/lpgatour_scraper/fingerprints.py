@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# One content hash per scraped row, keyed by the table it was written to
+FINGERPRINT_TABLE = "scrape_fingerprints"
+
+
+def row_fingerprint(row: Dict[str, Any], ignore: Iterable[str] = ()) -> str:
+    """Hash of `row` without its `ignore`d columns; column order does not count."""
+    skip = set(ignore)
+    data = {k: v for k, v in row.items() if k not in skip}
+    blob = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+class RowFingerprints:
+    """Stored fingerprints of one table's rows, to skip unchanged upserts.
+
+    `split` looks up a batch's stored fingerprints and separates the rows
+    whose content changed; once those are upserted, `save` records their
+    new fingerprints. If the fingerprints cannot be read, every row counts
+    as changed for the rest of the run: that costs writes, never a missed
+    change.
+    """
+
+    def __init__(
+        self,
+        supabase: Any,
+        source: str,
+        key: Sequence[str],
+        ignore: Iterable[str] = (),
+    ):
+        self.supabase = supabase
+        self.source = source
+        self.key = tuple(key)
+        self.ignore = tuple(ignore)
+        self.enabled = supabase is not None
+
+    def row_key(self, row: Dict[str, Any]) -> str:
+        return "|".join(str(row.get(c)) for c in self.key)
+
+    def split(
+        self, rows: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(changed, unchanged) rows of `rows`."""
+        if not self.enabled or not rows:
+            return list(rows), []
+        keys = [self.row_key(r) for r in rows]
+        try:
+            resp = (
+                self.supabase.table(FINGERPRINT_TABLE)
+                .select("row_key,fingerprint")
+                .eq("source", self.source)
+                .in_("row_key", list(set(keys)))
+                .execute()
+            )
+            stored = {r["row_key"]: r["fingerprint"] for r in resp.data or []}
+        except Exception as e:
+            logger.warning(
+                f"Fingerprints of {self.source} unavailable; writing every row: {e}"
+            )
+            self.enabled = False
+            return list(rows), []
+        changed, unchanged = [], []
+        for key, row in zip(keys, rows):
+            if stored.get(key) == row_fingerprint(row, self.ignore):
+                unchanged.append(row)
+            else:
+                changed.append(row)
+        return changed, unchanged
+
+    def save(self, rows: List[Dict[str, Any]]) -> None:
+        """Record the fingerprints of `rows`, which were just upserted."""
+        if not self.enabled or not rows:
+            return
+        # One entry per key, or the upsert would hit the same row twice
+        entries = {
+            self.row_key(r): {
+                "source": self.source,
+                "row_key": self.row_key(r),
+                "fingerprint": row_fingerprint(r, self.ignore),
+            }
+            for r in rows
+        }
+        try:
+            (
+                self.supabase.table(FINGERPRINT_TABLE)
+                .upsert(
+                    list(entries.values()),
+                    on_conflict="source,row_key",
+                    returning="minimal",
+                )
+                .execute()
+            )
+        except Exception as e:
+            # Those rows are rewritten next run; nothing is lost
+            logger.warning(f"Failed to save fingerprints of {self.source}: {e}")
+
+    def forget(self, rows: List[Dict[str, Any]]) -> bool:
+        """Drop the fingerprints of `rows`, before the rows are deleted.
+
+        A row scraped again with its old content would otherwise be skipped
+        as unchanged and never written back. False if they may remain, in
+        which case the rows should be kept.
+        """
+        if not self.enabled or not rows:
+            return True
+        try:
+            (
+                self.supabase.table(FINGERPRINT_TABLE)
+                .delete()
+                .eq("source", self.source)
+                .in_("row_key", list({self.row_key(r) for r in rows}))
+                .execute()
+            )
+        except Exception as e:
+            logger.warning(f"Failed to forget fingerprints of {self.source}: {e}")
+            return False
+        return True
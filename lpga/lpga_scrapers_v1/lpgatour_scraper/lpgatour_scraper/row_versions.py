@@ -0,0 +1,35 @@
+import time
+from typing import Any, Dict, Iterable, List
+
+
+def next_version(last: int = 0) -> int:
+    """Millisecond timestamp to stamp an upsert batch with.
+
+    Strictly greater than `last`, so batches flushed by one spider within
+    the same millisecond still get increasing versions.
+    """
+    return max(int(time.time() * 1000), last + 1)
+
+
+def changed_rows(
+    rows: Iterable[Dict[str, Any]],
+    stored: Dict[Any, Dict[str, Any]],
+    key: str = "player_id",
+) -> List[Dict[str, Any]]:
+    """Rows that are new or differ from their `stored` copy (keyed by `key`)."""
+    out = []
+    for row in rows:
+        old = stored.get(row.get(key))
+        if old is None or any(old.get(k) != v for k, v in row.items()):
+            out.append(row)
+    return out
+
+
+def removed_keys(
+    rows: Iterable[Dict[str, Any]],
+    stored: Dict[Any, Dict[str, Any]],
+    key: str = "player_id",
+) -> List[Any]:
+    """Keys of `stored` rows missing from `rows`, e.g. players dropped from a field."""
+    current = {row.get(key) for row in rows}
+    return [k for k in stored if k not in current]
@@ -0,0 +1,52 @@
+import os
+from datetime import date, timedelta
+from typing import Any, Optional
+
+# Upcoming leaderboards (field, tee times) are requested this close to the start
+LEADERBOARD_UPCOMING_DAYS = int(os.environ.get("LEADERBOARD_UPCOMING_DAYS", "3"))
+# Finished leaderboards get their finalization passes within this many days
+LEADERBOARD_FINALIZE_DAYS = int(os.environ.get("LEADERBOARD_FINALIZE_DAYS", "7"))
+# Passes after completion: one right away, one from the day after the end
+LEADERBOARD_FINAL_SCRAPES = 2
+
+
+def parse_date(value: Any) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(value)[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def leaderboard_due(
+    status: Optional[str],
+    start: Optional[date],
+    end: Optional[date],
+    final_scrapes: int,
+    today: date,
+) -> Optional[str]:
+    """Why a tournament's leaderboard is requested this run, or None.
+
+    "live" while in progress, "upcoming" shortly before the start and
+    "finalize" for the passes after completion; historical leaderboards
+    are frozen and never requested. A tournament past its end date counts
+    as completed even if its stored status has not caught up. A day of
+    grace covers rounds finishing after midnight UTC. A completed event
+    with no end date gets its passes on consecutive runs, since neither
+    the finalize window nor the day after the end can be placed.
+    """
+    ended = status == "COMPLETED" or (end is not None and end < today - timedelta(1))
+    if ended:
+        if end is None:
+            return "finalize" if final_scrapes < LEADERBOARD_FINAL_SCRAPES else None
+        if (today - end).days > LEADERBOARD_FINALIZE_DAYS:
+            return None
+        if final_scrapes == 0 or (
+            final_scrapes < LEADERBOARD_FINAL_SCRAPES and today > end
+        ):
+            return "finalize"
+        return None
+    if status == "IN_PROGRESS" or (start is not None and start <= today):
+        return "live"
+    if start is not None and (start - today).days <= LEADERBOARD_UPCOMING_DAYS:
+        return "upcoming"
+    return None
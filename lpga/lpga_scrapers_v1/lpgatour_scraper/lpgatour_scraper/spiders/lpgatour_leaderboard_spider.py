@@ -2,11 +2,22 @@ import os
 import re
 import json
 import scrapy
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timezone
 from typing import Iterable
 from dotenv import load_dotenv, find_dotenv
 from supabase import create_client, Client
 
+from ..feed_cache import invalidate_feed_cache
+from ..httpcache import CACHE_FOREVER, CACHE_LIVE_SECS, httpcache_settings, replay_safe
+from ..middlewares import (
+    NotModified,
+    PageValidators,
+    LpgatourScraperDownloaderMiddleware,
+)
+from ..row_versions import changed_rows, next_version, removed_keys
+from ..scheduling import leaderboard_due, parse_date
+
 
 load_dotenv(find_dotenv())
 
@@ -18,6 +29,9 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS": 2,
+        # Conditional requests, so unchanged pages are not downloaded again
+        "DOWNLOADER_MIDDLEWARES": {LpgatourScraperDownloaderMiddleware: 543},
+        **httpcache_settings(CACHE_LIVE_SECS),
     }
 
     def __init__(self, *args, **kwargs):
@@ -31,18 +45,37 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
             else {}
         )
         self.leaderboard_processed = 0
+        self.leaderboard_unchanged = 0
+        self.leaderboard_changed = 0
+        # Players dropped from a field, deleted behind a tombstone
+        self.leaderboard_removed = 0
+        # Leaderboards not requested this run (see scheduling)
+        self.leaderboards_skipped = 0
+        # Spider args arrive as strings from the scrapy CLI
+        self.full = str(kwargs.get("full", "")).lower() in ("1", "true", "yes")
+        # Version stamped on the last write (see _flush_batch), seeded from
+        # the stored versions when the run starts
+        self._version = 0
+        # Validators of parsed pages, saved once their rows are written
+        self.validators = PageValidators(self)
+        # Finalization passes parsed this run, counted once their rows are written
+        self.final_passes: dict[str, int] = {}
 
     def start_requests(self) -> Iterable[scrapy.Request]:
         self._init_supabase()
         if not self.supabase:
             self.logger.error("Supabase not configured; aborting leaderboard spider")
             return
+        self._seed_version()
 
         # Fetch tournaments that have a results endpoint stored
         try:
             resp = (
                 self.supabase.table("lpga_tournaments")
-                .select("tournament_id, leaderboard_results_url")
+                .select(
+                    "tournament_id, leaderboard_results_url, is_complete, "
+                    "start_date, end_date, leaderboard_final_scrapes"
+                )
                 .neq("leaderboard_results_url", None)
                 .execute()
             )
@@ -73,19 +106,50 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
         #     },
         # ]
 
+        # Frozen leaderboards are not requested again unless `full`
+        today = datetime.now(timezone.utc).date()
+        scheduled = Counter()
         for row in rows:
             tournament_id = row.get("tournament_id")
             url = row.get("leaderboard_results_url")
             if not tournament_id or not url:
                 continue
+            final_scrapes = int(row.get("leaderboard_final_scrapes") or 0)
+            due = leaderboard_due(
+                "COMPLETED" if row.get("is_complete") else None,
+                parse_date(row.get("start_date")),
+                parse_date(row.get("end_date")),
+                final_scrapes,
+                today,
+            )
+            schedule = "full" if self.full else due
+            scheduled[schedule] += 1
+            if schedule is None:
+                continue
             # Some tournaments will have no entries until completed; still request
             yield scrapy.Request(
                 url,
                 headers=headers,
                 callback=self.parse_leaderboard,
-                meta={"tournament_id": tournament_id, **meta_proxy},
+                errback=self.leaderboard_not_modified,
+                meta={
+                    "tournament_id": tournament_id,
+                    "schedule": schedule,
+                    "final_scrapes": final_scrapes,
+                    # Leaderboards that can still change are cached briefly,
+                    # frozen ones (only requested when `full`) for good
+                    "cache_expiration_secs": CACHE_LIVE_SECS if due else CACHE_FOREVER,
+                    **meta_proxy,
+                },
                 dont_filter=True,
             )
+        requested = {k: n for k, n in scheduled.items() if k}
+        self.logger.info(
+            f"Requested {sum(requested.values())} leaderboards {requested}; "
+            f"{scheduled[None]} frozen or not yet due"
+        )
+        self.leaderboards_skipped = scheduled[None]
+        self.results_dict["leaderboards_skipped"] = self.leaderboards_skipped
 
     def parse_leaderboard(self, response):
         tournament_id = response.meta.get("tournament_id")
@@ -103,6 +167,7 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
             # Upcoming or no data yet; not an error
             return
 
+        rows: list[dict] = []
         for entry in entries:
             try:
                 player = entry.get("player") or {}
@@ -149,10 +214,9 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
                     "player_tournaments_result_url": ptr_url,
                 }
 
-                self._batch.append(row)
+                rows.append(row)
                 self.leaderboard_processed += 1
-                if len(self._batch) >= self._batch_size:
-                    self._flush_batch()
+                self.results_dict["leaderboards"] = self.leaderboard_processed
 
             except Exception as e:
                 self.logger.error(
@@ -160,6 +224,25 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
                 )
                 continue
 
+        # Only rows that changed get a new version, so the feed API's
+        # since_version deltas stay small between runs
+        stored = self._stored_rows(tournament_id, rows)
+        changed = changed_rows(rows, stored)
+        self.leaderboard_unchanged += len(rows) - len(changed)
+        self.leaderboard_changed += len(changed)
+        self.results_dict["leaderboards_changed"] = self.leaderboard_changed
+        self.results_dict["leaderboards_unchanged"] = self.leaderboard_unchanged
+        for row in changed:
+            self._batch.append(row)
+            if len(self._batch) >= self._batch_size:
+                self._flush_batch()
+        removed = removed_keys(rows, stored)
+        if removed:
+            self._remove_rows(tournament_id, removed)
+        self.validators.add(response)
+        if response.meta.get("schedule") == "finalize":
+            self.final_passes[tournament_id] = response.meta.get("final_scrapes", 0)
+
     def closed(self, reason):
         try:
             if getattr(self, "_batch", None):
@@ -167,12 +250,24 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
                 self._flush_batch()
         except Exception:
             pass
+        self.validators.commit()
+        self._count_final_passes()
         try:
             if isinstance(self.results_dict, dict):
                 self.results_dict["leaderboards"] = int(self.leaderboard_processed or 0)
+                self.results_dict["leaderboards_changed"] = self.leaderboard_changed
+                self.results_dict["leaderboards_unchanged"] = self.leaderboard_unchanged
+                self.results_dict["leaderboards_removed"] = self.leaderboard_removed
+                self.results_dict["leaderboards_skipped"] = self.leaderboards_skipped
         except Exception:
             pass
-        self.logger.info(f"Leaderboard spider closed: {reason}")
+        # Feed APIs cache full leaderboards until told they changed
+        if self.leaderboard_changed or self.leaderboard_removed:
+            invalidate_feed_cache(self.supabase, "leaderboards")
+        self.logger.info(
+            f"Leaderboard spider closed: {reason}. {self.leaderboard_unchanged} of "
+            f"{self.leaderboard_processed} rows unchanged."
+        )
 
     # Helpers
     def _init_supabase(self):
@@ -185,12 +280,135 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
             self.supabase = None
             return
         try:
-            self.supabase = create_client(url, key)
+            self.supabase = replay_safe(create_client(url, key))
             self.logger.info("Supabase client initialized for LPGA leaderboards.")
         except Exception as e:
             self.logger.error(f"Failed to init Supabase: {e}")
             self.supabase = None
 
+    def leaderboard_not_modified(self, failure):
+        """Errback; a 304 still completes a finalization pass."""
+        request = failure.request
+        if not failure.check(NotModified):
+            self.logger.error(f"Failed to fetch {request.url}: {failure.value}")
+            return
+        if request.meta.get("schedule") == "finalize":
+            self._count_final_scrape(
+                request.meta.get("tournament_id"), request.meta.get("final_scrapes", 0)
+            )
+
+    def _count_final_passes(self):
+        """Count this run's finalization passes, unless a batch failed to write.
+
+        A pass counted over lost rows would stop the event being due while
+        its stored leaderboard is still short of the final result.
+        """
+        if self.validators.failures:
+            if self.final_passes:
+                self.logger.warning(
+                    f"{len(self.final_passes)} finalization passes not counted; "
+                    "a leaderboard batch failed to write"
+                )
+            return
+        for tournament_id, final_scrapes in self.final_passes.items():
+            self._count_final_scrape(tournament_id, final_scrapes)
+
+    def _count_final_scrape(self, tournament_id, final_scrapes: int):
+        """Record a finalization pass, so completed events stop being due."""
+        if self.supabase is None:
+            return
+        try:
+            (
+                self.supabase.table("lpga_tournaments")
+                .update({"leaderboard_final_scrapes": final_scrapes + 1})
+                .eq("tournament_id", tournament_id)
+                .execute()
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to count final scrape of {tournament_id}: {e}")
+
+    def _stored_rows(self, tournament_id, rows: list[dict]) -> dict:
+        """Current DB copy of this tournament's rows, keyed by player_id."""
+        if not self.supabase or not rows:
+            return {}
+        try:
+            resp = (
+                self.supabase.table("lpga_tournament_leaderboards")
+                .select(",".join(rows[0].keys()))
+                .eq("tournament_id", tournament_id)
+                .execute()
+            )
+            return {r["player_id"]: r for r in resp.data or []}
+        except Exception as e:
+            # Treat every row as changed; costs a larger delta, never a missed one
+            self.logger.warning(f"Failed to load stored leaderboard rows: {e}")
+            return {}
+
+    def _seed_version(self):
+        """Start above every stored version.
+
+        Versions are clock based; a run whose clock is behind the last
+        run's (another instance, a restart) must still stamp newer ones.
+        """
+        for table in ("lpga_tournament_leaderboards", "lpga_leaderboard_removals"):
+            try:
+                resp = (
+                    self.supabase.table(table)
+                    .select("version")
+                    .not_.is_("version", "null")
+                    .order("version", desc=True)
+                    .limit(1)
+                    .execute()
+                )
+            except Exception as e:
+                self.logger.warning(f"Failed to load latest version of {table}: {e}")
+                continue
+            for row in resp.data or []:
+                self._version = max(self._version, row["version"])
+
+    def _remove_rows(self, tournament_id, player_ids: list):
+        """Delete players dropped from a field (WD, DQ) behind versioned tombstones.
+
+        The tombstones are written first, so a failed delete is retried on
+        the next run instead of leaving a removal no delta reports.
+        """
+        if not getattr(self, "supabase", None):
+            return
+        self._version = next_version(self._version)
+        try:
+            self.logger.info(
+                f"Removing {len(player_ids)} LPGA players from {tournament_id} "
+                f"(version {self._version})"
+            )
+            (
+                self.supabase.table("lpga_leaderboard_removals")
+                .upsert(
+                    [
+                        {
+                            "tournament_id": tournament_id,
+                            "player_id": player_id,
+                            "version": self._version,
+                        }
+                        for player_id in player_ids
+                    ],
+                    on_conflict="tournament_id,player_id",
+                    returning="minimal",
+                )
+                .execute()
+            )
+            (
+                self.supabase.table("lpga_tournament_leaderboards")
+                .delete()
+                .eq("tournament_id", tournament_id)
+                .in_("player_id", player_ids)
+                .execute()
+            )
+            self.leaderboard_removed += len(player_ids)
+            self.results_dict["leaderboards_removed"] = self.leaderboard_removed
+        except Exception as e:
+            self.logger.error(f"Failed to remove players from {tournament_id}: {e}")
+            self.validators.failed()
+
     def _flush_batch(self):
         if not self._batch:
             return
@@ -200,9 +418,13 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
             )
             self._batch = []
             return
+        self._version = next_version(self._version)
+        for row in self._batch:
+            row["version"] = self._version
         try:
             self.logger.info(
-                f"Upserting {len(self._batch)} LPGA leaderboard rows to Supabase"
+                f"Upserting {len(self._batch)} LPGA leaderboard rows to Supabase "
+                f"(version {self._version})"
             )
             max_attempts = 3
             for attempt in range(1, max_attempts + 1):
@@ -232,6 +454,7 @@ class LpgatourLeaderboardSpider(scrapy.Spider):
                         pass
         except Exception as e:
             self.logger.error(f"Supabase leaderboard upsert failed: {e}")
+            self.validators.failed()
         finally:
             self._batch = []
 
@@ -6,6 +6,11 @@ from typing import Iterable
 from dotenv import load_dotenv, find_dotenv
 from supabase import create_client, Client
 
+from ..feed_cache import invalidate_feed_cache
+from ..fingerprints import RowFingerprints
+from ..httpcache import CACHE_PROFILE_SECS, httpcache_settings, replay_safe
+from ..middlewares import LpgatourScraperDownloaderMiddleware, PageValidators
+
 
 load_dotenv(find_dotenv())
 
@@ -17,6 +22,9 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS": 2,
+        # Conditional requests, so unchanged pages are not downloaded again
+        "DOWNLOADER_MIDDLEWARES": {LpgatourScraperDownloaderMiddleware: 543},
+        **httpcache_settings(CACHE_PROFILE_SECS),
     }
 
     def __init__(self, *args, **kwargs):
@@ -32,9 +40,21 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
         self.players_processed = 0
         self.stats_upserts = 0
         self.tournaments_upserts = 0
+        self.stats_unchanged = 0
+        self.tournaments_unchanged = 0
+        self.stats_fingerprints: RowFingerprints | None = None
+        self.tournaments_fingerprints: RowFingerprints | None = None
+        # Validators of parsed pages, saved once their rows are written
+        self.validators = PageValidators(self)
 
     def start_requests(self) -> Iterable[scrapy.Request]:
         self._init_supabase()
+        self.stats_fingerprints = RowFingerprints(
+            self.supabase, "lpga_players_stats", ["player_id"]
+        )
+        self.tournaments_fingerprints = RowFingerprints(
+            self.supabase, "lpga_players_tournaments", ["player_id", "tournament_id"]
+        )
         if not self.supabase:
             self.logger.error("Supabase not configured; aborting player profile spider")
             return
@@ -54,6 +74,8 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
         self.logger.info(
             f"Loaded {len(players)} unique player URLs from view (lpga_unique_players)"
         )
+        # Lets the API estimate how long the run has left
+        self.results_dict["players_total"] = len(players)
 
         headers = {
             "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -158,10 +180,12 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
         self._upsert_stats_immediate(stats_row)
 
         self._tournaments_batch.extend(tournaments_rows)
+        self.validators.add(response)
         if len(self._tournaments_batch) >= self._batch_size_tournaments:
             self._flush_tournaments()
 
         self.players_processed += 1
+        self.results_dict["players"] = self.players_processed
 
     def closed(self, reason):
         try:
@@ -169,6 +193,7 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
                 self._flush_tournaments()
         except Exception:
             pass
+        self.validators.commit()
         try:
             if isinstance(self.results_dict, dict):
                 self.results_dict["players"] = int(self.players_processed or 0)
@@ -176,8 +201,13 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
                 self.results_dict["tournaments_upserts"] = int(
                     self.tournaments_upserts or 0
                 )
+                self.results_dict["stats_unchanged"] = self.stats_unchanged
+                self.results_dict["tournaments_unchanged"] = self.tournaments_unchanged
         except Exception:
             pass
+        # Feed APIs cache players reads until told they changed
+        if self.stats_upserts or self.tournaments_upserts:
+            invalidate_feed_cache(self.supabase, "players")
         self.logger.info(
             f"Player profile spider closed: {reason}; players_processed={self.players_processed}, "
             f"stats_upserts={self.stats_upserts}, tournaments_upserts={self.tournaments_upserts}"
@@ -192,7 +222,7 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
             self.logger.error("SUPABASE_URL or SUPABASE_KEY missing")
             return
         try:
-            self.supabase = create_client(url, key)
+            self.supabase = replay_safe(create_client(url, key))
             self.logger.info("Supabase client initialized (player profiles)")
         except Exception as e:
             self.logger.error(f"Failed to init Supabase: {e}")
@@ -201,7 +231,11 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
     def _upsert_stats_immediate(self, row: dict):
         if not self.supabase:
             return
-        payload = [row]
+        payload, unchanged = self.stats_fingerprints.split([row])
+        self.stats_unchanged += len(unchanged)
+        self.results_dict["stats_unchanged"] = self.stats_unchanged
+        if not payload:
+            return
         max_attempts = 3
         for attempt in range(1, max_attempts + 1):
             try:
@@ -210,11 +244,13 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
                     .upsert(payload, on_conflict="player_id", returning="minimal")
                     .execute()
                 )
+                self.stats_fingerprints.save(payload)
                 self.stats_upserts += 1
                 return
             except Exception as e:
                 if attempt == max_attempts:
                     self.logger.error(f"Immediate upsert player stats failed: {e}")
+                    self.validators.failed()
                     return
                 self._backoff(attempt, "player stats (immediate)")
 
@@ -222,8 +258,16 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
         if not self._tournaments_batch or not self.supabase:
             self._tournaments_batch = []
             return
+        changed, unchanged = self.tournaments_fingerprints.split(
+            self._tournaments_batch
+        )
+        self.tournaments_unchanged += len(unchanged)
+        self.results_dict["tournaments_unchanged"] = self.tournaments_unchanged
+        self._tournaments_batch = changed
+        if not changed:
+            return
         self.logger.info(
-            f"Upserting {len(self._tournaments_batch)} player tournament rows"
+            f"Upserting {len(changed)} player tournament rows ({len(unchanged)} unchanged)"
         )
         max_attempts = 3
         for attempt in range(1, max_attempts + 1):
@@ -237,6 +281,7 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
                     )
                     .execute()
                 )
+                self.tournaments_fingerprints.save(self._tournaments_batch)
                 self.tournaments_upserts += len(self._tournaments_batch)
                 self._tournaments_batch = []
                 return
@@ -244,6 +289,7 @@ class LpgatourPlayerProfileSpider(scrapy.Spider):
                 if attempt == max_attempts:
                     self.logger.error(f"Upsert player tournaments failed: {e}")
                     self._tournaments_batch = []
+                    self.validators.failed()
                     return
                 self._backoff(attempt, "player tournaments")
 
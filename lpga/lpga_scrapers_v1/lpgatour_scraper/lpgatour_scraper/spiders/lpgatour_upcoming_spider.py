@@ -7,6 +7,11 @@ from urllib.parse import urlencode
 from dotenv import load_dotenv, find_dotenv
 from supabase import create_client, Client
 
+from ..feed_cache import invalidate_feed_cache
+from ..fingerprints import RowFingerprints
+from ..httpcache import CACHE_SCHEDULE_SECS, httpcache_settings, replay_safe
+from ..middlewares import LpgatourScraperDownloaderMiddleware, PageValidators
+
 load_dotenv(find_dotenv())
 
 
@@ -17,6 +22,9 @@ class LpgatourUpcomingSpiderSpider(scrapy.Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS": 4,
+        # Conditional requests, so unchanged pages are not downloaded again
+        "DOWNLOADER_MIDDLEWARES": {LpgatourScraperDownloaderMiddleware: 543},
+        **httpcache_settings(CACHE_SCHEDULE_SECS),
     }
 
     def __init__(self, *args, **kwargs):
@@ -32,9 +40,17 @@ class LpgatourUpcomingSpiderSpider(scrapy.Spider):
             else {}
         )
         self.tournaments_processed = 0
+        self.tournaments_changed = 0
+        self.tournaments_unchanged = 0
+        self.fingerprints: RowFingerprints | None = None
+        # Validators of parsed pages, saved once their rows are written
+        self.validators = PageValidators(self)
 
     def start_requests(self):
         self._init_supabase()
+        self.fingerprints = RowFingerprints(
+            self.supabase, "lpga_tournaments", ["tournament_id"]
+        )
 
         base_url = "https://www.lpga.com/-/tournaments/list"
         # fetch all tournaments for current year
@@ -146,9 +162,11 @@ class LpgatourUpcomingSpiderSpider(scrapy.Spider):
         # Flush remaining
         if self._batch:
             self._flush_batch()
+        self.validators.add(response)
         self.logger.info(f"LPGA tournaments processed: {tournaments_emitted}")
         # Track for API wrappers
         self.tournaments_processed += tournaments_emitted
+        self.results_dict["tournaments"] = self.tournaments_processed
 
     def _init_supabase(self):
         if getattr(self, "supabase", None) is not None:
@@ -160,7 +178,7 @@ class LpgatourUpcomingSpiderSpider(scrapy.Spider):
             self.supabase = None
             return
         try:
-            self.supabase = create_client(url, key)
+            self.supabase = replay_safe(create_client(url, key))
             self.logger.info("Supabase client initialized for LPGA upserts.")
         except Exception as e:
             self.logger.error(f"Failed to init Supabase: {e}")
@@ -176,19 +194,31 @@ class LpgatourUpcomingSpiderSpider(scrapy.Spider):
             self._batch = []
             return
         try:
-            self.logger.info(f"Upserting {len(self._batch)} LPGA rows to Supabase")
+            # Tournaments unchanged since the last run are not rewritten
+            changed, unchanged = self.fingerprints.split(self._batch)
+            self.tournaments_changed += len(changed)
+            self.tournaments_unchanged += len(unchanged)
+            self.results_dict["tournaments_changed"] = self.tournaments_changed
+            self.results_dict["tournaments_unchanged"] = self.tournaments_unchanged
+            if not changed:
+                return
+            self.logger.info(
+                f"Upserting {len(changed)} LPGA rows to Supabase "
+                f"({len(unchanged)} unchanged)"
+            )
             max_attempts = 3
             for attempt in range(1, max_attempts + 1):
                 try:
                     (
                         self.supabase.table("lpga_tournaments")
                         .upsert(
-                            self._batch,
+                            changed,
                             on_conflict="tournament_id",
                             returning="minimal",
                         )
                         .execute()
                     )
+                    self.fingerprints.save(changed)
                     break
                 except Exception as up_e:
                     if attempt == max_attempts:
@@ -206,6 +236,7 @@ class LpgatourUpcomingSpiderSpider(scrapy.Spider):
                         pass
         except Exception as e:
             self.logger.error(f"Supabase upsert failed: {e}")
+            self.validators.failed()
         finally:
             self._batch = []
 
@@ -324,10 +355,16 @@ class LpgatourUpcomingSpiderSpider(scrapy.Spider):
                 self._flush_batch()
         except Exception:
             pass
+        self.validators.commit()
         # Report into provided results dict for API wrapper
         try:
             if isinstance(self.results_dict, dict):
                 self.results_dict["tournaments"] = int(self.tournaments_processed or 0)
+                self.results_dict["tournaments_changed"] = self.tournaments_changed
+                self.results_dict["tournaments_unchanged"] = self.tournaments_unchanged
         except Exception:
             pass
+        # Feed APIs cache tournaments reads until told they changed
+        if self.tournaments_changed:
+            invalidate_feed_cache(self.supabase, "tournaments")
         self.logger.info(f"Spider closed: {reason}")
@@ -1,13 +1,18 @@
 import os
 import logging
+from datetime import datetime
+from typing import Dict, Optional
 
 os.environ["SCRAPY_SETTINGS_MODULE"] = "lpgatour_scraper.settings"
 os.environ["TWISTED_REACTOR"] = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 
-from fastapi import FastAPI, HTTPException, Depends, status, Header
+from fastapi import FastAPI, HTTPException, Depends, Request, status, Header
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from scrapy.crawler import CrawlerRunner
-from crochet import setup, wait_for
+from crochet import setup
+
+from jobs import Job, JobConflict, JobRegistry, Scrape
 
 from lpgatour_scraper.lpgatour_scraper.spiders.lpgatour_upcoming_spider import (
     LpgatourUpcomingSpiderSpider,
@@ -37,43 +42,94 @@ setup()
 app = FastAPI(title="LPGA Scrapers API", version="1.0.0")
 
 
-class TournamentsResponse(BaseModel):
+class JobAccepted(BaseModel):
     message: str
-    tournaments_processed: int
+    job_id: str
+    status: str
+    status_url: str
 
 
-class LeaderboardsResponse(BaseModel):
-    message: str
-    leaderboards_processed: int
+class JobProgress(BaseModel):
+    rows_processed: int
+    rows_total: Optional[int] = None
+    rate_per_second: float
+    elapsed_seconds: float
+    eta_seconds: Optional[float] = None
 
 
-class PlayersResponse(BaseModel):
-    message: str
-    players_processed: int
-    stats_upserts: int | None = None
-    tournaments_upserts: int | None = None
+class JobStatusResponse(BaseModel):
+    job_id: str
+    name: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: JobProgress
+    counts: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
 
 
-spider_results: dict = {}
 runner = CrawlerRunner()
+jobs = JobRegistry(runner)
 
-
-@wait_for(timeout=180.0)
-def run_lpga_upcoming():
-    kwargs = {"results_dict": spider_results}
-    return runner.crawl(LpgatourUpcomingSpiderSpider, **kwargs)
+TOURNAMENTS = Scrape(
+    "lpga/scrape/tournaments",
+    LpgatourUpcomingSpiderSpider,
+    {
+        "tournaments": "tournaments_processed",
+        "pages_not_modified": "tournaments_not_modified",
+        "tournaments_changed": "tournaments_changed",
+        "tournaments_unchanged": "tournaments_unchanged",
+    },
+    timeout=180.0,
+)
+LEADERBOARDS = Scrape(
+    "lpga/scrape/leaderboards",
+    LpgatourLeaderboardSpider,
+    {
+        "leaderboards": "leaderboards_processed",
+        "pages_not_modified": "leaderboards_not_modified",
+        "leaderboards_changed": "leaderboards_changed",
+        "leaderboards_unchanged": "leaderboards_unchanged",
+        "leaderboards_skipped": "leaderboards_skipped",
+    },
+    timeout=1800.0,
+)
+PLAYERS = Scrape(
+    "lpga/scrape/players",
+    LpgatourPlayerProfileSpider,
+    {
+        "players": "players_processed",
+        "pages_not_modified": "players_not_modified",
+        "stats_upserts": "stats_upserts",
+        "stats_unchanged": "stats_unchanged",
+        "tournaments_upserts": "tournaments_upserts",
+        "tournaments_unchanged": "tournaments_unchanged",
+    },
+    timeout=3600.0,
+)
 
 
-@wait_for(timeout=1800.0)
-def run_lpga_leaderboards():
-    kwargs = {"results_dict": spider_results}
-    return runner.crawl(LpgatourLeaderboardSpider, **kwargs)
+def accepted(job: Job, message: str) -> JobAccepted:
+    return JobAccepted(
+        message=message,
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/lpga/jobs/{job.id}",
+    )
 
 
-@wait_for(timeout=3600.0)
-def run_lpga_players():
-    kwargs = {"results_dict": spider_results}
-    return runner.crawl(LpgatourPlayerProfileSpider, **kwargs)
+@app.exception_handler(JobConflict)
+async def job_conflict(request: Request, exc: JobConflict) -> JSONResponse:
+    """409 naming the run in the way, so the caller can poll it instead."""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={
+            "detail": str(exc),
+            "job_id": exc.job.id,
+            "status_url": f"/lpga/jobs/{exc.job.id}",
+        },
+    )
 
 
 async def authorize_request(x_api_key: str = Header(None)):
@@ -106,81 +162,49 @@ async def startup_event():
         raise
 
 
-@app.post("/lpga/scrape/tournaments", response_model=TournamentsResponse)
+@app.post(
+    "/lpga/scrape/tournaments",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
 # async def scrape_lpga_tournaments(api_key: str = Depends(authorize_request)):
 async def scrape_lpga_tournaments():
-    try:
-        logging.info("lpga/scrape/tournaments started")
-        spider_results["tournaments"] = 0
-        run_lpga_upcoming()
-        tournaments_processed = int(spider_results.get("tournaments", 0))
-        if "tournaments" in spider_results:
-            del spider_results["tournaments"]
-        logging.info(
-            f"lpga/scrape/tournaments completed (tournaments_processed={tournaments_processed})"
-        )
-        return TournamentsResponse(
-            message="Tournaments scraped successfully",
-            tournaments_processed=tournaments_processed,
-        )
-    except Exception as e:
-        logging.error(f"Error during LPGA tournament scraping: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"LPGA tournament scraping failed: {str(e)}"
-        )
+    """Queue a scrape of LPGA tournaments"""
+    job = jobs.submit(TOURNAMENTS)
+    return accepted(job, "Tournament scrape accepted")
 
 
-@app.post("/lpga/scrape/leaderboards", response_model=LeaderboardsResponse)
-# async def scrape_lpga_leaderboards(api_key: str = Depends(authorize_request)):
-async def scrape_lpga_leaderboards():
-    try:
-        logging.info("lpga/scrape/leaderboards started")
-        spider_results["leaderboards"] = 0
-        run_lpga_leaderboards()
-        leaderboards_processed = int(spider_results.get("leaderboards", 0))
-        if "leaderboards" in spider_results:
-            del spider_results["leaderboards"]
-        logging.info(
-            f"lpga/scrape/leaderboards completed (leaderboards_processed={leaderboards_processed})"
-        )
-        return LeaderboardsResponse(
-            message="Leaderboards scraped successfully",
-            leaderboards_processed=leaderboards_processed,
-        )
-    except Exception as e:
-        logging.error(f"Error during LPGA leaderboard scraping: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"LPGA leaderboard scraping failed: {str(e)}"
-        )
-
-
-@app.post("/lpga/scrape/players", response_model=PlayersResponse)
+@app.post(
+    "/lpga/scrape/leaderboards",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
+# async def scrape_lpga_leaderboards(full: bool = False, api_key: str = Depends(authorize_request)):
+async def scrape_lpga_leaderboards(full: bool = False):
+    """Queue a scrape of due LPGA leaderboards; `full` also redoes frozen ones"""
+    job = jobs.submit(
+        LEADERBOARDS._replace(kwargs={"full": True}) if full else LEADERBOARDS
+    )
+    return accepted(job, "Leaderboard scrape accepted")
+
+
+@app.post(
+    "/lpga/scrape/players",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
 # async def scrape_lpga_players(api_key: str = Depends(authorize_request)):
 async def scrape_lpga_players():
-    try:
-        logging.info("lpga/scrape/players started")
-        spider_results["players"] = 0
-        spider_results["stats_upserts"] = 0
-        spider_results["tournaments_upserts"] = 0
-        run_lpga_players()
-        players_processed = int(spider_results.get("players", 0))
-        stats_upserts = int(spider_results.get("stats_upserts", 0))
-        tournaments_upserts = int(spider_results.get("tournaments_upserts", 0))
-        for k in ["players", "stats_upserts", "tournaments_upserts"]:
-            if k in spider_results:
-                del spider_results[k]
-        logging.info(
-            f"lpga/scrape/players completed (players_processed={players_processed}, "
-            f"stats_upserts={stats_upserts}, tournaments_upserts={tournaments_upserts})"
-        )
-        return PlayersResponse(
-            message="Players scraped successfully",
-            players_processed=players_processed,
-            stats_upserts=stats_upserts,
-            tournaments_upserts=tournaments_upserts,
-        )
-    except Exception as e:
-        logging.error(f"Error during LPGA players scraping: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"LPGA players scraping failed: {str(e)}"
-        )
+    """Queue a scrape of LPGA player profiles and results"""
+    job = jobs.submit(PLAYERS)
+    return accepted(job, "Player scrape accepted")
+
+
+@app.get("/lpga/jobs/{job_id}", response_model=JobStatusResponse)
+# async def get_job(job_id: str, api_key: str = Depends(authorize_request)):
+async def get_job(job_id: str):
+    """Progress of a scrape job while it runs, and its counts once finished"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.snapshot()
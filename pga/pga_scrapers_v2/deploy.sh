@@ -2,4 +2,5 @@ gcloud run deploy pga-scraper-v2 \
   --source . \
   --region us-west1 \
   --platform managed \
+  --max-instances 1 \
   --project gcp_project_name 
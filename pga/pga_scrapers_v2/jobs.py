@@ -0,0 +1,333 @@
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from crochet import run_in_reactor
+from scrapy.crawler import Crawler, CrawlerRunner
+from twisted.internet.defer import Deferred
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for /jobs/{id}; the oldest are forgotten beyond this
+SCRAPE_JOBS_KEEP = int(os.environ.get("SCRAPE_JOBS_KEEP", "100"))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class Scrape(NamedTuple):
+    """A spider run as a job, and what the job reports about it.
+
+    `counts` maps the spider's results_dict keys to the names reported in
+    the final counts; the first key is the running rows-processed figure.
+    `kwargs` are extra spider arguments (None for none).
+    """
+
+    name: str
+    spidercls: type
+    counts: Dict[str, str]
+    timeout: float
+    kwargs: Optional[Dict[str, Any]] = None
+
+
+class Job(ABC):
+    """Status and timing shared by spider runs and pipelines."""
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = "queued"
+        self.created_at = _now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.final_counts: Optional[Dict[str, int]] = None
+        self.error: Optional[str] = None
+        self._started = 0.0
+        self._elapsed: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def elapsed(self) -> float:
+        if self._elapsed is not None:
+            return self._elapsed
+        return time.monotonic() - self._started if self._started else 0.0
+
+    @abstractmethod
+    def progress(self) -> Dict[str, Any]:
+        """The running figures reported in /jobs/{id} while the job runs."""
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The /jobs/{id} payload."""
+        return {
+            "job_id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress(),
+            "counts": self.final_counts,
+            "error": self.error,
+        }
+
+    def _begin(self) -> None:
+        self.status = "running"
+        self.started_at = _now()
+        self._started = time.monotonic()
+        logger.info(f"{self.name} started (job {self.id})")
+
+    def _end(self, error: Optional[str], counts: Dict[str, int]) -> None:
+        self._elapsed = time.monotonic() - self._started
+        self.final_counts = counts
+        self.finished_at = _now()
+        self.error = error
+        self.status = "failed" if error else "succeeded"
+        summary = ", ".join(f"{k}={v}" for k, v in counts.items())
+        if error:
+            logger.error(f"{self.name} failed (job {self.id}, {summary}): {error}")
+        else:
+            logger.info(
+                f"{self.name} completed (job {self.id}, {summary}) "
+                f"in {self._elapsed:.1f}s"
+            )
+
+
+class ScrapeJob(Job):
+    """One background spider run.
+
+    `results` is this run's own results_dict, so runs never see each
+    other's counts. A spider that knows up front how many rows it will
+    process publishes that as "<key>_total", which the ETA is estimated
+    from.
+    """
+
+    def __init__(self, scrape: Scrape):
+        super().__init__(scrape.name)
+        # A copy of its own, so jobs never share (or compare None to {}) kwargs
+        self.scrape = scrape._replace(kwargs=dict(scrape.kwargs or {}))
+        self.crawler: Optional[Crawler] = None
+        self.results: Dict[str, Any] = {}
+        self.timed_out = False
+
+    def progress(self) -> Dict[str, Any]:
+        key = next(iter(self.scrape.counts))
+        rows = int(self.results.get(key) or 0)
+        total = self.results.get(f"{key}_total")
+        elapsed = self.elapsed()
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.status == "running" and total is not None and rate > 0:
+            eta = round(max(int(total) - rows, 0) / rate, 1)
+        return {
+            "rows_processed": rows,
+            "rows_total": int(total) if total is not None else None,
+            "rate_per_second": round(rate, 2),
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": eta,
+        }
+
+    def _start(self) -> None:
+        for key in self.scrape.counts:
+            self.results[key] = 0
+        self._begin()
+
+    def _finish(self, error: Optional[str]) -> None:
+        counts = {
+            label: int(self.results.get(key) or 0)
+            for key, label in self.scrape.counts.items()
+        }
+        self._end(error, counts)
+
+    def _skip(self, reason: str) -> None:
+        self.status = "skipped"
+        self.finished_at = _now()
+        self.error = reason
+        logger.warning(f"{self.name} skipped (job {self.id}): {reason}")
+
+    def _succeeded(self, _: Any) -> None:
+        if self.timed_out:
+            self._finish(f"Timed out after {self.scrape.timeout:.0f}s")
+        else:
+            self._finish(None)
+
+    def _failed(self, failure: Any) -> None:
+        self._finish(str(failure.value))
+
+    def _expire(self) -> None:
+        # Graceful stop: the spider's closed() still flushes its batches
+        self.timed_out = True
+        self.crawler.stop()
+
+
+def _run(runner: CrawlerRunner, job: ScrapeJob) -> Optional[Deferred]:
+    """Start `job`'s crawl; call in the reactor thread."""
+    from twisted.internet import reactor
+
+    job._start()
+    try:
+        job.crawler = runner.create_crawler(job.scrape.spidercls)
+        d = runner.crawl(job.crawler, results_dict=job.results, **job.scrape.kwargs)
+    except Exception as e:
+        job._finish(str(e))
+        return None
+    timer = reactor.callLater(job.scrape.timeout, job._expire)
+    d.addCallbacks(job._succeeded, job._failed)
+    d.addBoth(lambda _: timer.cancel() if timer.active() else None)
+    return d
+
+
+@run_in_reactor
+def _crawl(runner: CrawlerRunner, job: ScrapeJob):
+    return _run(runner, job)
+
+
+class PipelineJob(Job):
+    """Several spiders run as one job, in dependency order.
+
+    `stages` pairs each scrape with the names of the scrapes it needs,
+    listed so that every stage comes after the ones it needs. A stage
+    starts as soon as all of those succeeded, so independent stages crawl
+    at the same time; a stage whose dependency did not succeed is skipped.
+    """
+
+    def __init__(self, name: str, stages: Sequence[Tuple[Scrape, Sequence[str]]]):
+        super().__init__(name)
+        self.stages: List[Tuple[ScrapeJob, Tuple[str, ...]]] = [
+            (ScrapeJob(scrape), tuple(after)) for scrape, after in stages
+        ]
+
+    def progress(self) -> Dict[str, Any]:
+        rows = sum(job.progress()["rows_processed"] for job, _ in self.stages)
+        elapsed = self.elapsed()
+        return {
+            "rows_processed": rows,
+            "rows_total": None,
+            "rate_per_second": round(rows / elapsed, 2) if elapsed > 0 else 0.0,
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": None,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The /jobs/{id} payload, with one entry per stage."""
+        return {
+            **super().snapshot(),
+            "stages": [job.snapshot() for job, _ in self.stages],
+        }
+
+    def _advance(self, runner: CrawlerRunner) -> None:
+        """Start every stage that became ready; call in the reactor thread."""
+        if self.status == "queued":
+            self._begin()
+        by_name = {job.name: job for job, _ in self.stages}
+        for job, after in self.stages:
+            if job.status != "queued":
+                continue
+            needs = [by_name[name] for name in after]
+            blocked = [n.name for n in needs if n.status in ("failed", "skipped")]
+            if blocked:
+                job._skip(f"{', '.join(blocked)} did not succeed")
+            elif all(n.status == "succeeded" for n in needs):
+                d = _run(runner, job)
+                if d is not None:
+                    d.addBoth(lambda _: self._advance(runner))
+        if self.active and not any(job.active for job, _ in self.stages):
+            self._finish()
+
+    def _finish(self) -> None:
+        unfinished = [job.name for job, _ in self.stages if job.status != "succeeded"]
+        counts = {}
+        for job, _ in self.stages:
+            counts.update(job.final_counts or {})
+        error = f"Did not succeed: {', '.join(unfinished)}" if unfinished else None
+        self._end(error, counts)
+
+
+@run_in_reactor
+def _run_pipeline(runner: CrawlerRunner, pipeline: PipelineJob):
+    pipeline._advance(runner)
+
+
+class JobConflict(Exception):
+    """A scrape was requested while the same spider runs with other arguments."""
+
+    def __init__(self, job: Job):
+        super().__init__(f"{job.name} is already running (job {job.id})")
+        self.job = job
+
+
+class JobRegistry:
+    """Scrape jobs of this process, looked up by id.
+
+    Crawls run in the crochet reactor thread, so a scrape endpoint returns
+    as soon as its job is queued instead of holding the request (and the
+    event loop) until the spider closes.
+    """
+
+    def __init__(self, runner: CrawlerRunner):
+        self.runner = runner
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def active(self, name: str) -> Optional[Job]:
+        for job in self._jobs.values():
+            if job.name == name and job.active:
+                return job
+        return None
+
+    def submit(self, scrape: Scrape) -> Job:
+        """Queue a run of `scrape`, or return the one already under way.
+
+        Different scrapes run side by side, but a spider never runs twice
+        at once: two runs would race on the same upserts, fingerprints and
+        counters. A repeat of one still going (on its own or as a pipeline
+        stage) with the same arguments joins that job; with other arguments
+        it raises JobConflict.
+        """
+        job = self.active(scrape.name)
+        if job is not None:
+            if job.scrape.kwargs == (scrape.kwargs or {}):
+                return job
+            raise JobConflict(job)
+        job = ScrapeJob(scrape)
+        self._add(job)
+        _crawl(self.runner, job)
+        return job
+
+    def submit_pipeline(
+        self, name: str, stages: Sequence[Tuple[Scrape, Sequence[str]]]
+    ) -> Job:
+        """Queue a PipelineJob, or return the one already under way.
+
+        Each stage is registered as a job of its own too, so its id from
+        the pipeline's `stages` can be polled directly. Raises JobConflict
+        if one of its spiders is already running on its own.
+        """
+        job = self.active(name)
+        if job is not None:
+            return job
+        for scrape, _ in stages:
+            running = self.active(scrape.name)
+            if running is not None:
+                raise JobConflict(running)
+        pipeline = PipelineJob(name, stages)
+        self._add(pipeline)
+        for stage, _ in pipeline.stages:
+            self._add(stage)
+        _run_pipeline(self.runner, pipeline)
+        return pipeline
+
+    def _add(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        finished = [j.id for j in self._jobs.values() if not j.active]
+        for job_id in finished[: max(len(finished) - SCRAPE_JOBS_KEEP, 0)]:
+            del self._jobs[job_id]
@@ -4,10 +4,16 @@ os.environ["SCRAPY_SETTINGS_MODULE"] = "pgatour_scraper.settings"
 os.environ["TWISTED_REACTOR"] = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 
 import logging
-from fastapi import FastAPI, HTTPException, Depends, status, Header
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Depends, Request, status, Header
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from scrapy.crawler import CrawlerRunner
-from crochet import setup, wait_for
+from crochet import setup
+
+from jobs import Job, JobConflict, JobRegistry, Scrape
 from pgatour_scraper.pgatour_scraper.spiders.pgatour_upcoming_spider import (
     PgatourUpcomingSpider,
 )
@@ -43,53 +49,121 @@ setup()
 app = FastAPI(title="PGA Tour Scrapers API", version="1.0.0")
 
 
-# Response models (endpoint-specific minimal payloads)
-class TournamentsResponse(BaseModel):
+# Response models
+class JobAccepted(BaseModel):
     message: str
-    tournaments_processed: int
+    job_id: str
+    status: str
+    status_url: str
 
 
-class LeaderboardsResponse(BaseModel):
-    message: str
-    leaderboard_processed: int
+class JobProgress(BaseModel):
+    rows_processed: int
+    rows_total: Optional[int] = None
+    rate_per_second: float
+    elapsed_seconds: float
+    eta_seconds: Optional[float] = None
 
 
-class PlayersResponse(BaseModel):
-    message: str
-    players_processed: int
-
-
-class CourseStatsResponse(BaseModel):
-    message: str
-    course_stats_processed: int
+class JobStatusResponse(BaseModel):
+    job_id: str
+    name: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: JobProgress
+    counts: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
+    # Pipelines only: one entry per spider, with its own timing
+    stages: Optional[List["JobStatusResponse"]] = None
 
 
-# Global results storage
-spider_results = {}
-
 # Crawler runner
 runner = CrawlerRunner()
 
+# Background scrape jobs, polled through /pga/jobs/{job_id}
+jobs = JobRegistry(runner)
 
-@wait_for(timeout=100.0)
-def run_upcoming_spider():
-    return runner.crawl(PgatourUpcomingSpider, results_dict=spider_results)
-
-
+TOURNAMENTS = Scrape(
+    "pga/scrape/tournaments",
+    PgatourUpcomingSpider,
+    {
+        "tournaments": "tournaments_processed",
+        "pages_not_modified": "tournaments_not_modified",
+        "tournaments_changed": "tournaments_changed",
+        "tournaments_unchanged": "tournaments_unchanged",
+    },
+    timeout=100.0,
+)
 # 30 minutes timeout for long-running scrapers
-@wait_for(timeout=1800.0)
-def run_leaderboard_spider():
-    return runner.crawl(PgatourLeaderboardSpider, results_dict=spider_results)
-
-
-@wait_for(timeout=1800.0)
-def run_player_detail_spider():
-    return runner.crawl(PgatourPlayerDetailSpider, results_dict=spider_results)
-
+LEADERBOARDS = Scrape(
+    "pga/scrape/leaderboards",
+    PgatourLeaderboardSpider,
+    {
+        "leaderboards": "leaderboard_processed",
+        "pages_not_modified": "leaderboards_not_modified",
+        "leaderboards_changed": "leaderboards_changed",
+        "leaderboards_unchanged": "leaderboards_unchanged",
+        "leaderboards_skipped": "leaderboards_skipped",
+    },
+    timeout=1800.0,
+)
+PLAYERS = Scrape(
+    "pga/scrape/players",
+    PgatourPlayerDetailSpider,
+    {
+        "players": "players_processed",
+        "pages_not_modified": "players_not_modified",
+        "players_changed": "players_changed",
+        "players_unchanged": "players_unchanged",
+        "players_skipped": "players_skipped",
+    },
+    timeout=1800.0,
+)
+COURSE_STATS = Scrape(
+    "pga/scrape/course-stats",
+    PgatourCourseStatsSpider,
+    {
+        "course_stats": "course_stats_processed",
+        "pages_not_modified": "course_stats_not_modified",
+        "course_stats_changed": "course_stats_changed",
+        "course_stats_unchanged": "course_stats_unchanged",
+    },
+    timeout=1800.0,
+)
 
-@wait_for(timeout=1800.0)
-def run_course_stats_spider():
-    return runner.crawl(PgatourCourseStatsSpider, results_dict=spider_results)
+# /pga/scrape/all, each stage with the stages it waits for. Leaderboards and
+# course stats only need the tournaments; players are read from the
+# unique_players view over the leaderboards.
+SCRAPE_ALL = [
+    (TOURNAMENTS, ()),
+    (LEADERBOARDS, (TOURNAMENTS.name,)),
+    (COURSE_STATS, (TOURNAMENTS.name,)),
+    (PLAYERS, (LEADERBOARDS.name,)),
+]
+
+
+def accepted(job: Job, message: str) -> JobAccepted:
+    return JobAccepted(
+        message=message,
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/pga/jobs/{job.id}",
+    )
+
+
+@app.exception_handler(JobConflict)
+async def job_conflict(request: Request, exc: JobConflict) -> JSONResponse:
+    """409 naming the run in the way, so the caller can poll it instead."""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={
+            "detail": str(exc),
+            "job_id": exc.job.id,
+            "status_url": f"/pga/jobs/{exc.job.id}",
+        },
+    )
 
 
 async def authorize_request(x_api_key: str = Header(None)):
@@ -127,143 +201,73 @@ async def startup_event():
         raise
 
 
-@app.post("/pga/scrape/tournaments", response_model=TournamentsResponse)
+@app.post(
+    "/pga/scrape/tournaments",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
 # async def scrape_tournaments(api_key: str = Depends(authorize_request)):
 async def scrape_tournaments():
-    """Scrape upcoming and completed tournaments"""
-    try:
-        logging.info("pga/scrape/tournaments started")
-        spider_results["tournaments"] = 0
-        run_upcoming_spider()
-        tournaments_processed = spider_results.get("tournaments", 0)
-        del spider_results["tournaments"]
-
-        logging.info(
-            f"pga/scrape/tournaments completed (tournaments_processed={tournaments_processed})"
-        )
-        return TournamentsResponse(
-            message="Tournaments scraped successfully",
-            tournaments_processed=tournaments_processed,
-        )
-    except Exception as e:
-        logging.error(f"Error during tournament scraping: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"Tournament scraping failed: {str(e)}"
-        )
+    """Queue a scrape of upcoming and completed tournaments"""
+    job = jobs.submit(TOURNAMENTS)
+    return accepted(job, "Tournament scrape accepted")
 
 
-@app.post("/pga/scrape/leaderboards", response_model=LeaderboardsResponse)
-# async def scrape_leaderboards(api_key: str = Depends(authorize_request)):
-async def scrape_leaderboards():
-    """Scrape tournament leaderboards"""
-    try:
-        logging.info("pga/scrape/leaderboards started")
-        spider_results["leaderboards"] = 0
-        run_leaderboard_spider()
-        leaderboard_processed = spider_results.get("leaderboards", 0)
-        del spider_results["leaderboards"]
-
-        logging.info(
-            f"pga/scrape/leaderboards completed (leaderboard_processed={leaderboard_processed})"
-        )
-        return LeaderboardsResponse(
-            message="Leaderboards scraped successfully",
-            leaderboard_processed=leaderboard_processed,
-        )
-    except Exception as e:
-        logging.error(f"Error during leaderboard scraping: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"Leaderboard scraping failed: {str(e)}"
-        )
-
-
-@app.post("/pga/scrape/players", response_model=PlayersResponse)
-# async def scrape_players(api_key: str = Depends(authorize_request)):
-async def scrape_players():
-    """Scrape player details (this may take 15-20 minutes)"""
-    try:
-        logging.info("pga/scrape/players started")
-        spider_results["players"] = 0
-        run_player_detail_spider()
-        players_processed = spider_results.get("players", 0)
-        del spider_results["players"]
-
-        logging.info(
-            f"pga/scrape/players completed (players_processed={players_processed})"
-        )
-        return PlayersResponse(
-            message="Player details scraped successfully",
-            players_processed=players_processed,
-        )
-    except Exception as e:
-        logging.error(f"Error during player scraping: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Player scraping failed: {str(e)}")
+@app.post(
+    "/pga/scrape/leaderboards",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
+# async def scrape_leaderboards(full: bool = False, api_key: str = Depends(authorize_request)):
+async def scrape_leaderboards(full: bool = False):
+    """Queue a scrape of due tournament leaderboards; `full` also redoes frozen ones"""
+    job = jobs.submit(
+        LEADERBOARDS._replace(kwargs={"full": True}) if full else LEADERBOARDS
+    )
+    return accepted(job, "Leaderboard scrape accepted")
+
+
+@app.post(
+    "/pga/scrape/players",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
+# async def scrape_players(full: bool = False, api_key: str = Depends(authorize_request)):
+async def scrape_players(full: bool = False):
+    """Queue a scrape of player details; `full` also redoes recently scraped ones"""
+    job = jobs.submit(PLAYERS._replace(kwargs={"full": True}) if full else PLAYERS)
+    return accepted(job, "Player detail scrape accepted")
 
 
-@app.post("/pga/scrape/course-stats", response_model=CourseStatsResponse)
+@app.post(
+    "/pga/scrape/course-stats",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
 # async def scrape_course_stats(api_key: str = Depends(authorize_request)):
 async def scrape_course_stats():
-    """Scrape course statistics"""
-    try:
-        logging.info("pga/scrape/course-stats started")
-        spider_results["course_stats"] = 0
-        run_course_stats_spider()
-        course_stats_processed = spider_results.get("course_stats", 0)
-        del spider_results["course_stats"]
-
-        logging.info(
-            f"pga/scrape/course-stats completed (course_stats_processed={course_stats_processed})"
-        )
-        return CourseStatsResponse(
-            message="Course statistics scraped successfully",
-            course_stats_processed=course_stats_processed,
-        )
-    except Exception as e:
-        logging.error(f"Error during course stats scraping: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"Course stats scraping failed: {str(e)}"
-        )
+    """Queue a scrape of course statistics"""
+    job = jobs.submit(COURSE_STATS)
+    return accepted(job, "Course statistics scrape accepted")
 
 
-## @app.post("/scrape/all", response_model=ScraperResponse)
-## async def scrape_all(api_key: str = Depends(authorize_request)):
-##     """Run all scrapers in sequence (this may take 30+ minutes)"""
-##     try:
-##         results = {
-##             "tournaments_processed": 0,
-##             "players_processed": 0,
-##             "course_stats_processed": 0,
-##         }
-##
-##         # 1. Scrape tournaments first
-##         logging.info("Starting tournament scraping...")
-##         spider_results["tournaments"] = 0
-##         run_upcoming_spider()
-##         results["tournaments_processed"] = spider_results.get("tournaments", 0)
-##         del spider_results["tournaments"]
-##
-##         # 2. Scrape leaderboards
-##         logging.info("Starting leaderboard scraping...")
-##         spider_results["leaderboards"] = 0
-##         run_leaderboard_spider()
-##         results["players_processed"] = spider_results.get("leaderboards", 0)
-##         del spider_results["leaderboards"]
-##
-##         # 3. Scrape player details
-##         logging.info("Starting player detail scraping...")
-##         spider_results["players"] = 0
-##         run_player_detail_spider()
-##         results["players_processed"] = spider_results.get("players", 0)
-##         del spider_results["players"]
-##
-##         # 4. Scrape course stats
-##         logging.info("Starting course stats scraping...")
-##         spider_results["course_stats"] = 0
-##         run_course_stats_spider()
-##         results["course_stats_processed"] = spider_results.get("course_stats", 0)
-##         del spider_results["course_stats"]
-##
-##         return ScraperResponse(message="All scrapers completed successfully", **results)
-##     except Exception as e:
-##         logging.error(f"Error during full scraping: {e}", exc_info=True)
-##         raise HTTPException(status_code=500, detail=f"Full scraping failed: {str(e)}")
+@app.post(
+    "/pga/scrape/all",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobAccepted,
+)
+# async def scrape_all(api_key: str = Depends(authorize_request)):
+async def scrape_all():
+    """Queue every scraper as one pipeline, running independent ones at once"""
+    job = jobs.submit_pipeline("pga/scrape/all", SCRAPE_ALL)
+    return accepted(job, "Full scrape accepted")
+
+
+@app.get("/pga/jobs/{job_id}", response_model=JobStatusResponse)
+# async def get_job(job_id: str, api_key: str = Depends(authorize_request)):
+async def get_job(job_id: str):
+    """Progress of a scrape job while it runs, and its counts once finished"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.snapshot()
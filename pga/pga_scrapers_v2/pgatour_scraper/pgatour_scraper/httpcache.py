@@ -0,0 +1,163 @@
+import logging
+import os
+import pickle
+import shutil
+from pathlib import Path
+from time import time
+from types import SimpleNamespace
+
+from scrapy.extensions.httpcache import FilesystemCacheStorage
+
+logger = logging.getLogger(__name__)
+
+# "off", "on" (serve cached pages until they expire, fetch and cache the
+# rest) or "replay" (serve cached pages however old, never the network)
+SCRAPE_HTTPCACHE = os.environ.get("SCRAPE_HTTPCACHE", "off").lower()
+# Replays write nothing: not to Supabase, nor to the feed APIs' caches
+REPLAY = SCRAPE_HTTPCACHE == "replay"
+SCRAPE_HTTPCACHE_DIR = os.environ.get("SCRAPE_HTTPCACHE_DIR", "httpcache")
+# Per spider; the oldest pages are evicted beyond this
+SCRAPE_HTTPCACHE_MAX_MB = float(os.environ.get("SCRAPE_HTTPCACHE_MAX_MB", "500"))
+
+# Expiries for spiders and requests to pick from; 0 never expires
+CACHE_LIVE_SECS = 300
+CACHE_SCHEDULE_SECS = 3600
+CACHE_PROFILE_SECS = 24 * 3600
+CACHE_FOREVER = 0
+
+# Never cached: revalidations, blocks and transient errors
+CACHE_IGNORE_HTTP_CODES = [304, 403, 429, 500, 502, 503, 504]
+
+
+def httpcache_settings(expiration_secs: int) -> dict:
+    """custom_settings for the response cache, as set by SCRAPE_HTTPCACHE.
+
+    `expiration_secs` is the spider's default; a request can set its own
+    with meta "cache_expiration_secs". The API's CrawlerRunner does not
+    read settings.py, so spiders merge these into their custom_settings.
+    """
+    if SCRAPE_HTTPCACHE not in ("on", "replay"):
+        return {}
+    replay = REPLAY
+    return {
+        "HTTPCACHE_ENABLED": True,
+        "HTTPCACHE_STORAGE": BoundedCacheStorage,
+        "HTTPCACHE_DIR": SCRAPE_HTTPCACHE_DIR,
+        "HTTPCACHE_GZIP": True,
+        "HTTPCACHE_EXPIRATION_SECS": expiration_secs,
+        "HTTPCACHE_IGNORE_HTTP_CODES": CACHE_IGNORE_HTTP_CODES,
+        # Requests missing from the cache are dropped instead of fetched
+        "HTTPCACHE_IGNORE_MISSING": replay,
+        "HTTPCACHE_REPLAY": replay,
+        "HTTPCACHE_MAX_MB": SCRAPE_HTTPCACHE_MAX_MB,
+    }
+
+
+def replay_safe(client):
+    """`client` as the spiders should use it: read-only in replay mode.
+
+    Replayed pages can be of any age, so their rows must not reach the
+    tables the feed APIs serve. Reads (tournament lists, stored rows,
+    fingerprints) still go through, so a replay runs the spider as usual.
+    """
+    if not REPLAY or client is None:
+        return client
+    logger.info("Replay run: Supabase writes are skipped")
+    return ReadOnlyClient(client)
+
+
+class ReadOnlyClient:
+    """Supabase client whose inserts, upserts, updates and deletes do nothing."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str):
+        return _ReadOnlyTable(self._client.table(name))
+
+
+class _ReadOnlyTable:
+    def __init__(self, table):
+        self._table = table
+
+    def select(self, *args, **kwargs):
+        return self._table.select(*args, **kwargs)
+
+    def _skip(self, *args, **kwargs):
+        return _SkippedWrite()
+
+    insert = upsert = update = delete = _skip
+
+
+class _SkippedWrite:
+    """Stands in for a write's query builder: takes any filter, writes nothing."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=[], count=None)
+
+
+class BoundedCacheStorage(FilesystemCacheStorage):
+    """Gzipped filesystem cache, keyed by request URL, bounded in size.
+
+    Expiry is checked per request, so one spider can keep historical
+    pages forever and refetch live ones within minutes; in replay mode
+    nothing expires. When a spider's cache grows past HTTPCACHE_MAX_MB,
+    the oldest pages are evicted down to 90% of it.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.replay = settings.getbool("HTTPCACHE_REPLAY")
+        self.max_bytes = int(settings.getfloat("HTTPCACHE_MAX_MB", 500) * 1024**2)
+        self._size = 0
+
+    def open_spider(self, spider):
+        super().open_spider(spider)
+        self._size = sum(_entry_size(e) for e in self._entries(spider))
+
+    def store_response(self, spider, request, response):
+        # Request headers may carry proxy credentials and are not needed
+        # to replay a response, so they are not written to disk
+        request = request.replace(headers={})
+        rpath = Path(self._get_request_path(spider, request))
+        self._size -= _entry_size(rpath)
+        super().store_response(spider, request, response)
+        self._size += _entry_size(rpath)
+        if self._size > self.max_bytes:
+            self._evict(spider)
+
+    def _read_meta(self, spider, request):
+        metapath = Path(self._get_request_path(spider, request)) / "pickled_meta"
+        if not metapath.exists():
+            return None
+        expiration = request.meta.get("cache_expiration_secs", self.expiration_secs)
+        if not self.replay and 0 < expiration < time() - metapath.stat().st_mtime:
+            return None
+        with self._open(metapath, "rb") as f:
+            return pickle.load(f)
+
+    def _entries(self, spider):
+        return Path(self.cachedir, spider.name).glob("*/*")
+
+    def _evict(self, spider):
+        entries = sorted(
+            (e for e in self._entries(spider) if (e / "pickled_meta").exists()),
+            key=lambda e: (e / "pickled_meta").stat().st_mtime,
+        )
+        evicted = 0
+        for entry in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            self._size -= _entry_size(entry)
+            shutil.rmtree(entry, ignore_errors=True)
+            evicted += 1
+        logger.info(f"HTTP cache of {spider.name} over its bound; evicted {evicted}")
+
+
+def _entry_size(path: Path) -> int:
+    if not path.is_dir():
+        return 0
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
@@ -4,6 +4,11 @@ import scrapy
 from dotenv import load_dotenv, find_dotenv
 from supabase import create_client, Client
 
+from ..feed_cache import invalidate_feed_cache
+from ..fingerprints import RowFingerprints
+from ..httpcache import CACHE_SCHEDULE_SECS, httpcache_settings, replay_safe
+from ..middlewares import PageValidators, PgatourScraperDownloaderMiddleware
+
 load_dotenv(find_dotenv())
 
 
@@ -13,6 +18,9 @@ class PgatourCourseStatsSpider(scrapy.Spider):
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS": 4,
         "DOWNLOAD_DELAY": 1,
+        # Conditional requests, so unchanged pages are not downloaded again
+        "DOWNLOADER_MIDDLEWARES": {PgatourScraperDownloaderMiddleware: 543},
+        **httpcache_settings(CACHE_SCHEDULE_SECS),
     }
     headers = {
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -27,6 +35,15 @@ class PgatourCourseStatsSpider(scrapy.Spider):
         self._batch_size: int = 100
         self.results_dict = kwargs.get("results_dict", {})
         self.course_stats_processed = 0
+        self.course_stats_changed = 0
+        self.course_stats_unchanged = 0
+        self.documents_stored = 0
+        # Courses dropped from a tournament's page since the last run
+        self.courses_removed = 0
+        self.row_fingerprints: RowFingerprints | None = None
+        self.document_fingerprints: RowFingerprints | None = None
+        # Validators of parsed pages, saved once their rows are written
+        self.validators = PageValidators(self)
 
     def _init_supabase(self):
         if self.supabase is not None:
@@ -39,7 +56,7 @@ class PgatourCourseStatsSpider(scrapy.Spider):
             )
             return
         try:
-            self.supabase = create_client(url, key)
+            self.supabase = replay_safe(create_client(url, key))
             self.logger.info("Supabase client initialized (course stats)")
         except Exception as e:
             self.logger.error(f"Failed to init Supabase: {e}")
@@ -47,6 +64,16 @@ class PgatourCourseStatsSpider(scrapy.Spider):
 
     def start_requests(self):
         self._init_supabase()
+        self.row_fingerprints = RowFingerprints(
+            self.supabase,
+            "pga_course_stats",
+            ["tournament_id", "course_name", "round", "hole"],
+        )
+        self.document_fingerprints = RowFingerprints(
+            self.supabase,
+            "pga_course_stats_documents",
+            ["tournament_id", "course_name"],
+        )
         ZYTE_APIKEY = os.environ.get("ZYTE_API_KEY")
 
         tournaments: list[dict] = []
@@ -114,7 +141,10 @@ class PgatourCourseStatsSpider(scrapy.Spider):
             if not detailed_courses:
                 self.logger.error(f"No detailed course stats found for {response.url}")
                 return
+            # One list of rows per course, in page order (host course first)
+            course_rows: list[list[dict]] = []
             for course_data in detailed_courses:
+                course_rows.append([])
                 overview = {
                     item["label"]: item
                     for item in course_data.get("courseOverview", {}).get(
@@ -149,16 +179,27 @@ class PgatourCourseStatsSpider(scrapy.Spider):
                             record,
                         )
                         self._buffer_row(row)
+                        course_rows[-1].append(row)
+            self._store_documents([rows for rows in course_rows if rows])
+            self.validators.add(response)
         except Exception as e:
             self.logger.error(f"Error parsing course stats page {response.url}: {e}")
 
     def closed(self, reason):
         if getattr(self, "_batch", None):
             self._flush_batch()
+        self.validators.commit()
+        # Feed API caches the hole-statistics documents until told they changed
+        if self.documents_stored or self.courses_removed:
+            invalidate_feed_cache(self.supabase, "course_stats")
         # Update results summary if provided by API caller
         try:
             if isinstance(self.results_dict, dict):
                 self.results_dict["course_stats"] = self.course_stats_processed
+                self.results_dict["course_stats_changed"] = self.course_stats_changed
+                self.results_dict[
+                    "course_stats_unchanged"
+                ] = self.course_stats_unchanged
         except Exception:
             pass
 
@@ -228,6 +269,7 @@ class PgatourCourseStatsSpider(scrapy.Spider):
     def _buffer_row(self, row: dict):
         self._batch.append(row)
         self.course_stats_processed += 1
+        self.results_dict["course_stats"] = self.course_stats_processed
         if len(self._batch) >= self._batch_size:
             self._flush_batch()
 
@@ -252,9 +294,18 @@ class PgatourCourseStatsSpider(scrapy.Spider):
                     r.get("hole"),
                 )
                 key_map[k] = r
-            rows = list(key_map.values())
+            rows, unchanged = self.row_fingerprints.split(list(key_map.values()))
+            self.course_stats_changed += len(rows)
+            self.course_stats_unchanged += len(unchanged)
+            self.results_dict["course_stats_changed"] = self.course_stats_changed
+            self.results_dict["course_stats_unchanged"] = self.course_stats_unchanged
+            self._batch = []
+            if not rows:
+                return
 
-            self.logger.info(f"Upserting {len(rows)} course stats rows")
+            self.logger.info(
+                f"Upserting {len(rows)} course stats rows ({len(unchanged)} unchanged)"
+            )
             (
                 self.supabase.table("pga_course_stats")
                 .upsert(
@@ -264,7 +315,122 @@ class PgatourCourseStatsSpider(scrapy.Spider):
                 )
                 .execute()
             )
-            self._batch = []
+            self.row_fingerprints.save(rows)
         except Exception as e:
             self.logger.error(f"Failed to upsert course stats batch: {e}")
             self._batch = []
+            self.validators.failed()
+
+    def _build_document(self, rows: list[dict]) -> dict:
+        """One course's nested course/rounds/holes document for the feed API."""
+        rows = sorted(rows, key=lambda r: (r["round"], r["hole"]))
+        first = rows[0]
+        rounds: dict[int, list[dict]] = {}
+        for r in rows:
+            rounds.setdefault(r["round"], []).append(
+                {
+                    "number": r["hole"],
+                    "par": r["par"],
+                    "yards": r["yards"],
+                    "eagles": r["eagles"],
+                    "birdies": r["birdies"],
+                    "pars": r["pars"],
+                    "bogeys": r["bogeys"],
+                    "double_bogeys": r["double_bogeys"],
+                    "scoring_average": r["scoring_average"],
+                    "avg_diff": r["avg_diff"],
+                    "rank": r["rank"],
+                }
+            )
+        return {
+            "course": {
+                "name": first["course_name"],
+                "yardage": first["course_yardage"],
+                "par": first["course_par"],
+                "record": first["course_record"],
+                "fairway": first["course_fairway"],
+                "design": first["course_design"],
+                "established": first["course_established"],
+            },
+            "rounds": [
+                {"number": number, "holes": holes}
+                for number, holes in sorted(rounds.items())
+            ],
+        }
+
+    def _drop_stale_courses(self, tournament_id: str, names: list[str]):
+        """Delete the documents and rows of courses no longer on the page.
+
+        Fingerprints go first; rows whose fingerprints could not be dropped
+        are kept for the next run.
+        """
+        removed = 0
+        for table, fingerprints in (
+            ("pga_course_stats_documents", self.document_fingerprints),
+            ("pga_course_stats", self.row_fingerprints),
+        ):
+            try:
+                stale = (
+                    self.supabase.table(table)
+                    .select(",".join(fingerprints.key))
+                    .eq("tournament_id", tournament_id)
+                    .not_.in_("course_name", names)
+                    .execute()
+                ).data or []
+                if not stale or not fingerprints.forget(stale):
+                    continue
+                (
+                    self.supabase.table(table)
+                    .delete(returning="minimal")
+                    .eq("tournament_id", tournament_id)
+                    .not_.in_("course_name", names)
+                    .execute()
+                )
+                if table == "pga_course_stats_documents":
+                    removed = len(stale)
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to drop stale courses of {tournament_id} from {table}: {e}"
+                )
+                self.validators.failed()
+        if removed:
+            self.logger.info(f"Removed {removed} stale courses of {tournament_id}")
+            self.courses_removed += removed
+
+    def _store_documents(self, courses: list[list[dict]]):
+        if self.supabase is None or not courses:
+            return
+        tournament_id = courses[0][0]["tournament_id"]
+        self._drop_stale_courses(
+            tournament_id, [rows[0]["course_name"] for rows in courses]
+        )
+        documents, _ = self.document_fingerprints.split(
+            [
+                {
+                    "tournament_id": tournament_id,
+                    "course_name": rows[0]["course_name"],
+                    "course_order": order,
+                    "document": self._build_document(rows),
+                }
+                for order, rows in enumerate(courses)
+            ]
+        )
+        if not documents:
+            return
+        try:
+            (
+                self.supabase.table("pga_course_stats_documents")
+                .upsert(
+                    documents,
+                    on_conflict="tournament_id,course_name",
+                    returning="minimal",
+                )
+                .execute()
+            )
+            self.document_fingerprints.save(documents)
+            self.documents_stored += len(documents)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to store course stats documents for {tournament_id}: {e}"
+            )
+            self.validators.failed()
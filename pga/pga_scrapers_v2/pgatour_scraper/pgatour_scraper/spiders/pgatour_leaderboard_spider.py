@@ -2,10 +2,22 @@ import os
 import re
 import json
 import scrapy
+from collections import Counter
+from datetime import datetime, timezone
 from urllib.parse import urlparse
 from dotenv import load_dotenv, find_dotenv
 from supabase import create_client, Client
 
+from ..feed_cache import invalidate_feed_cache
+from ..httpcache import CACHE_FOREVER, CACHE_LIVE_SECS, httpcache_settings, replay_safe
+from ..middlewares import (
+    NotModified,
+    PageValidators,
+    PgatourScraperDownloaderMiddleware,
+)
+from ..row_versions import changed_rows, next_version, removed_keys
+from ..scheduling import leaderboard_due, parse_date
+
 load_dotenv(find_dotenv())
 
 
@@ -20,6 +32,9 @@ class PgatourLeaderboardSpider(scrapy.Spider):
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS": 2,
         "DOWNLOAD_DELAY": 2,
+        # Conditional requests, so unchanged pages are not downloaded again
+        "DOWNLOADER_MIDDLEWARES": {PgatourScraperDownloaderMiddleware: 543},
+        **httpcache_settings(CACHE_LIVE_SECS),
     }
     headers = {
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -34,6 +49,21 @@ class PgatourLeaderboardSpider(scrapy.Spider):
         self._batch_size: int = 100
         self.results_dict = kwargs.get("results_dict", {})
         self.players_processed = 0
+        self.players_unchanged = 0
+        self.players_changed = 0
+        # Players dropped from a field, deleted behind a tombstone
+        self.players_removed = 0
+        # Leaderboards not requested this run (see scheduling)
+        self.leaderboards_skipped = 0
+        # Spider args arrive as strings from the scrapy CLI
+        self.full = str(kwargs.get("full", "")).lower() in ("1", "true", "yes")
+        # Version stamped on the last write (see _flush_batch), seeded from
+        # the stored versions when the run starts
+        self._version = 0
+        # Validators of parsed pages, saved once their rows are written
+        self.validators = PageValidators(self)
+        # Finalization passes parsed this run, counted once their rows are written
+        self.final_passes: dict[str, int] = {}
 
     def _init_supabase(self):
         if self.supabase is not None:
@@ -46,7 +76,7 @@ class PgatourLeaderboardSpider(scrapy.Spider):
             )
             return
         try:
-            self.supabase = create_client(url, key)
+            self.supabase = replay_safe(create_client(url, key))
             self.logger.info("Supabase client initialized (leaderboard)")
         except Exception as e:
             self.logger.error(f"Failed to init Supabase: {e}")
@@ -61,7 +91,10 @@ class PgatourLeaderboardSpider(scrapy.Spider):
             try:
                 resp = (
                     self.supabase.table("pga_tournaments")
-                    .select("tournament_id,tournament_url,status")
+                    .select(
+                        "tournament_id,tournament_url,status,start_date,end_date,"
+                        "leaderboard_final_scrapes"
+                    )
                     .neq("tournament_url", None)
                     .execute()
                 )
@@ -71,29 +104,58 @@ class PgatourLeaderboardSpider(scrapy.Spider):
                 )
             except Exception as e:
                 self.logger.error(f"Failed to load tournaments from Supabase: {e}")
+            self._seed_version()
 
         if not tournaments:
             self.logger.warning("No tournaments loaded from DB; nothing to scrape")
             return
 
+        # Frozen leaderboards are not requested again unless `full`
+        today = datetime.now(timezone.utc).date()
+        scheduled = Counter()
         for t in tournaments:
             tournament_url = t.get("tournament_url")
             tournament_id = t.get("tournament_id")
             status = t.get("status")
             if not tournament_url or not tournament_id:
                 continue
+            final_scrapes = int(t.get("leaderboard_final_scrapes") or 0)
+            due = leaderboard_due(
+                status,
+                parse_date(t.get("start_date")),
+                parse_date(t.get("end_date")),
+                final_scrapes,
+                today,
+            )
+            schedule = "full" if self.full else due
+            scheduled[schedule] += 1
+            if schedule is None:
+                continue
             url = tournament_url
             yield scrapy.Request(
                 url,
                 headers=self.headers,
                 callback=self.parse_tournament,
+                errback=self.leaderboard_not_modified,
                 meta={
                     "tournament_url": tournament_url,
                     "tournament_id": tournament_id,
                     "status": status,
+                    "schedule": schedule,
+                    "final_scrapes": final_scrapes,
+                    # Leaderboards that can still change are cached briefly,
+                    # frozen ones (only requested when `full`) for good
+                    "cache_expiration_secs": CACHE_LIVE_SECS if due else CACHE_FOREVER,
                     "proxy": ZYTE_APIKEY,
                 },
             )
+        requested = {k: n for k, n in scheduled.items() if k}
+        self.logger.info(
+            f"Requested {sum(requested.values())} leaderboards {requested}; "
+            f"{scheduled[None]} frozen or not yet due"
+        )
+        self.leaderboards_skipped = scheduled[None]
+        self.results_dict["leaderboards_skipped"] = self.leaderboards_skipped
 
     def parse_tournament(self, response):
         script_content = response.xpath('//script[@id="__NEXT_DATA__"]/text()').get()
@@ -126,6 +188,7 @@ class PgatourLeaderboardSpider(scrapy.Spider):
                     players = d["players"]
                     break
             if players and len(players) > 0:
+                rows: list[dict] = []
                 for p in players:
                     player = p.get("player", {})
                     scoring = p.get("scoringData", {})
@@ -192,10 +255,30 @@ class PgatourLeaderboardSpider(scrapy.Spider):
                         "player_url": player_url,
                     }
 
-                    self._batch.append(row)
+                    rows.append(row)
                     self.players_processed += 1
+                    self.results_dict["leaderboards"] = self.players_processed
+
+                # Only rows that changed get a new version, so the feed API's
+                # since_version deltas stay small between runs
+                stored = self._stored_rows(tournament_id, rows)
+                changed = changed_rows(rows, stored)
+                self.players_unchanged += len(rows) - len(changed)
+                self.players_changed += len(changed)
+                self.results_dict["leaderboards_changed"] = self.players_changed
+                self.results_dict["leaderboards_unchanged"] = self.players_unchanged
+                for row in changed:
+                    self._batch.append(row)
                     if len(self._batch) >= self._batch_size:
                         self._flush_batch()
+                removed = removed_keys(rows, stored)
+                if removed:
+                    self._remove_rows(tournament_id, removed)
+                self.validators.add(response)
+                if response.meta.get("schedule") == "finalize":
+                    self.final_passes[tournament_id] = response.meta.get(
+                        "final_scrapes", 0
+                    )
                 return
 
             self.logger.info(
@@ -204,18 +287,153 @@ class PgatourLeaderboardSpider(scrapy.Spider):
         except Exception as e:
             self.logger.error(f"Error parsing tournament page {response.url}: {e}")
 
+    def leaderboard_not_modified(self, failure):
+        """Errback; a 304 still completes a finalization pass."""
+        request = failure.request
+        if not failure.check(NotModified):
+            self.logger.error(f"Failed to fetch {request.url}: {failure.value}")
+            return
+        if request.meta.get("schedule") == "finalize":
+            self._count_final_scrape(
+                request.meta.get("tournament_id"), request.meta.get("final_scrapes", 0)
+            )
+
+    def _count_final_passes(self):
+        """Count this run's finalization passes, unless a batch failed to write.
+
+        A pass counted over lost rows would stop the event being due while
+        its stored leaderboard is still short of the final result.
+        """
+        if self.validators.failures:
+            if self.final_passes:
+                self.logger.warning(
+                    f"{len(self.final_passes)} finalization passes not counted; "
+                    "a leaderboard batch failed to write"
+                )
+            return
+        for tournament_id, final_scrapes in self.final_passes.items():
+            self._count_final_scrape(tournament_id, final_scrapes)
+
+    def _count_final_scrape(self, tournament_id: str, final_scrapes: int):
+        """Record a finalization pass, so completed events stop being due."""
+        if self.supabase is None:
+            return
+        try:
+            (
+                self.supabase.table("pga_tournaments")
+                .update({"leaderboard_final_scrapes": final_scrapes + 1})
+                .eq("tournament_id", tournament_id)
+                .execute()
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to count final scrape of {tournament_id}: {e}")
+
     def closed(self, reason):
         # Flush any remaining rows when spider finishes
         if getattr(self, "_batch", None):
             self.logger.info("Spider closing — flushing final batch")
             self._flush_batch()
-        self.logger.info(f"Spider closed: {reason}")
+        self.validators.commit()
+        self._count_final_passes()
+        self.logger.info(
+            f"Spider closed: {reason}. {self.players_unchanged} of "
+            f"{self.players_processed} leaderboard rows unchanged."
+        )
         # Update results summary if provided by API caller
         try:
             if isinstance(self.results_dict, dict):
                 self.results_dict["leaderboards"] = self.players_processed
+                self.results_dict["leaderboards_changed"] = self.players_changed
+                self.results_dict["leaderboards_unchanged"] = self.players_unchanged
+                self.results_dict["leaderboards_removed"] = self.players_removed
+                self.results_dict["leaderboards_skipped"] = self.leaderboards_skipped
         except Exception:
             pass
+        # Feed APIs cache full leaderboards until told they changed
+        if self.players_changed or self.players_removed:
+            invalidate_feed_cache(self.supabase, "leaderboards")
+
+    def _stored_rows(self, tournament_id, rows: list[dict]) -> dict:
+        """Current DB copy of this tournament's rows, keyed by player_id."""
+        if self.supabase is None or not rows:
+            return {}
+        try:
+            resp = (
+                self.supabase.table("pga_tournament_leaderboards")
+                .select(",".join(rows[0].keys()))
+                .eq("tournament_id", tournament_id)
+                .execute()
+            )
+            return {r["player_id"]: r for r in resp.data or []}
+        except Exception as e:
+            # Treat every row as changed; costs a larger delta, never a missed one
+            self.logger.warning(f"Failed to load stored leaderboard rows: {e}")
+            return {}
+
+    def _seed_version(self):
+        """Start above every stored version.
+
+        Versions are clock based; a run whose clock is behind the last
+        run's (another instance, a restart) must still stamp newer ones.
+        """
+        for table in ("pga_tournament_leaderboards", "pga_leaderboard_removals"):
+            try:
+                resp = (
+                    self.supabase.table(table)
+                    .select("version")
+                    .not_.is_("version", "null")
+                    .order("version", desc=True)
+                    .limit(1)
+                    .execute()
+                )
+            except Exception as e:
+                self.logger.warning(f"Failed to load latest version of {table}: {e}")
+                continue
+            for row in resp.data or []:
+                self._version = max(self._version, row["version"])
+
+    def _remove_rows(self, tournament_id, player_ids: list):
+        """Delete players dropped from a field (WD, DQ) behind versioned tombstones.
+
+        The tombstones are written first, so a failed delete is retried on
+        the next run instead of leaving a removal no delta reports.
+        """
+        if self.supabase is None:
+            return
+        self._version = next_version(self._version)
+        try:
+            self.logger.info(
+                f"Removing {len(player_ids)} players from {tournament_id} "
+                f"(version {self._version})"
+            )
+            (
+                self.supabase.table("pga_leaderboard_removals")
+                .upsert(
+                    [
+                        {
+                            "tournament_id": tournament_id,
+                            "player_id": player_id,
+                            "version": self._version,
+                        }
+                        for player_id in player_ids
+                    ],
+                    on_conflict="tournament_id,player_id",
+                    returning="minimal",
+                )
+                .execute()
+            )
+            (
+                self.supabase.table("pga_tournament_leaderboards")
+                .delete()
+                .eq("tournament_id", tournament_id)
+                .in_("player_id", player_ids)
+                .execute()
+            )
+            self.players_removed += len(player_ids)
+            self.results_dict["leaderboards_removed"] = self.players_removed
+        except Exception as e:
+            self.logger.error(f"Failed to remove players from {tournament_id}: {e}")
+            self.validators.failed()
 
     def _flush_batch(self):
         if self.supabase is None:
@@ -227,8 +445,13 @@ class PgatourLeaderboardSpider(scrapy.Spider):
             return
         if not self._batch:
             return
+        self._version = next_version(self._version)
+        for row in self._batch:
+            row["version"] = self._version
         try:
-            self.logger.info(f"Upserting {len(self._batch)} leaderboard rows")
+            self.logger.info(
+                f"Upserting {len(self._batch)} leaderboard rows (version {self._version})"
+            )
             (
                 self.supabase.table("pga_tournament_leaderboards")
                 .upsert(
@@ -241,6 +464,7 @@ class PgatourLeaderboardSpider(scrapy.Spider):
             self._batch = []
         except Exception as e:
             self.logger.error(f"Failed to upsert leaderboard batch: {e}")
+            self.validators.failed()
 
     def extract_tournament_id_from_url(self, url):
         try:
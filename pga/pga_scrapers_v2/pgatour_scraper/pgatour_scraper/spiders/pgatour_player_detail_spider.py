@@ -1,12 +1,29 @@
 import os
 import json
 import scrapy
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv, find_dotenv
 from supabase import create_client, Client
 
+from ..feed_cache import invalidate_feed_cache
+from ..fingerprints import RowFingerprints
+from ..httpcache import CACHE_PROFILE_SECS, httpcache_settings, replay_safe
+from ..middlewares import (
+    NotModified,
+    PageValidators,
+    PgatourScraperDownloaderMiddleware,
+)
+
 load_dotenv(find_dotenv())
 
+# Incremental runs skip players scraped within this many hours...
+PLAYER_REFRESH_HOURS = float(os.environ.get("PLAYER_REFRESH_HOURS", "144"))
+# ...except those on leaderboards of tournaments within this many days of
+# today (this week's field and recent finishers), who are always refreshed
+PLAYER_PRIORITY_DAYS = int(os.environ.get("PLAYER_PRIORITY_DAYS", "7"))
+# Supabase returns at most this many rows per select, so id lists are paged
+SELECT_PAGE_SIZE = 1000
+
 
 class PgatourPlayerDetailSpider(scrapy.Spider):
     name = "pgatour_player_detail_spider"
@@ -16,6 +33,9 @@ class PgatourPlayerDetailSpider(scrapy.Spider):
         "DOWNLOAD_DELAY": 1.5,
         "RETRY_TIMES": 5,
         "DOWNLOAD_TIMEOUT": 30,
+        # Conditional requests, so unchanged pages are not downloaded again
+        "DOWNLOADER_MIDDLEWARES": {PgatourScraperDownloaderMiddleware: 543},
+        **httpcache_settings(CACHE_PROFILE_SECS),
     }
     headers = {
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -30,6 +50,17 @@ class PgatourPlayerDetailSpider(scrapy.Spider):
         self._batch_size: int = 100
         self.results_dict = kwargs.get("results_dict", {})
         self.players_processed = 0
+        self.players_skipped = 0
+        self.players_changed = 0
+        self.players_unchanged = 0
+        self.fingerprints: RowFingerprints | None = None
+        # Players found unchanged, whose last_scraped_at is still to be stamped
+        self._touched: list = []
+        # Validators of parsed pages, saved once their rows are written
+        self.validators = PageValidators(self)
+        # Spider args arrive as strings from the scrapy CLI
+        self.full = str(kwargs.get("full", "")).lower() in ("1", "true", "yes")
+        self.refresh_hours = float(kwargs.get("refresh_hours") or PLAYER_REFRESH_HOURS)
 
     def _init_supabase(self):
         if self.supabase is not None:
@@ -42,7 +73,7 @@ class PgatourPlayerDetailSpider(scrapy.Spider):
             )
             return
         try:
-            self.supabase = create_client(url, key)
+            self.supabase = replay_safe(create_client(url, key))
             self.logger.info("Supabase client initialized (players)")
         except Exception as e:
             self.logger.error(f"Failed to init Supabase: {e}")
@@ -50,6 +81,9 @@ class PgatourPlayerDetailSpider(scrapy.Spider):
 
     def start_requests(self):
         self._init_supabase()
+        self.fingerprints = RowFingerprints(
+            self.supabase, "pga_players", ["player_id"], ignore=["last_scraped_at"]
+        )
         ZYTE_APIKEY = os.environ.get("ZYTE_API_KEY")
 
         if self.supabase is None:
@@ -57,30 +91,111 @@ class PgatourPlayerDetailSpider(scrapy.Spider):
             return
 
         # Load distinct players from DB view (one URL per player_id)
-        urls: list[str] = []
+        players: list[dict] = []
         try:
             resp = (
                 self.supabase.table("unique_players")
                 .select("player_id,player_url")
                 .execute()
             )
-            rows = resp.data or []
-            for r in rows:
-                u = r.get("player_url")
-                if u:
-                    urls.append(u)
-            self.logger.info(f"Loaded {len(urls)} unique player URLs from DB view")
+            players = [r for r in resp.data or [] if r.get("player_url")]
+            self.logger.info(f"Loaded {len(players)} unique player URLs from DB view")
         except Exception as e:
             self.logger.error(f"Failed to load player URLs from DB: {e}")
             return
 
-        for url in urls:
+        priority = self._priority_player_ids()
+        fresh = set() if self.full else self._fresh_player_ids()
+        due = [
+            p
+            for p in players
+            if str(p.get("player_id")) in priority
+            or str(p.get("player_id")) not in fresh
+        ]
+        # Field and recent finishers first, so they are in even if the run
+        # is cut short
+        due.sort(key=lambda p: str(p.get("player_id")) not in priority)
+        self.players_skipped = len(players) - len(due)
+        self.results_dict["players_skipped"] = self.players_skipped
+        # Lets the API estimate how long the run has left
+        self.results_dict["players_total"] = len(due)
+        self.logger.info(
+            f"Scraping {len(due)} players ({self.players_skipped} refreshed within "
+            f"{self.refresh_hours:g}h skipped, {len(priority)} prioritized)"
+        )
+
+        for p in due:
+            url = p["player_url"]
             yield scrapy.Request(
                 url,
                 headers=self.headers,
                 callback=self.parse_player,
-                meta={"player_url": url, "proxy": ZYTE_APIKEY},
+                errback=self.player_not_modified,
+                priority=1 if str(p.get("player_id")) in priority else 0,
+                meta={
+                    "player_url": url,
+                    "player_id": p.get("player_id"),
+                    "proxy": ZYTE_APIKEY,
+                },
+            )
+
+    def _priority_player_ids(self) -> set[str]:
+        """Players on leaderboards of tournaments around today."""
+        today = datetime.now(timezone.utc).date()
+        window = timedelta(days=PLAYER_PRIORITY_DAYS)
+        try:
+            resp = (
+                self.supabase.table("pga_tournaments")
+                .select("tournament_id")
+                .gte("end_date", (today - window).isoformat())
+                .lte("start_date", (today + window).isoformat())
+                .execute()
             )
+            tournament_ids = [r["tournament_id"] for r in resp.data or []]
+            if not tournament_ids:
+                return set()
+            rows = self._select_all(
+                lambda: self.supabase.table("pga_tournament_leaderboards")
+                .select("player_id")
+                .in_("tournament_id", tournament_ids)
+                .order("tournament_id")
+                .order("player_id")
+            )
+            return {str(r["player_id"]) for r in rows}
+        except Exception as e:
+            self.logger.warning(f"Failed to load current fields; none prioritized: {e}")
+            return set()
+
+    def _fresh_player_ids(self) -> set[str]:
+        """Players scraped within the refresh window."""
+        since = datetime.now(timezone.utc) - timedelta(hours=self.refresh_hours)
+        try:
+            rows = self._select_all(
+                lambda: self.supabase.table("pga_players")
+                .select("player_id")
+                .gte("last_scraped_at", since.isoformat())
+                .order("player_id")
+            )
+            return {str(r["player_id"]) for r in rows}
+        except Exception as e:
+            self.logger.warning(f"Failed to load last_scraped_at; scraping all: {e}")
+            return set()
+
+    def _select_all(self, build) -> list[dict]:
+        """Every row of the query `build()` returns, SELECT_PAGE_SIZE at a time.
+
+        `build` makes a fresh, ordered query per page, as .range() adds to
+        the query it is called on.
+        """
+        rows = []
+        start = 0
+        while True:
+            resp = build().range(start, start + SELECT_PAGE_SIZE - 1).execute()
+            page = resp.data or []
+            rows.extend(page)
+            if len(page) < SELECT_PAGE_SIZE:
+                return rows
+            start += SELECT_PAGE_SIZE
 
     def parse_player(self, response):
         script_content = response.xpath('//script[@id="__NEXT_DATA__"]/text()').get()
@@ -244,25 +359,46 @@ class PgatourPlayerDetailSpider(scrapy.Spider):
                 "image_url": image_url if image_url != "-" else None,
                 "height": parse_height_to_inches(height_imperial),
                 "weight": to_int_or_none(weight_imperial),
+                "last_scraped_at": datetime.now(timezone.utc).isoformat(),
             }
 
             # Buffer and upsert in batches
             self._batch.append(row)
             self.players_processed += 1
+            self.results_dict["players"] = self.players_processed
+            self.validators.add(response)
             if len(self._batch) >= self._batch_size:
                 self._flush_batch()
         except Exception as e:
             self.logger.error(f"Error parsing player page {response.url}: {e}")
 
+    def player_not_modified(self, failure):
+        """Errback; a 304 means the player is unchanged, so only stamp it."""
+        request = failure.request
+        if not failure.check(NotModified):
+            self.logger.error(f"Failed to fetch {request.url}: {failure.value}")
+            return
+        self._touched.append(request.meta.get("player_id"))
+        if len(self._touched) >= self._batch_size:
+            self._flush_touched()
+
     def closed(self, reason):
         if getattr(self, "_batch", None):
             self._flush_batch()
+        self._flush_touched()
+        self.validators.commit()
         # Update results summary if provided by API caller
         try:
             if isinstance(self.results_dict, dict):
                 self.results_dict["players"] = self.players_processed
+                self.results_dict["players_skipped"] = self.players_skipped
+                self.results_dict["players_changed"] = self.players_changed
+                self.results_dict["players_unchanged"] = self.players_unchanged
         except Exception:
             pass
+        # Feed APIs cache players reads until told they changed
+        if self.players_changed:
+            invalidate_feed_cache(self.supabase, "players")
 
     def _flush_batch(self):
         if self.supabase is None:
@@ -280,15 +416,41 @@ class PgatourPlayerDetailSpider(scrapy.Spider):
                 pid = row.get("player_id")
                 if pid is not None:
                     rows_by_id[pid] = row
-            rows = list(rows_by_id.values())
+            rows, unchanged = self.fingerprints.split(list(rows_by_id.values()))
+            self.players_changed += len(rows)
+            self.players_unchanged += len(unchanged)
+            self.results_dict["players_changed"] = self.players_changed
+            self.results_dict["players_unchanged"] = self.players_unchanged
 
-            self.logger.info(f"Upserting {len(rows)} players")
+            if rows:
+                self.logger.info(
+                    f"Upserting {len(rows)} players ({len(unchanged)} unchanged)"
+                )
+                (
+                    self.supabase.table("pga_players")
+                    .upsert(rows, on_conflict="player_id", returning="minimal")
+                    .execute()
+                )
+                self.fingerprints.save(rows)
+            self._batch = []
+            self._touched.extend(r["player_id"] for r in unchanged)
+            self._flush_touched()
+        except Exception as e:
+            self.logger.error(f"Failed to upsert players batch: {e}")
+            self._batch = []
+            self.validators.failed()
+
+    def _flush_touched(self):
+        """Stamp unchanged players, so they count as fresh on incremental runs."""
+        ids, self._touched = self._touched, []
+        if self.supabase is None or not ids:
+            return
+        try:
             (
                 self.supabase.table("pga_players")
-                .upsert(rows, on_conflict="player_id", returning="minimal")
+                .update({"last_scraped_at": datetime.now(timezone.utc).isoformat()})
+                .in_("player_id", ids)
                 .execute()
             )
-            self._batch = []
         except Exception as e:
-            self.logger.error(f"Failed to upsert players batch: {e}")
-            self._batch = []
+            self.logger.warning(f"Failed to stamp {len(ids)} unchanged players: {e}")
@@ -6,9 +6,33 @@ from datetime import datetime, date
 from dotenv import load_dotenv, find_dotenv
 from supabase import create_client, Client
 
+from ..feed_cache import invalidate_feed_cache
+from ..fingerprints import RowFingerprints
+from ..httpcache import CACHE_SCHEDULE_SECS, httpcache_settings, replay_safe
+from ..middlewares import PageValidators, PgatourScraperDownloaderMiddleware
+
 load_dotenv(find_dotenv())
 
 
+# Columns copied into pga_tournament_summaries, the narrow table the feed
+# API's tournament lists read
+SUMMARY_COLUMNS = (
+    "tournament_id",
+    "tournament_name",
+    "year",
+    "month",
+    "start_date",
+    "end_date",
+    "status",
+    "purse_amount",
+    "fedex_cup",
+    "course_name",
+    "city",
+    "state",
+    "country",
+)
+
+
 def slugify(name):
     # Lowercase, replace spaces with hyphens, remove non-alphanumeric except hyphens
     return re.sub(r"[^a-z0-9-]", "", name.lower().replace(" ", "-"))
@@ -20,6 +44,9 @@ class PgatourUpcomingSpider(scrapy.Spider):
     custom_settings = {
         "ROBOTSTXT_OBEY": False,
         "CONCURRENT_REQUESTS": 4,
+        # Conditional requests, so unchanged pages are not downloaded again
+        "DOWNLOADER_MIDDLEWARES": {PgatourScraperDownloaderMiddleware: 543},
+        **httpcache_settings(CACHE_SCHEDULE_SECS),
     }
 
     def __init__(self, *args, **kwargs):
@@ -29,6 +56,11 @@ class PgatourUpcomingSpider(scrapy.Spider):
         self.supabase = None
         self.results_dict = kwargs.get("results_dict", {})
         self.tournaments_processed = 0
+        self.tournaments_changed = 0
+        self.tournaments_unchanged = 0
+        self.fingerprints: RowFingerprints | None = None
+        # Validators of parsed pages, saved once their rows are written
+        self.validators = PageValidators(self)
         self.headers = {
             "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
             "accept-language": "en-US,en;q=0.9",
@@ -60,7 +92,7 @@ class PgatourUpcomingSpider(scrapy.Spider):
             return
 
         try:
-            self.supabase = create_client(url, key)
+            self.supabase = replay_safe(create_client(url, key))
             self.logger.info("Supabase client initialized; ready to upsert.")
         except Exception as e:
             self.supabase = None
@@ -70,6 +102,9 @@ class PgatourUpcomingSpider(scrapy.Spider):
 
     def start_requests(self):
         self._init_supabase()
+        self.fingerprints = RowFingerprints(
+            self.supabase, "pga_tournaments", ["tournament_id"]
+        )
 
         ZYTE_APIKEY = os.environ.get("ZYTE_API_KEY")
 
@@ -89,14 +124,21 @@ class PgatourUpcomingSpider(scrapy.Spider):
         if getattr(self, "_batch", None):
             self.logger.info("Spider closing — flushing final batch")
             self._flush_batch()
+        self.validators.commit()
         # Update results dictionary for API response
         try:
             if isinstance(self.results_dict, dict):
                 self.results_dict["tournaments"] = self.tournaments_processed
+                self.results_dict["tournaments_changed"] = self.tournaments_changed
+                self.results_dict["tournaments_unchanged"] = self.tournaments_unchanged
         except Exception:
             pass
+        # Feed APIs cache tournaments reads until told they changed
+        if self.tournaments_changed:
+            invalidate_feed_cache(self.supabase, "tournaments")
         self.logger.info(
-            f"Spider closed: {reason}. Processed {self.tournaments_processed} tournaments."
+            f"Spider closed: {reason}. Processed {self.tournaments_processed} tournaments, "
+            f"{self.tournaments_unchanged} unchanged."
         )
 
     def parse(self, response):
@@ -212,6 +254,7 @@ class PgatourUpcomingSpider(scrapy.Spider):
                     # Buffer and flush in batches
                     self._batch.append(row)
                     self.tournaments_processed += 1
+                    self.results_dict["tournaments"] = self.tournaments_processed
                     if len(self._batch) >= self._batch_size:
                         self._flush_batch()
 
@@ -220,6 +263,7 @@ class PgatourUpcomingSpider(scrapy.Spider):
                         f"Error processing tournament: {e}", exc_info=True
                     )
                     continue
+            self.validators.add(response)
 
         except json.JSONDecodeError as e:
             self.logger.error(f"Error parsing JSON: {e}")
@@ -323,15 +367,39 @@ class PgatourUpcomingSpider(scrapy.Spider):
         if not self._batch:
             return
 
+        # Tournaments whose content is unchanged since the last run are not
+        # rewritten (nor their summaries, which are copied from them)
+        changed, unchanged = self.fingerprints.split(self._batch)
+        self.tournaments_changed += len(changed)
+        self.tournaments_unchanged += len(unchanged)
+        self.results_dict["tournaments_changed"] = self.tournaments_changed
+        self.results_dict["tournaments_unchanged"] = self.tournaments_unchanged
+        if not changed:
+            self._batch = []
+            return
+
         try:
-            self.logger.info(f"Upserting {len(self._batch)} rows to Supabase")
+            self.logger.info(
+                f"Upserting {len(changed)} rows to Supabase ({len(unchanged)} unchanged)"
+            )
             resp = (
                 self.supabase.table("pga_tournaments")
-                .upsert(self._batch, on_conflict="tournament_id", returning="minimal")
+                .upsert(changed, on_conflict="tournament_id", returning="minimal")
                 .execute()
             )
             self.logger.info(f"Supabase upsert response: {resp}")
+            (
+                self.supabase.table("pga_tournament_summaries")
+                .upsert(
+                    [{c: row[c] for c in SUMMARY_COLUMNS} for row in changed],
+                    on_conflict="tournament_id",
+                    returning="minimal",
+                )
+                .execute()
+            )
+            self.fingerprints.save(changed)
             self._batch = []
         except Exception as e:
             self.logger.error(f"Error upserting batch to Supabase: {e}")
             self._batch = []
+            self.validators.failed()
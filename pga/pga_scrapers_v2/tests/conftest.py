@@ -0,0 +1,7 @@
+import os
+import sys
+
+# jobs.py sits in the app directory; the spiders' package in its scrapy project
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(APP_DIR, "pgatour_scraper"))
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+from pgatour_scraper.fingerprints import RowFingerprints
+from pgatour_scraper.spiders.pgatour_course_stats_spider import (
+    PgatourCourseStatsSpider,
+)
+
+
+class FakeTable:
+    """Sync PostgREST builder: selects answer with `rows`, calls are logged."""
+
+    def __init__(self, name, rows, log, fail=False):
+        self.name = name
+        self.rows = rows
+        self.log = log
+        self.fail = fail
+        self.op = "select"
+        self.filters = []
+
+    @property
+    def not_(self):
+        self.filters.append("not")
+        return self
+
+    def delete(self, **kwargs):
+        self.op = "delete"
+        return self
+
+    def select(self, *args):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append((column, sorted(values)))
+        return self
+
+    def execute(self):
+        self.log.append((self.op, self.name, self.filters))
+        if self.fail and self.op == "delete":
+            raise RuntimeError("delete failed")
+        return SimpleNamespace(data=self.rows if self.op == "select" else [])
+
+
+def make_spider(stale, fail=()):
+    log = []
+    sb = SimpleNamespace(
+        table=lambda name: FakeTable(name, stale.get(name, []), log, name in fail)
+    )
+    spider = PgatourCourseStatsSpider()
+    spider.supabase = sb
+    spider.row_fingerprints = RowFingerprints(
+        sb, "pga_course_stats", ["tournament_id", "course_name", "round", "hole"]
+    )
+    spider.document_fingerprints = RowFingerprints(
+        sb, "pga_course_stats_documents", ["tournament_id", "course_name"]
+    )
+    return spider, log
+
+
+def test_stale_courses_are_deleted_after_their_fingerprints():
+    stale = {
+        "pga_course_stats_documents": [
+            {"tournament_id": "R1", "course_name": "Old Course"}
+        ],
+        "pga_course_stats": [
+            {"tournament_id": "R1", "course_name": "Old Course", "round": 1, "hole": 1}
+        ],
+    }
+    spider, log = make_spider(stale)
+    spider._drop_stale_courses("R1", ["Pebble"])
+
+    deletes = [(name, filters) for op, name, filters in log if op == "delete"]
+    assert [name for name, _ in deletes] == [
+        "scrape_fingerprints",
+        "pga_course_stats_documents",
+        "scrape_fingerprints",
+        "pga_course_stats",
+    ]
+    assert deletes[0][1] == [
+        ("source", "pga_course_stats_documents"),
+        ("row_key", ["R1|Old Course"]),
+    ]
+    assert deletes[1][1] == [
+        ("tournament_id", "R1"),
+        "not",
+        ("course_name", ["Pebble"]),
+    ]
+    assert spider.courses_removed == 1
+    assert not spider.validators.failures
+
+
+def test_courses_still_listed_are_left_alone():
+    spider, log = make_spider({})
+    spider._drop_stale_courses("R1", ["Pebble"])
+    assert [op for op, _, _ in log] == ["select", "select"]
+    assert spider.courses_removed == 0
+
+
+def test_fingerprints_kept_means_rows_kept():
+    stale = {
+        "pga_course_stats_documents": [
+            {"tournament_id": "R1", "course_name": "Old Course"}
+        ]
+    }
+    spider, log = make_spider(stale, fail={"scrape_fingerprints"})
+    spider._drop_stale_courses("R1", ["Pebble"])
+    assert [name for op, name, _ in log if op == "delete"] == ["scrape_fingerprints"]
+    assert spider.courses_removed == 0
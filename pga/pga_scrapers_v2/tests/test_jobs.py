@@ -0,0 +1,131 @@
+import pytest
+from twisted.internet.defer import Deferred
+from twisted.python.failure import Failure
+
+import jobs
+from jobs import PipelineJob, Scrape
+
+
+@pytest.fixture
+def crawls(monkeypatch):
+    """Replace the crawl with a Deferred per started stage, fired by the test."""
+    started = {}
+
+    def run(runner, job):
+        job._start()
+        d = Deferred()
+        d.addCallbacks(job._succeeded, job._failed)
+        started[job.name] = d
+        return d
+
+    monkeypatch.setattr(jobs, "_run", run)
+    return started
+
+
+def scrape(name):
+    return Scrape(name, object, {name: name}, timeout=60)
+
+
+def pipeline():
+    # upcoming -> (leaderboard, course_stats); leaderboard -> players
+    return PipelineJob(
+        "all",
+        [
+            (scrape("upcoming"), ()),
+            (scrape("leaderboard"), ("upcoming",)),
+            (scrape("course_stats"), ("upcoming",)),
+            (scrape("players"), ("leaderboard",)),
+        ],
+    )
+
+
+def statuses(job):
+    return {stage.name: stage.status for stage, _ in job.stages}
+
+
+def test_independent_stages_start_together_once_needs_succeed(crawls):
+    job = pipeline()
+    job._advance(None)
+    assert list(crawls) == ["upcoming"]
+
+    crawls["upcoming"].callback(None)
+    assert list(crawls) == ["upcoming", "leaderboard", "course_stats"]
+
+    crawls["leaderboard"].callback(None)
+    crawls["course_stats"].callback(None)
+    crawls["players"].callback(None)
+    assert job.status == "succeeded"
+
+
+def test_failed_stage_skips_its_dependents_only(crawls):
+    job = pipeline()
+    job._advance(None)
+    crawls["upcoming"].callback(None)
+    crawls["leaderboard"].errback(Failure(RuntimeError("blocked")))
+
+    assert statuses(job) == {
+        "upcoming": "succeeded",
+        "leaderboard": "failed",
+        "course_stats": "running",
+        "players": "skipped",
+    }
+    assert job.active
+
+    crawls["course_stats"].callback(None)
+    assert job.status == "failed"
+    assert job.error == "Did not succeed: leaderboard, players"
+    assert "players" not in crawls
+
+
+def test_skips_cascade_through_the_graph(crawls):
+    job = pipeline()
+    job._advance(None)
+    crawls["upcoming"].errback(Failure(RuntimeError("down")))
+    assert statuses(job) == {
+        "upcoming": "failed",
+        "leaderboard": "skipped",
+        "course_stats": "skipped",
+        "players": "skipped",
+    }
+    assert job.status == "failed"
+
+
+def test_scrape_jobs_do_not_share_kwargs():
+    first, second = jobs.ScrapeJob(scrape("a")), jobs.ScrapeJob(scrape("b"))
+    first.scrape.kwargs["full"] = True
+    assert second.scrape.kwargs == {}
+    assert scrape("c").kwargs is None
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(jobs, "_crawl", lambda runner, job: None)
+    monkeypatch.setattr(jobs, "_run_pipeline", lambda runner, pipeline: None)
+    return jobs.JobRegistry(None)
+
+
+def test_repeat_scrape_joins_the_running_job(registry):
+    first = registry.submit(scrape("leaderboard"))
+    assert registry.submit(scrape("leaderboard")) is first
+
+
+def test_same_spider_with_other_arguments_is_rejected(registry):
+    first = registry.submit(scrape("leaderboard"))
+    full = scrape("leaderboard")._replace(kwargs={"full": True})
+    with pytest.raises(jobs.JobConflict) as e:
+        registry.submit(full)
+    assert e.value.job is first
+
+
+def test_pipeline_and_standalone_runs_of_a_spider_exclude_each_other(registry):
+    standalone = registry.submit(scrape("leaderboard"))
+    with pytest.raises(jobs.JobConflict) as e:
+        registry.submit_pipeline("all", [(scrape("leaderboard"), ())])
+    assert e.value.job is standalone
+
+    other = jobs.JobRegistry(None)
+    pipeline = other.submit_pipeline("all", [(scrape("leaderboard"), ())])
+    stage = pipeline.stages[0][0]
+    assert other.submit(scrape("leaderboard")) is stage
+    with pytest.raises(jobs.JobConflict):
+        other.submit(scrape("leaderboard")._replace(kwargs={"full": True}))
@@ -0,0 +1,54 @@
+import logging
+from types import SimpleNamespace
+
+from pgatour_scraper import middlewares
+from pgatour_scraper.middlewares import PgatourScraperDownloaderMiddleware
+
+
+class FakeTable:
+    """Sync PostgREST builder answering .range() from `rows` sorted by url."""
+
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+        self.sort = None
+
+    def select(self, *args):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def order(self, column):
+        self.calls.append(("order", column))
+        self.sort = column
+        return self
+
+    def range(self, start, end):
+        self.calls.append(("range", start, end))
+        self.window = (start, end + 1)
+        return self
+
+    def execute(self):
+        rows = sorted(self.rows, key=lambda r: r[self.sort]) if self.sort else []
+        return SimpleNamespace(data=rows[slice(*self.window)])
+
+
+def test_load_pages_validators_in_url_order(monkeypatch):
+    monkeypatch.setattr(middlewares, "VALIDATOR_PAGE_SIZE", 2)
+    rows = [{"url": f"https://x/{i}", "etag": f'"{i}"'} for i in (3, 1, 4, 2, 5)]
+    calls = []
+    spider = SimpleNamespace(
+        name="pgatour_spider",
+        supabase=SimpleNamespace(table=lambda name: FakeTable(rows, calls)),
+        logger=logging.getLogger("test"),
+    )
+    mw = PgatourScraperDownloaderMiddleware(stats=None)
+    validators = mw._load(spider)
+    assert sorted(validators) == [f"https://x/{i}" for i in range(1, 6)]
+    assert [c for c in calls if c[0] == "range"] == [
+        ("range", 0, 1),
+        ("range", 2, 3),
+        ("range", 4, 5),
+    ]
+    assert calls.count(("order", "url")) == 3
@@ -0,0 +1,38 @@
+from pgatour_scraper.row_versions import changed_rows, next_version, removed_keys
+
+
+def test_changed_rows_keeps_new_and_changed_rows_only():
+    stored = {
+        1: {"player_id": 1, "position": "1", "version": 10},
+        2: {"player_id": 2, "position": "T2", "version": 10},
+    }
+    rows = [
+        {"player_id": 1, "position": "1"},
+        {"player_id": 2, "position": "3"},
+        {"player_id": 3, "position": "4"},
+    ]
+    assert [r["player_id"] for r in changed_rows(rows, stored)] == [2, 3]
+
+
+def test_changed_rows_treats_a_new_column_as_a_change():
+    stored = {1: {"player_id": 1, "position": "1"}}
+    assert changed_rows([{"player_id": 1, "position": "1", "thru": "F"}], stored)
+
+
+def test_changed_rows_custom_key():
+    stored = {"a": {"id": "a", "score": 1}}
+    assert changed_rows([{"id": "a", "score": 1}], stored, key="id") == []
+
+
+def test_next_version_is_strictly_increasing():
+    first = next_version()
+    assert next_version(first) > first
+    far_ahead = first + 10**9
+    assert next_version(far_ahead) == far_ahead + 1
+
+
+def test_removed_keys_lists_stored_rows_missing_from_the_scrape():
+    stored = {1: {"player_id": 1}, 2: {"player_id": 2}, 3: {"player_id": 3}}
+    rows = [{"player_id": 1}, {"player_id": 3}, {"player_id": 4}]
+    assert removed_keys(rows, stored) == [2]
+    assert removed_keys([], {}) == []
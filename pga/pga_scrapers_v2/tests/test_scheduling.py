@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+import pytest
+
+from pgatour_scraper.scheduling import (
+    LEADERBOARD_FINAL_SCRAPES,
+    LEADERBOARD_FINALIZE_DAYS,
+    LEADERBOARD_UPCOMING_DAYS,
+    leaderboard_due,
+    parse_date,
+)
+
+TODAY = date(2025, 6, 15)
+
+
+def days(n):
+    return TODAY + timedelta(days=n)
+
+
+@pytest.mark.parametrize(
+    "status, start, end, final_scrapes, due",
+    [
+        ("IN_PROGRESS", days(-1), days(2), 0, "live"),
+        # Stored status lagging behind the dates
+        ("UPCOMING", days(0), days(3), 0, "live"),
+        ("UPCOMING", days(LEADERBOARD_UPCOMING_DAYS), days(6), 0, "upcoming"),
+        ("UPCOMING", days(LEADERBOARD_UPCOMING_DAYS + 1), days(7), 0, None),
+        # First pass right away, the second from the day after the end
+        ("COMPLETED", days(-3), days(0), 0, "finalize"),
+        ("COMPLETED", days(-3), days(0), 1, None),
+        ("COMPLETED", days(-4), days(-1), 1, "finalize"),
+        ("COMPLETED", days(-4), days(-1), LEADERBOARD_FINAL_SCRAPES, None),
+        # A day of grace before an unfinished status counts as completed
+        ("IN_PROGRESS", days(-4), days(-1), 0, "live"),
+        ("IN_PROGRESS", days(-5), days(-2), 0, "finalize"),
+        # Historical
+        ("COMPLETED", days(-30), days(-LEADERBOARD_FINALIZE_DAYS - 1), 0, None),
+        # No end date: passes on consecutive runs, then frozen
+        ("COMPLETED", None, None, 0, "finalize"),
+        ("COMPLETED", None, None, 1, "finalize"),
+        ("COMPLETED", None, None, LEADERBOARD_FINAL_SCRAPES, None),
+        (None, None, None, 0, None),
+    ],
+)
+def test_leaderboard_due(status, start, end, final_scrapes, due):
+    assert leaderboard_due(status, start, end, final_scrapes, TODAY) == due
+
+
+def test_parse_date():
+    assert parse_date("2025-06-15T12:00:00Z") == date(2025, 6, 15)
+    assert parse_date("") is None
+    assert parse_date("TBD") is None
@@ -0,0 +1,163 @@
+"""Serialization and compression benchmark for the largest feed payloads.
+
+Builds a full-field leaderboard and a four-round hole-statistics response
+from synthetic rows, then reports encoded size and time per encoder:
+
+    python benchmark.py [--players 156] [--repeat 200]
+
+No database or network access is needed.
+"""
+
+import argparse
+import gzip
+import json
+import time
+from typing import Callable, List, Tuple
+
+import brotli
+from pydantic import BaseModel, TypeAdapter
+
+from models import (
+    CourseStatsCourseInfo,
+    CourseStatsHole,
+    CourseStatsResponse,
+    CourseStatsRound,
+    LeaderboardResponse,
+    LeaderboardRow,
+)
+from responses import BROTLI_QUALITY, GZIP_LEVEL, ORJSONResponse
+
+
+def build_leaderboard(players: int) -> LeaderboardResponse:
+    rows = [
+        LeaderboardRow(
+            player_id=40000 + i,
+            first_name="Scottie",
+            last_name=f"Player {i}",
+            position=f"T{i // 3 + 1}",
+            total=-20 + i // 4,
+            thru="F",
+            score="-3",
+            r1=66 + i % 5,
+            r2=68 + i % 4,
+            r3=70 + i % 3,
+            r4=69 + i % 6,
+            strokes=272 + i // 4,
+            projected=None,
+            starting=None,
+            country="USA",
+            country_flag="https://res.cloudinary.com/pgatour-prod/flags/USA.png",
+            player_url=f"https://www.pgatour.com/player/{40000 + i}/player-{i}",
+        )
+        for i in range(players)
+    ]
+    return LeaderboardResponse(
+        tournament_id="R2025464",
+        tournament_name="Procore Championship",
+        start_date="2025-09-11",
+        end_date="2025-09-14",
+        status="COMPLETED",
+        year=2025,
+        leaderboard=rows,
+        page=1,
+        page_size=players,
+        has_more=False,
+        total=players,
+    )
+
+
+def build_course_stats() -> CourseStatsResponse:
+    rounds = [
+        CourseStatsRound(
+            number=rnd,
+            holes=[
+                CourseStatsHole(
+                    number=hole,
+                    par=3 + hole % 3,
+                    yards=150 + hole * 23,
+                    eagles=hole % 2,
+                    birdies=10 + hole,
+                    pars=90 - hole,
+                    bogeys=20 + hole % 7,
+                    double_bogeys=hole % 4,
+                    scoring_average=4.0 + hole / 100,
+                    avg_diff=0.05 * (hole % 5) - 0.1,
+                    rank=hole,
+                )
+                for hole in range(1, 19)
+            ],
+        )
+        for rnd in range(1, 5)
+    ]
+    return CourseStatsResponse(
+        tournament_id="R2025464",
+        tournament_name="Procore Championship",
+        status="COMPLETED",
+        year=2025,
+        course=CourseStatsCourseInfo(name="Silverado Resort (North Course)", par=72),
+        rounds=rounds,
+    )
+
+
+def timed(fn: Callable[[], bytes], repeat: int) -> Tuple[bytes, float]:
+    out = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return out, (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(name: str, model: BaseModel, repeat: int) -> None:
+    adapter = TypeAdapter(type(model))
+    encoders: List[Tuple[str, Callable[[], bytes]]] = [
+        # FastAPI < 0.130 with the default JSONResponse
+        (
+            "stdlib json",
+            lambda: json.dumps(
+                adapter.dump_python(model, mode="json"),
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode(),
+        ),
+        (
+            "orjson",
+            lambda: ORJSONResponse(adapter.dump_python(model, mode="json")).body,
+        ),
+        # FastAPI >= 0.130 response_model fast path
+        ("pydantic dump_json", lambda: adapter.dump_json(model)),
+    ]
+    print(f"\n{name}")
+    print(f"  {'serializer':<20}{'bytes':>10}{'ms':>10}")
+    body = b""
+    for label, fn in encoders:
+        body, ms = timed(fn, repeat)
+        print(f"  {label:<20}{len(body):>10}{ms:>10.3f}")
+
+    compressors: List[Tuple[str, Callable[[], bytes]]] = [
+        ("identity", lambda: body),
+        (f"gzip-{GZIP_LEVEL}", lambda: gzip.compress(body, GZIP_LEVEL)),
+        (f"br-{BROTLI_QUALITY}", lambda: brotli.compress(body, quality=BROTLI_QUALITY)),
+    ]
+    print(f"  {'encoding':<20}{'bytes':>10}{'ms':>10}")
+    for label, fn in compressors:
+        out, ms = timed(fn, repeat)
+        print(f"  {label:<20}{len(out):>10}{ms:>10.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=156)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    bench(
+        f"LeaderboardResponse ({args.players} rows)",
+        build_leaderboard(args.players),
+        args.repeat,
+    )
+    bench(
+        "CourseStatsResponse (4 rounds x 18 holes)", build_course_stats(), args.repeat
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Polling clients revalidate every time; unchanged payloads cost a 304
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the raw rows a response is built from."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def conditional(
+    request: Request, response: Response, *parts: Any
+) -> Optional[Response]:
+    """Stamp an ETag for `parts` and answer 304 when If-None-Match matches.
+
+    Call with the raw rows before building response models, plus anything
+    else the body depends on, such as the sparse fieldset (or its variants
+    would share an ETag); a non-None return value is the 304 to send
+    instead. No Last-Modified is sent and If-Modified-Since is ignored: the
+    feed tables carry no per-row update time, and a date made up per
+    process would differ between instances.
+    """
+    etag = make_etag(*parts)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return None
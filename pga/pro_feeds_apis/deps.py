@@ -1,17 +1,139 @@
+import asyncio
+import logging
 import os
-from fastapi import Header, HTTPException, status
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+import httpx
+from fastapi import FastAPI, Header, HTTPException, Query, Request, status
 from dotenv import load_dotenv, find_dotenv
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+
+from services.cache import on_invalidate
+from services.live import LeaderboardHub
 
 load_dotenv(find_dotenv())
 
+logger = logging.getLogger(__name__)
+
+# Shared PostgREST connection pool (tunable per deployment)
+SUPABASE_POOL_SIZE = int(os.environ.get("SUPABASE_POOL_SIZE", "100"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_KEEPALIVE_EXPIRY", "60"))
+SUPABASE_TIMEOUT = float(os.environ.get("SUPABASE_TIMEOUT", "10"))
+# Most ids one :batch request may ask for (one `in` filter per request)
+BATCH_MAX_IDS = int(os.environ.get("BATCH_MAX_IDS", "200"))
+HEALTH_TABLE = "pga_tournaments"
+HEALTH_COLUMN = "tournament_id"
+
+
+class SupabasePool:
+    """Process-wide Supabase client backed by one keep-alive HTTP pool.
+
+    The client is built once and reused by every request. It is rebuilt
+    lazily when the underlying HTTP client was closed or a request failed
+    at the transport level (dropped connection, DNS, TLS).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        pool_size: int = SUPABASE_POOL_SIZE,
+        keepalive_expiry: float = SUPABASE_KEEPALIVE_EXPIRY,
+        timeout: float = SUPABASE_TIMEOUT,
+    ):
+        self.url = url
+        self.key = key
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._lock = asyncio.Lock()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._client: Optional[AsyncClient] = None
+        self._healthy = False
+
+    @classmethod
+    def from_env(cls) -> "SupabasePool":
+        url = os.environ.get("SUPABASE_URL")
+        key = os.environ.get("SUPABASE_KEY")
+        if not url or not key:
+            raise RuntimeError("Supabase credentials are not configured")
+        return cls(url, key)
+
+    async def _build(self) -> AsyncClient:
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=self.timeout,
+        )
+        self._client = await acreate_client(
+            self.url, self.key, options=AsyncClientOptions(httpx_client=self._http)
+        )
+        self._healthy = True
+        return self._client
+
+    async def get(self) -> AsyncClient:
+        client = self._client
+        if client is not None and self._healthy and not self._http.is_closed:
+            return client
+        async with self._lock:
+            if self._client is None or not self._healthy or self._http.is_closed:
+                logger.info("Building pooled Supabase client")
+                await self._build()
+            return self._client
+
+    def invalidate(self) -> None:
+        """Force the next get() to rebuild the client and its connections."""
+        self._healthy = False
+
+    async def ping(self) -> bool:
+        """Run a minimal query to open (and verify) a pooled connection."""
+        try:
+            client = await self.get()
+            await client.table(HEALTH_TABLE).select(HEALTH_COLUMN).limit(1).execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Supabase health check failed: {e}")
+            self.invalidate()
+            return False
 
-def get_supabase_client() -> Client:
-    url = os.environ.get("SUPABASE_URL")
-    key = os.environ.get("SUPABASE_KEY")
-    if not url or not key:
-        raise RuntimeError("Supabase credentials are not configured")
-    return create_client(url, key)
+    async def close(self) -> None:
+        async with self._lock:
+            if self._http is not None and not self._http.is_closed:
+                await self._http.aclose()
+            self._client = None
+            self._http = None
+            self._healthy = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pool = SupabasePool.from_env()
+    await pool.ping()
+    app.state.supabase = pool
+    app.state.leaderboard_hub = LeaderboardHub(pool)
+    # New leaderboard rows, stamped or POSTed: push them to streaming clients
+    remove_listener = on_invalidate(app.state.leaderboard_hub.invalidated)
+    try:
+        yield
+    finally:
+        remove_listener()
+        await app.state.leaderboard_hub.close()
+        await pool.close()
+
+
+async def get_supabase_client(request: Request) -> AsyncIterator[AsyncClient]:
+    pool: SupabasePool = request.app.state.supabase
+    try:
+        yield await pool.get()
+    except httpx.TransportError:
+        pool.invalidate()
+        raise
 
 
 async def authorize_request(x_api_key: str = Header(None)):
@@ -25,3 +147,49 @@ async def authorize_request(x_api_key: str = Header(None)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key"
         )
+
+
+def batch_ids(
+    ids: List[str] = Query(description="Comma-separated ids; may be repeated"),
+) -> List[str]:
+    """Distinct ids from `?ids=a,b&ids=c`, in request order, bounded."""
+    parsed = list(
+        dict.fromkeys(i.strip() for chunk in ids for i in chunk.split(",") if i.strip())
+    )
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No ids given")
+    if len(parsed) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request"
+        )
+    return parsed
+
+
+def sparse_fields(
+    columns: Dict[str, Sequence[str]],
+) -> Callable[..., Optional[List[str]]]:
+    """Dependency parsing `?fields=a,b` against a field -> columns map.
+
+    Returns the requested fields in schema order, or None (all fields)
+    when the parameter is absent. Unknown fields are a 400.
+    """
+
+    def dependency(
+        fields: Optional[str] = Query(
+            default=None,
+            description="Comma-separated fields to return: " + ", ".join(columns),
+        ),
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        asked = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = asked.difference(columns)
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        if not asked:
+            raise HTTPException(status_code=400, detail="No fields given")
+        return [f for f in columns if f in asked]
+
+    return dependency
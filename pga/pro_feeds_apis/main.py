@@ -1,162 +1,290 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from deps import authorize_request, get_supabase_client
+from supabase import AsyncClient
+
+from conditional import conditional
+from responses import CompressionMiddleware, row_response, stream_response
+from deps import (
+    authorize_request,
+    batch_ids,
+    get_supabase_client,
+    lifespan,
+    sparse_fields,
+)
 from models import (
-    CourseInfo,
+    CacheInvalidateRequest,
+    CacheInvalidateResponse,
+    CacheStatsResponse,
     TournamentOut,
     TournamentsResponse,
+    TournamentsBatchResponse,
     LeaderboardResponse,
-    LeaderboardRow,
+    LeaderboardFullResponse,
+    LeaderboardDeltaResponse,
     CourseStatsResponse,
-    CourseStatsCourseInfo,
-    CourseStatsRound,
-    CourseStatsHole,
+    EMPTY_COURSE_STATS,
     PlayerProfile,
-    PlayerStatistics,
     PlayersResponse,
-    PlayerListItem,
+    PlayersBatchResponse,
     TicketUrlResponse,
-    TicketUrlItem,
+    leaderboard_row,
+    player_list_row,
+    player_profile_row,
+    ticket_row,
+    tournament_row,
 )
 from services.tournaments import (
     fetch_tournaments,
     fetch_tournament_by_id,
+    fetch_tournaments_by_id,
     fetch_upcoming_ticket_urls,
 )
 from services.leaderboards import (
-    fetch_leaderboard_rows,
+    fetch_course_stats,
+    fetch_full_leaderboard,
+    fetch_leaderboard_changes,
+    fetch_leaderboard,
     fetch_tournament_header,
-    fetch_course_stats_rows,
+    latest_version,
 )
-from services.players import fetch_player_profile, fetch_players
+from services.live import leaderboard_events
+from services.players import fetch_player_profile, fetch_player_profiles, fetch_players
+from services.cache import cache_stats, invalidate
+from services.pagination import CountMode, InvalidCursor
 
 
-app = FastAPI(title="PGA Tour Feeds API", version="1.0.0")
+app = FastAPI(title="PGA Tour Feeds API", version="1.0.0", lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
 
 
 # List tournaments
 @app.get("/pga/tournaments", response_model=TournamentsResponse)
 async def list_tournaments(
+    request: Request,
+    response: Response,
     year: int = Query(description="Tournament year (e.g., 2025)"),
     status_filter: Optional[str] = Query(
         default=None, alias="status", description="UPCOMING|COMPLETED|IN_PROGRESS"
     ),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(tournament_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
-    rows, total = fetch_tournaments(sb, year, status_filter, page, page_size)
-
-    tournaments: List[TournamentOut] = []
-    for r in rows:
-        tournaments.append(
-            TournamentOut(
-                id=r.get("tournament_id"),
-                name=r.get("tournament_name", ""),
-                tournament_name=r.get("tournament_name", ""),
-                year=(int(r["year"]) if r.get("year") is not None else None),
-                month=r.get("month"),
-                start_date=(r.get("start_date") or None),
-                end_date=(r.get("end_date") or None),
-                purse_amount=r.get("purse_amount"),
-                fedex_cup=r.get("fedex_cup"),
-                status=r.get("status"),
-                previous_winner=r.get("previous_winner"),
-                winner_prize=r.get("winner_prize"),
-                tournament_url=r.get("tournament_url"),
-                tournament_logo=r.get("tournament_logo"),
-                ticket_url=r.get("ticket_url"),
-                course=CourseInfo(
-                    name=r.get("course_name"),
-                    city=r.get("city"),
-                    state=r.get("state"),
-                    country=r.get("country"),
-                ),
-            )
-        )
-
-    # Determine has_more
-    if total is not None:
-        has_more = (page * page_size) < total
-    else:
-        has_more = len(rows) == page_size
-
-    return TournamentsResponse(
-        tournaments=tournaments, page=page, page_size=page_size, has_more=has_more
+    result = await fetch_tournaments(
+        sb,
+        year,
+        status_filter,
+        page,
+        page_size,
+        count,
+        tournament_row.columns_for(fields),
+    )
+    not_modified = conditional(request, response, fields, result)
+    if not_modified:
+        return not_modified
+
+    map_row = tournament_row.only(fields)
+    return row_response(
+        {
+            "tournaments": [map_row(r) for r in result.rows],
+            "page": page,
+            "page_size": page_size,
+            "has_more": result.has_more,
+            "total": result.total,
+        },
+        response,
     )
 
 
 # Get tournament by id
 @app.get("/pga/tournaments/{tournament_id}", response_model=TournamentOut)
-# async def get_tournament(tournament_id: str, _: None = Depends(authorize_request)):
-async def get_tournament(tournament_id: str):
-    sb = get_supabase_client()
-    r = fetch_tournament_by_id(sb, tournament_id)
+async def get_tournament(
+    tournament_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[List[str]] = Depends(sparse_fields(tournament_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    r = await fetch_tournament_by_id(sb, tournament_id)
     if not r:
         raise HTTPException(status_code=404, detail="Not found")
-    return TournamentOut(
-        id=r.get("tournament_id"),
-        name=r.get("tournament_name", ""),
-        tournament_name=r.get("tournament_name", ""),
-        year=(int(r["year"]) if r.get("year") is not None else None),
-        month=r.get("month"),
-        start_date=(r.get("start_date") or None),
-        end_date=(r.get("end_date") or None),
-        purse_amount=r.get("purse_amount"),
-        fedex_cup=r.get("fedex_cup"),
-        status=r.get("status"),
-        previous_winner=r.get("previous_winner"),
-        winner_prize=r.get("winner_prize"),
-        tournament_url=r.get("tournament_url"),
-        tournament_logo=r.get("tournament_logo"),
-        ticket_url=r.get("ticket_url"),
-        course=CourseInfo(
-            name=r.get("course_name"),
-            city=r.get("city"),
-            state=r.get("state"),
-            country=r.get("country"),
-        ),
+    not_modified = conditional(request, response, fields, r)
+    if not_modified:
+        return not_modified
+
+    return row_response(tournament_row.only(fields)(r), response)
+
+
+# Get tournaments for many tournament_ids in one request
+@app.get("/pga/tournaments:batch", response_model=TournamentsBatchResponse)
+async def get_tournaments_batch(
+    request: Request,
+    response: Response,
+    ids: List[str] = Depends(batch_ids),
+    fields: Optional[List[str]] = Depends(sparse_fields(tournament_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    rows = await fetch_tournaments_by_id(sb, ids)
+    not_modified = conditional(request, response, fields, rows)
+    if not_modified:
+        return not_modified
+
+    map_row = tournament_row.only(fields)
+    return row_response(
+        {
+            "tournaments": {tid: map_row(rows[tid]) for tid in ids if tid in rows},
+            "missing": [tid for tid in ids if tid not in rows],
+        },
+        response,
     )
 
 
 # Get leaderboard by tournament id
 @app.get(
     "/pga/tournaments/{tournament_id}/leaderboard",
-    response_model=LeaderboardResponse,
+    response_model=Union[LeaderboardResponse, LeaderboardDeltaResponse],
 )
 async def get_leaderboard(
     tournament_id: str,
+    request: Request,
+    response: Response,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    cursor: Optional[str] = Query(
+        default=None, description="Opaque next_cursor from a previous page"
+    ),
+    since_version: Optional[int] = Query(
+        default=None,
+        ge=0,
+        description="Return only rows changed after this version (see `version`)",
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(leaderboard_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    columns = leaderboard_row.columns_for(fields)
+    map_row = leaderboard_row.only(fields)
+    if since_version is not None:
+        delta = await fetch_leaderboard_changes(
+            sb, tournament_id, since_version, columns
+        )
+        if not delta:
+            raise HTTPException(status_code=404, detail="Not found")
+        header, rows, removals = delta
+        not_modified = conditional(request, response, fields, header, rows, removals)
+        if not_modified:
+            return not_modified
+
+        return row_response(
+            {
+                "tournament_id": header.get("tournament_id"),
+                "since_version": since_version,
+                "version": latest_version(rows + removals, since_version),
+                "changed": [map_row(r) for r in rows],
+                "removed": [r["player_id"] for r in removals],
+            },
+            response,
+        )
+
+    try:
+        lb = await fetch_leaderboard(
+            sb, tournament_id, page, page_size, count, cursor, columns
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not lb:
+        raise HTTPException(status_code=404, detail="Not found")
+    header, result = lb
+    not_modified = conditional(request, response, fields, header, result)
+    if not_modified:
+        return not_modified
+
+    return row_response(
+        {
+            "tournament_id": header.get("tournament_id"),
+            "tournament_name": header.get("tournament_name", ""),
+            "start_date": header.get("start_date"),
+            "end_date": header.get("end_date"),
+            "status": header.get("status"),
+            "year": int(header["year"]) if header.get("year") is not None else None,
+            "leaderboard": [map_row(r) for r in result.rows],
+            "page": page,
+            "page_size": page_size,
+            "has_more": result.has_more,
+            "total": result.total,
+            "next_cursor": result.next_cursor,
+        },
+        response,
+    )
+
+
+# Whole field in one cached, streamed response
+@app.get(
+    "/pga/tournaments/{tournament_id}/leaderboard/full",
+    response_model=LeaderboardFullResponse,
+)
+async def get_full_leaderboard(
+    tournament_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[List[str]] = Depends(sparse_fields(leaderboard_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
+    full = await fetch_full_leaderboard(sb, tournament_id)
+    if not full:
+        raise HTTPException(status_code=404, detail="Not found")
+    header, rows, version = full
+    not_modified = conditional(request, response, fields, header, rows)
+    if not_modified:
+        return not_modified
+
+    return stream_response(
+        {
+            "tournament_id": header.get("tournament_id"),
+            "tournament_name": header.get("tournament_name", ""),
+            "start_date": header.get("start_date"),
+            "end_date": header.get("end_date"),
+            "status": header.get("status"),
+            "year": int(header["year"]) if header.get("year") is not None else None,
+            "total": len(rows),
+            "version": version,
+        },
+        "leaderboard",
+        map(leaderboard_row.only(fields), rows),
+        response,
+    )
 
-    header = fetch_tournament_header(sb, tournament_id)
+
+# Live leaderboard as Server-Sent Events: a snapshot, then per-player diffs
+@app.get("/pga/tournaments/{tournament_id}/leaderboard/stream")
+async def stream_leaderboard(
+    tournament_id: str,
+    request: Request,
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    header = await fetch_tournament_header(sb, tournament_id)
     if not header:
         raise HTTPException(status_code=404, detail="Not found")
 
-    rows, total = fetch_leaderboard_rows(sb, tournament_id, page, page_size)
-    leaderboard = [LeaderboardRow(**r) for r in rows]
-    if total is not None:
-        has_more = (page * page_size) < total
-    else:
-        has_more = len(rows) == page_size
-
-    return LeaderboardResponse(
-        tournament_id=header.get("tournament_id"),
-        tournament_name=header.get("tournament_name", ""),
-        start_date=header.get("start_date"),
-        end_date=header.get("end_date"),
-        status=header.get("status"),
-        year=int(header["year"]) if header.get("year") is not None else None,
-        leaderboard=leaderboard,
-        page=page,
-        page_size=page_size,
-        has_more=has_more,
+    return StreamingResponse(
+        leaderboard_events(request.app.state.leaderboard_hub, tournament_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -167,201 +295,179 @@ async def get_leaderboard(
 )
 async def get_course_stats(
     tournament_id: str,
+    request: Request,
+    response: Response,
+    course: Optional[str] = Query(
+        default=None, description="Course name; only that course's holes"
+    ),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
-
-    header = fetch_tournament_header(sb, tournament_id)
-    if not header:
+    stats = await fetch_course_stats(sb, tournament_id, course)
+    if not stats:
         raise HTTPException(status_code=404, detail="Not found")
-
-    rows = fetch_course_stats_rows(sb, tournament_id)
-    if not rows:
-        return CourseStatsResponse(
-            tournament_id=header.get("tournament_id"),
-            tournament_name=header.get("tournament_name", ""),
-            start_date=header.get("start_date"),
-            end_date=header.get("end_date"),
-            status=header.get("status"),
-            year=int(header["year"]) if header.get("year") is not None else None,
-            course=CourseStatsCourseInfo(),
-            rounds=[],
-        )
-
-    first = rows[0]
-    course_info = CourseStatsCourseInfo(
-        name=first.get("course_name"),
-        yardage=first.get("course_yardage"),
-        par=first.get("course_par"),
-        record=first.get("course_record"),
-        fairway=first.get("course_fairway"),
-        design=first.get("course_design"),
-        established=first.get("course_established"),
-    )
-
-    rounds_map: dict[int, list[CourseStatsHole]] = {}
-    for r in rows:
-        round_no = r.get("round")
-        hole_obj = CourseStatsHole(
-            number=r.get("hole"),
-            par=r.get("par"),
-            yards=r.get("yards"),
-            eagles=r.get("eagles"),
-            birdies=r.get("birdies"),
-            pars=r.get("pars"),
-            bogeys=r.get("bogeys"),
-            double_bogeys=r.get("double_bogeys"),
-            scoring_average=(
-                float(r["scoring_average"])
-                if r.get("scoring_average") is not None
-                else None
-            ),
-            avg_diff=(float(r["avg_diff"]) if r.get("avg_diff") is not None else None),
-            rank=r.get("rank"),
-        )
-        rounds_map.setdefault(round_no, []).append(hole_obj)
-
-    rounds_out: list[CourseStatsRound] = []
-    for round_no in sorted(rounds_map.keys()):
-        holes_sorted = sorted(rounds_map[round_no], key=lambda h: (h.number or 0))
-        rounds_out.append(CourseStatsRound(number=round_no, holes=holes_sorted))
-
-    return CourseStatsResponse(
-        tournament_id=header.get("tournament_id"),
-        tournament_name=header.get("tournament_name", ""),
-        start_date=header.get("start_date"),
-        end_date=header.get("end_date"),
-        status=header.get("status"),
-        year=int(header["year"]) if header.get("year") is not None else None,
-        course=course_info,
-        rounds=rounds_out,
+    header, documents = stats
+    if course and not documents:
+        raise HTTPException(status_code=404, detail="Course not found")
+    not_modified = conditional(request, response, header, documents)
+    if not_modified:
+        return not_modified
+
+    primary, *others = documents or [EMPTY_COURSE_STATS]
+    return row_response(
+        {
+            "tournament_id": header.get("tournament_id"),
+            "tournament_name": header.get("tournament_name", ""),
+            "start_date": header.get("start_date"),
+            "end_date": header.get("end_date"),
+            "status": header.get("status"),
+            "year": int(header["year"]) if header.get("year") is not None else None,
+            **primary,
+            "other_courses": others,
+        },
+        response,
     )
 
 
 # List players
 @app.get("/pga/players", response_model=PlayersResponse)
 async def list_players(
+    request: Request,
+    response: Response,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    cursor: Optional[str] = Query(
+        default=None, description="Opaque next_cursor from a previous page"
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(player_list_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
-    rows, total = fetch_players(sb, page, page_size)
-
-    items: list[PlayerListItem] = []
-    for r in rows:
-        items.append(
-            PlayerListItem(
-                id=int(r.get("player_id")),
-                first_name=r.get("first_name"),
-                last_name=r.get("last_name"),
-                height=r.get("height"),
-                weight=r.get("weight"),
-                age=(int(r["age"]) if r.get("age") is not None else None),
-                birthday=r.get("birthday"),
-                country=r.get("country"),
-                country_flag=r.get("country_flag"),
-                residence=r.get("residence"),
-                birth_place=r.get("birth_place"),
-                family=r.get("family"),
-                college=r.get("college"),
-                turned_pro=(
-                    int(r["turned_pro_year"])
-                    if r.get("turned_pro_year") is not None
-                    else None
-                ),
-                image_url=r.get("image_url"),
-            )
+    try:
+        result = await fetch_players(
+            sb, page, page_size, count, cursor, player_list_row.columns_for(fields)
         )
-
-    if total is not None:
-        has_more = (page * page_size) < total
-    else:
-        has_more = len(rows) == page_size
-
-    return PlayersResponse(
-        players=items, page=page, page_size=page_size, has_more=has_more
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    not_modified = conditional(request, response, fields, result)
+    if not_modified:
+        return not_modified
+
+    map_row = player_list_row.only(fields)
+    return row_response(
+        {
+            "players": [map_row(r) for r in result.rows],
+            "page": page,
+            "page_size": page_size,
+            "has_more": result.has_more,
+            "total": result.total,
+            "next_cursor": result.next_cursor,
+        },
+        response,
     )
 
 
 # Get player profile by player_id
 @app.get("/pga/players/{player_id}/profile", response_model=PlayerProfile)
-# async def get_player_profile(player_id: int, _: None = Depends(authorize_request)):
-async def get_player_profile(player_id: int):
-    sb = get_supabase_client()
-    r = fetch_player_profile(sb, player_id)
+async def get_player_profile(
+    player_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[List[str]] = Depends(sparse_fields(player_profile_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    r = await fetch_player_profile(sb, player_id)
     if not r:
         raise HTTPException(status_code=404, detail="Not found")
+    not_modified = conditional(request, response, fields, r)
+    if not_modified:
+        return not_modified
 
-    stats = PlayerStatistics(
-        events_played=r.get("events_played"),
-        career_wins=r.get("career_wins"),
-        wins_current_year=r.get("wins_current_year"),
-        second_place=r.get("runner_up"),
-        third_place=r.get("third_place"),
-        top_10=r.get("top_10"),
-        top_25=r.get("top_25"),
-        cuts_made=(
-            r.get("cuts_made") if r.get("cuts_made") not in ("-", "", None) else None
-        ),
-        official_money=r.get("official_money"),
-        career_earnings=r.get("career_earnings"),
-    )
+    return row_response(player_profile_row.only(fields)(r), response)
 
-    return PlayerProfile(
-        id=int(r.get("player_id")),
-        first_name=r.get("first_name"),
-        last_name=r.get("last_name"),
-        height=r.get("height"),
-        weight=r.get("weight"),
-        age=(int(r["age"]) if r.get("age") is not None else None),
-        birthday=r.get("birthday"),
-        country=r.get("country"),
-        country_flag=r.get("country_flag"),
-        residence=r.get("residence"),
-        birth_place=r.get("birth_place"),
-        family=r.get("family"),
-        college=r.get("college"),
-        turned_pro=(
-            int(r["turned_pro_year"]) if r.get("turned_pro_year") is not None else None
-        ),
-        image_url=r.get("image_url"),
-        statistics=stats,
+
+# Get player profiles for many player_ids in one request
+@app.get("/pga/players:batch", response_model=PlayersBatchResponse)
+async def get_players_batch(
+    request: Request,
+    response: Response,
+    ids: List[str] = Depends(batch_ids),
+    fields: Optional[List[str]] = Depends(sparse_fields(player_profile_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
+    # _: None = Depends(authorize_request),
+):
+    try:
+        player_ids = [int(i) for i in ids]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Player ids must be integers")
+    rows = await fetch_player_profiles(sb, player_ids)
+    not_modified = conditional(request, response, fields, rows)
+    if not_modified:
+        return not_modified
+
+    map_row = player_profile_row.only(fields)
+    return row_response(
+        {
+            "players": {
+                str(pid): map_row(rows[pid]) for pid in player_ids if pid in rows
+            },
+            "missing": [pid for pid in player_ids if pid not in rows],
+        },
+        response,
     )
 
 
 # Get ticket URLs for upcoming tournaments
 @app.get("/pga/tickets", response_model=TicketUrlResponse)
 async def get_ticket_urls(
+    request: Request,
+    response: Response,
     year: int = Query(description="Tournament year (e.g., 2025)"),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=200),
+    count: CountMode = Query(
+        default="exact", description="exact|planned|estimated|none"
+    ),
+    fields: Optional[List[str]] = Depends(sparse_fields(ticket_row.columns)),
+    sb: AsyncClient = Depends(get_supabase_client),
     # _: None = Depends(authorize_request),
 ):
-    sb = get_supabase_client()
-    rows, total = fetch_upcoming_ticket_urls(sb, year, page, page_size)
-
-    ticket_urls: List[TicketUrlItem] = []
-    for r in rows:
-        ticket_urls.append(
-            TicketUrlItem(
-                tournament_id=r.get("tournament_id"),
-                tournament_name=r.get("tournament_name", ""),
-                year=(int(r["year"]) if r.get("year") is not None else None),
-                month=r.get("month"),
-                start_date=(r.get("start_date") or None),
-                end_date=(r.get("end_date") or None),
-                ticket_url=r.get("ticket_url"),
-                tournament_logo=r.get("tournament_logo"),
-            )
-        )
+    result = await fetch_upcoming_ticket_urls(
+        sb, year, page, page_size, count, ticket_row.columns_for(fields)
+    )
+    not_modified = conditional(request, response, fields, result)
+    if not_modified:
+        return not_modified
+
+    map_row = ticket_row.only(fields)
+    return row_response(
+        {
+            "tickets": [map_row(r) for r in result.rows],
+            "page": page,
+            "page_size": page_size,
+            "has_more": result.has_more,
+            "total": result.total,
+        },
+        response,
+    )
 
-    # Determine has_more
-    if total is not None:
-        has_more = (page * page_size) < total
-    else:
-        has_more = len(rows) == page_size
 
-    return TicketUrlResponse(
-        tickets=ticket_urls, page=page, page_size=page_size, has_more=has_more
-    )
+# Drop cached tournament/player reads; called by the scrapers from closed()
+@app.post("/pga/cache/invalidate", response_model=CacheInvalidateResponse)
+async def invalidate_cache(
+    body: CacheInvalidateRequest = CacheInvalidateRequest(),
+    _: None = Depends(authorize_request),
+):
+    return CacheInvalidateResponse(invalidated=invalidate(body.entities))
+
+
+# Cache sizes and hit/miss counters
+@app.get("/pga/cache/stats", response_model=CacheStatsResponse)
+async def get_cache_stats(
+    _: None = Depends(authorize_request),
+):
+    return CacheStatsResponse(caches=cache_stats())
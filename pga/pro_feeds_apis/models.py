@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, get_args
 from pydantic import BaseModel
 
 
@@ -27,11 +27,17 @@ class TournamentOut(BaseModel):
     course: CourseInfo
 
 
+class TournamentsBatchResponse(BaseModel):
+    tournaments: Dict[str, TournamentOut]
+    missing: List[str]
+
+
 class TournamentsResponse(BaseModel):
     tournaments: List[TournamentOut]
     page: int
     page_size: int
     has_more: bool
+    total: Optional[int] = None
 
 
 class LeaderboardRow(BaseModel):
@@ -65,6 +71,28 @@ class LeaderboardResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class LeaderboardFullResponse(BaseModel):
+    tournament_id: str
+    tournament_name: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    status: Optional[str] = None
+    year: Optional[int] = None
+    total: int
+    version: int = 0
+    leaderboard: List[LeaderboardRow]
+
+
+class LeaderboardDeltaResponse(BaseModel):
+    tournament_id: str
+    since_version: int
+    version: int
+    changed: List[LeaderboardRow]
+    removed: List[int] = []
 
 
 class CourseStatsCourseInfo(BaseModel):
@@ -96,6 +124,11 @@ class CourseStatsRound(BaseModel):
     holes: List[CourseStatsHole]
 
 
+class CourseStatsCourse(BaseModel):
+    course: CourseStatsCourseInfo
+    rounds: List[CourseStatsRound]
+
+
 class CourseStatsResponse(BaseModel):
     tournament_id: str
     tournament_name: str
@@ -103,8 +136,18 @@ class CourseStatsResponse(BaseModel):
     end_date: Optional[str] = None
     status: Optional[str] = None
     year: Optional[int] = None
+    # Host course (or the one asked for); multi-course events list the rest
+    # in other_courses
     course: CourseStatsCourseInfo
     rounds: List[CourseStatsRound]
+    other_courses: List[CourseStatsCourse] = []
+
+
+# Served until the course stats spider has stored the tournament's document
+EMPTY_COURSE_STATS: Dict[str, Any] = {
+    "course": CourseStatsCourseInfo().model_dump(),
+    "rounds": [],
+}
 
 
 class PlayerStatistics(BaseModel):
@@ -162,6 +205,13 @@ class PlayersResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class PlayersBatchResponse(BaseModel):
+    players: Dict[str, PlayerProfile]
+    missing: List[int]
 
 
 class TicketUrlItem(BaseModel):
@@ -180,3 +230,158 @@ class TicketUrlResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    total: Optional[int] = None
+
+
+class CacheInvalidateRequest(BaseModel):
+    entities: Optional[List[str]] = None
+
+
+class CacheInvalidateResponse(BaseModel):
+    invalidated: Dict[str, int]
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+
+
+class CacheStatsResponse(BaseModel):
+    caches: Dict[str, CacheStats]
+
+
+# Row -> response mapping. List routes return these dicts directly (see
+# responses.row_response), so rows are not built into models per request.
+
+RowMapper = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _number_type(annotation: Any) -> Optional[type]:
+    for t in (annotation, *get_args(annotation)):
+        if t in (int, float):
+            return t
+    return None
+
+
+def reads(*columns: str) -> Callable[[RowMapper], RowMapper]:
+    """Declare the columns a computed source reads (see row_mapper)."""
+
+    def decorator(fn: RowMapper) -> RowMapper:
+        fn.columns = columns
+        return fn
+
+    return decorator
+
+
+def blank_to_none(column: str) -> RowMapper:
+    """Source for a field whose empty-string column value means unset."""
+    return reads(column)(lambda row: row.get(column) or None)
+
+
+def _source_columns(model: Type[BaseModel], name: str, source: Any) -> Tuple[str, ...]:
+    columns = getattr(source, "columns", None)
+    if columns is None:
+        raise ValueError(f"{model.__name__}.{name}: declare its columns with @reads")
+    if isinstance(columns, dict):
+        # A nested row_mapper reads all of its own fields' columns
+        return tuple(dict.fromkeys(c for cols in columns.values() for c in cols))
+    return tuple(columns)
+
+
+def _compile(plan: List[Tuple[str, Optional[str], Any]]) -> RowMapper:
+    def map_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        out = {}
+        for name, column, convert in plan:
+            if column is None:
+                out[name] = convert(row)
+            else:
+                value = row.get(column)
+                if value is not None and convert is not None:
+                    value = convert(value)
+                out[name] = value
+        return out
+
+    return map_row
+
+
+def row_mapper(model: Type[BaseModel], **sources: Any) -> RowMapper:
+    """Precompile a mapping from a DB row to a dict shaped like `model`.
+
+    Each field reads the column of the same name unless `sources` names
+    another column or gives a callable taking the whole row (computed and
+    nested fields). int/float fields are coerced the way the routes did;
+    extra columns are dropped, so the output matches the model's schema.
+
+    For sparse `?fields=` responses the mapper also carries `columns`
+    (field -> the columns it reads; computed sources declare theirs with
+    @reads), `columns_for(fields)`, the columns to select for `fields`,
+    and `only(fields)`, the mapping restricted to `fields`. Both treat
+    fields=None as every field.
+    """
+    plan = []
+    columns: Dict[str, Tuple[str, ...]] = {}
+    for name, field in model.model_fields.items():
+        source = sources.pop(name, name)
+        if callable(source):
+            plan.append((name, None, source))
+            columns[name] = _source_columns(model, name, source)
+        else:
+            plan.append((name, source, _number_type(field.annotation)))
+            columns[name] = (source,)
+    if sources:
+        raise ValueError(f"{model.__name__} has no fields {sorted(sources)}")
+
+    map_row = _compile(plan)
+
+    def columns_for(fields: Optional[List[str]]) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        return list(dict.fromkeys(c for f in fields for c in columns[f]))
+
+    def only(fields: Optional[List[str]]) -> RowMapper:
+        if fields is None:
+            return map_row
+        return _compile([step for step in plan if step[0] in fields])
+
+    map_row.columns = columns
+    map_row.columns_for = columns_for
+    map_row.only = only
+    return map_row
+
+
+tournament_row = row_mapper(
+    TournamentOut,
+    id="tournament_id",
+    name="tournament_name",
+    start_date=blank_to_none("start_date"),
+    end_date=blank_to_none("end_date"),
+    course=row_mapper(CourseInfo, name="course_name"),
+)
+leaderboard_row = row_mapper(LeaderboardRow)
+player_list_row = row_mapper(
+    PlayerListItem, id="player_id", turned_pro="turned_pro_year"
+)
+
+
+@reads("cuts_made")
+def _cuts_made(row: Dict[str, Any]) -> Optional[int]:
+    value = row.get("cuts_made")
+    return None if value in ("-", "", None) else int(value)
+
+
+player_profile_row = row_mapper(
+    PlayerProfile,
+    id="player_id",
+    turned_pro="turned_pro_year",
+    statistics=row_mapper(
+        PlayerStatistics, second_place="runner_up", cuts_made=_cuts_made
+    ),
+)
+ticket_row = row_mapper(
+    TicketUrlItem,
+    start_date=blank_to_none("start_date"),
+    end_date=blank_to_none("end_date"),
+)
@@ -0,0 +1,201 @@
+import functools
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+# Data below only changes when a scraper run finishes. The scrapers stamp
+# a row per rewritten entity in CACHE_VERSION_TABLE from closed(), and every
+# instance compares those stamps at most every CACHE_VERSION_CHECK_SECS, so
+# TTLs are only a safety net. POST /pga/cache/invalidate drops at once.
+CACHE_MAXSIZE = int(os.environ.get("CACHE_MAXSIZE", "1024"))
+CACHE_TTL_TOURNAMENTS = float(os.environ.get("CACHE_TTL_TOURNAMENTS", "300"))
+CACHE_TTL_PLAYERS = float(os.environ.get("CACHE_TTL_PLAYERS", "900"))
+CACHE_TTL_LEADERBOARDS = float(os.environ.get("CACHE_TTL_LEADERBOARDS", "60"))
+CACHE_TTL_COURSE_STATS = float(os.environ.get("CACHE_TTL_COURSE_STATS", "300"))
+CACHE_VERSION_CHECK_SECS = float(os.environ.get("CACHE_VERSION_CHECK_SECS", "10"))
+CACHE_VERSION_TABLE = "feed_cache_versions"
+CACHE_VERSION_FEED = "pga"
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire `ttl` seconds after insert."""
+
+    def __init__(self, name: str, ttl: float, maxsize: int = CACHE_MAXSIZE):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> int:
+        n = len(self._data)
+        self._data.clear()
+        return n
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# One cache per scraped entity, so a scraper only drops what it rewrote
+CACHES: Dict[str, TTLCache] = {
+    "tournaments": TTLCache("tournaments", CACHE_TTL_TOURNAMENTS),
+    "players": TTLCache("players", CACHE_TTL_PLAYERS),
+    "leaderboards": TTLCache("leaderboards", CACHE_TTL_LEADERBOARDS),
+    "course_stats": TTLCache("course_stats", CACHE_TTL_COURSE_STATS),
+}
+
+
+def cached(entity: str):
+    """Cache an async `fetch_x(sb, *args)` by args under `entity`.
+
+    The Supabase client is not part of the key. Empty results (None) are
+    not cached so a row inserted by the next scrape shows up immediately.
+    """
+
+    def decorator(fn):
+        prefix = fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(sb, *args):
+            await check_versions(sb)
+            cache = CACHES[entity]
+            key = (prefix, *args)
+            value = cache.get(key)
+            if value is not _MISSING:
+                return value
+            value = await fn(sb, *args)
+            if value is not None:
+                cache.set(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def cached_many(entity: str, single):
+    """Cache an async `fetch_xs(sb, ids) -> {id: value}` per id.
+
+    Entries are shared with `single`, the @cached(entity) one-id fetcher,
+    so a batch reuses single lookups and warms them. Only ids missing from
+    the cache reach `fetch_xs`; ids it does not return are left uncached.
+    """
+
+    def decorator(fn):
+        prefix = single.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(sb, ids: List[Hashable]) -> Dict[Hashable, Any]:
+            await check_versions(sb)
+            cache = CACHES[entity]
+            found: Dict[Hashable, Any] = {}
+            missing = []
+            for key in ids:
+                value = cache.get((prefix, key))
+                if value is _MISSING:
+                    missing.append(key)
+                else:
+                    found[key] = value
+            if missing:
+                fetched = await fn(sb, missing)
+                for key, value in fetched.items():
+                    if value is not None:
+                        cache.set((prefix, key), value)
+                found.update(fetched)
+            return found
+
+        return wrapper
+
+    return decorator
+
+
+_versions: Optional[Dict[str, str]] = None
+_checked_at = float("-inf")
+
+
+async def check_versions(sb) -> None:
+    """Drop caches whose entity a scrape stamped since the last check.
+
+    Throttled to one read per CACHE_VERSION_CHECK_SECS per process. The
+    first read only records the stamps; an unreadable table leaves the
+    caches to their TTLs.
+    """
+    global _versions, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < CACHE_VERSION_CHECK_SECS:
+        return
+    # Claimed before the await so concurrent requests don't all re-read
+    _checked_at = now
+    try:
+        resp = await (
+            sb.table(CACHE_VERSION_TABLE)
+            .select("entity,changed_at")
+            .eq("feed", CACHE_VERSION_FEED)
+            .execute()
+        )
+    except Exception as e:
+        logger.warning(f"Feed cache version check failed: {e}")
+        return
+    versions = {row["entity"]: row["changed_at"] for row in resp.data or []}
+    if _versions is not None:
+        changed = [e for e, v in versions.items() if _versions.get(e) != v]
+        if changed:
+            invalidate(changed)
+    _versions = versions
+
+
+# Told which entities were dropped, whether by a version stamp or the POST
+_listeners: List[Callable[[List[str]], None]] = []
+
+
+def on_invalidate(listener: Callable[[List[str]], None]) -> Callable[[], None]:
+    """Call `listener(entities)` after every invalidation; returns a remover."""
+    _listeners.append(listener)
+    return lambda: _listeners.remove(listener)
+
+
+def invalidate(entities: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Drop cached entries for `entities` (all when None); returns counts."""
+    names = list(CACHES) if entities is None else [n for n in entities if n in CACHES]
+    counts = {name: CACHES[name].clear() for name in names}
+    for listener in list(_listeners):
+        try:
+            listener(names)
+        except Exception as e:
+            logger.warning(f"Feed cache invalidation listener failed: {e}")
+    return counts
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in CACHES.items()}
@@ -1,41 +1,62 @@
+import asyncio
 from typing import Any, Dict, List, Optional, Tuple
 
-from supabase import Client
+from postgrest.exceptions import APIError
+from supabase import AsyncClient
+
+from services.cache import cached
+from services.pagination import (
+    CountMode,
+    Page,
+    count_method,
+    fetch_after,
+    fetch_page,
+    select_columns,
+)
 
 
+# No `version`: only since_version and the full leaderboard's version read
+# it, so paged leaderboards work on tables that predate the column
 LB_SELECT = "player_id,first_name,last_name,position,total,thru,score,r1,r2,r3,r4,strokes,projected,starting,country,country_flag,player_url,leaderboard_sort_order"
+# Postgres error for a missing column, e.g. `version` before it is added
+UNDEFINED_COLUMN = "42703"
+# Missing table, e.g. the removals before they are created (Postgres, PostgREST)
+UNDEFINED_TABLE = ("42P01", "PGRST205")
+LB_CURSOR_KEYS = ("leaderboard_sort_order", "player_id")
 
 
-def fetch_leaderboard_rows(
-    sb: Client, tournament_id: str, page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+async def fetch_leaderboard_rows(
+    sb: AsyncClient,
+    tournament_id: str,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    cursor: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+) -> Page:
     base = (
         sb.table("pga_tournament_leaderboards")
-        .select(LB_SELECT, count="exact")
+        .select(
+            select_columns(columns, LB_SELECT, LB_CURSOR_KEYS),
+            count=count_method(count),
+        )
         .eq("tournament_id", tournament_id)
         .order("leaderboard_sort_order", desc=False)
+        .order("player_id", desc=False)
     )
-
-    start = (page - 1) * page_size
-    end = start + page_size - 1
-
-    # Get count via minimal range to avoid out-of-bounds 416
-    count_resp = base.range(0, 0).execute()
-    total_count: Optional[int] = getattr(count_resp, "count", None)
-    if total_count is not None and start >= total_count:
-        return [], total_count
-
-    resp = base.range(start, end).execute()
-    return resp.data or [], (
-        total_count if total_count is not None else getattr(resp, "count", None)
-    )
+    if cursor:
+        return await fetch_after(base, cursor, page_size, LB_CURSOR_KEYS)
+    return await fetch_page(base, page, page_size, LB_CURSOR_KEYS)
 
 
 TRN_SELECT = "tournament_id,tournament_name,start_date,end_date,status,year"
 
 
-def fetch_tournament_header(sb: Client, tournament_id: str) -> Optional[Dict[str, Any]]:
-    resp = (
+@cached("tournaments")
+async def fetch_tournament_header(
+    sb: AsyncClient, tournament_id: str
+) -> Optional[Dict[str, Any]]:
+    resp = await (
         sb.table("pga_tournaments")
         .select(TRN_SELECT)
         .eq("tournament_id", tournament_id)
@@ -46,20 +67,256 @@ def fetch_tournament_header(sb: Client, tournament_id: str) -> Optional[Dict[str
     return rows[0] if rows else None
 
 
+async def fetch_leaderboard(
+    sb: AsyncClient,
+    tournament_id: str,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    cursor: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+) -> Optional[Tuple[Dict[str, Any], Page]]:
+    """Tournament header and one page of rows, or None if no tournament.
+
+    The page request already carries its count, and it runs concurrently
+    with the (usually cached) header lookup: one round trip instead of
+    header, then rows.
+    """
+    header, result = await asyncio.gather(
+        fetch_tournament_header(sb, tournament_id),
+        fetch_leaderboard_rows(
+            sb, tournament_id, page, page_size, count, cursor, columns
+        ),
+    )
+    if not header:
+        return None
+    return header, result
+
+
+def latest_version(rows: List[Dict[str, Any]], floor: int = 0) -> int:
+    """Highest row version, or `floor` (rows from before versioning have none)."""
+    return max([floor, *(r["version"] for r in rows if r.get("version") is not None)])
+
+
+async def fetch_leaderboard_changes(
+    sb: AsyncClient,
+    tournament_id: str,
+    since_version: int,
+    columns: Optional[List[str]] = None,
+) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Tournament header, then the rows and removals above `since_version`.
+
+    The leaderboard spider stamps a new version only on rows it changed,
+    so this is the change set since a client's last poll. Removals are
+    the tombstones of players dropped from the field, less those added
+    back since (their row is newer than the tombstone).
+    """
+    header, resp, removals = await asyncio.gather(
+        fetch_tournament_header(sb, tournament_id),
+        sb.table("pga_tournament_leaderboards")
+        .select(
+            select_columns(columns, f"{LB_SELECT},version", ("version", "player_id"))
+        )
+        .eq("tournament_id", tournament_id)
+        .gt("version", since_version)
+        .order("leaderboard_sort_order", desc=False)
+        .order("player_id", desc=False)
+        .execute(),
+        fetch_leaderboard_removals(sb, tournament_id, since_version),
+    )
+    if not header:
+        return None
+    rows = resp.data or []
+    current = {r["player_id"] for r in rows}
+    return header, rows, [r for r in removals if r["player_id"] not in current]
+
+
+async def fetch_leaderboard_removals(
+    sb: AsyncClient, tournament_id: str, since_version: int
+) -> List[Dict[str, Any]]:
+    """Tombstones (player_id, version) written after `since_version`.
+
+    Empty before the removals table is created.
+    """
+    try:
+        resp = await (
+            sb.table("pga_leaderboard_removals")
+            .select("player_id,version")
+            .eq("tournament_id", tournament_id)
+            .gt("version", since_version)
+            .order("player_id", desc=False)
+            .execute()
+        )
+    except APIError as e:
+        if e.code not in UNDEFINED_TABLE:
+            raise
+        return []
+    return resp.data or []
+
+
+async def fetch_latest_version(sb: AsyncClient, tournament_id: str) -> int:
+    """Highest row version of a tournament's leaderboard.
+
+    0 while no row is versioned, including before the column is added.
+    """
+    try:
+        resp = await (
+            sb.table("pga_tournament_leaderboards")
+            .select("version")
+            .eq("tournament_id", tournament_id)
+            .not_.is_("version", "null")
+            .order("version", desc=True)
+            .limit(1)
+            .execute()
+        )
+    except APIError as e:
+        if e.code != UNDEFINED_COLUMN:
+            raise
+        return 0
+    return latest_version(resp.data or [])
+
+
+@cached("leaderboards")
+async def fetch_full_leaderboard(
+    sb: AsyncClient, tournament_id: str
+) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], int]]:
+    """Tournament header, the whole field (unpaged, uncounted) and its version.
+
+    The header usually comes from the tournaments cache; the rows and the
+    version run concurrently with it. The field is read and cached whole
+    rather than paged inside the response stream: it is a few hundred rows
+    at most, and one cached read is shared by every poller until the next
+    scrape.
+    """
+    header, resp, version = await asyncio.gather(
+        fetch_tournament_header(sb, tournament_id),
+        sb.table("pga_tournament_leaderboards")
+        .select(LB_SELECT)
+        .eq("tournament_id", tournament_id)
+        .order("leaderboard_sort_order", desc=False)
+        .order("player_id", desc=False)
+        .execute(),
+        fetch_latest_version(sb, tournament_id),
+    )
+    if not header:
+        return None
+    return header, resp.data or [], version
+
+
+# Flat rows from before the spider stored documents; read only for
+# tournaments it has not re-scraped since
 COURSE_STATS_SELECT = (
     "course_name,round,hole,par,yards,scoring_average,avg_diff,rank,"
-    "eagles,birdies,pars,bogeys,double_bogeys,course_par,course_yardage,course_record,"
-    "course_fairway,course_rough,course_green,course_established,course_design"
+    "eagles,birdies,pars,bogeys,double_bogeys,course_par,course_yardage,"
+    "course_record,course_fairway,course_established,course_design"
 )
 
 
-def fetch_course_stats_rows(sb: Client, tournament_id: str) -> List[Dict[str, Any]]:
-    resp = (
+def _as_float(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def course_stats_documents(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-course documents grouped from flat `pga_course_stats` rows.
+
+    Same shape as the spider's. The rows carry no course order, so the
+    course that hosted the latest round (the host, for pro-am rotations)
+    comes first.
+    """
+    courses: Dict[str, List[Dict[str, Any]]] = {}
+    for r in rows:
+        courses.setdefault(r["course_name"], []).append(r)
+    documents = []
+    for course_rows in sorted(
+        courses.values(),
+        key=lambda rs: (
+            -max(r["round"] or 0 for r in rs),
+            rs[0]["course_name"] or "",
+        ),
+    ):
+        first = course_rows[0]
+        rounds: Dict[int, List[Dict[str, Any]]] = {}
+        for r in sorted(course_rows, key=lambda r: (r["round"] or 0, r["hole"] or 0)):
+            rounds.setdefault(r["round"], []).append(
+                {
+                    "number": r["hole"],
+                    "par": r["par"],
+                    "yards": r["yards"],
+                    "eagles": r["eagles"],
+                    "birdies": r["birdies"],
+                    "pars": r["pars"],
+                    "bogeys": r["bogeys"],
+                    "double_bogeys": r["double_bogeys"],
+                    "scoring_average": _as_float(r["scoring_average"]),
+                    "avg_diff": _as_float(r["avg_diff"]),
+                    "rank": r["rank"],
+                }
+            )
+        documents.append(
+            {
+                "course": {
+                    "name": first["course_name"],
+                    "yardage": first["course_yardage"],
+                    "par": first["course_par"],
+                    "record": first["course_record"],
+                    "fairway": first["course_fairway"],
+                    "design": first["course_design"],
+                    "established": first["course_established"],
+                },
+                "rounds": [
+                    {"number": number, "holes": holes}
+                    for number, holes in sorted(
+                        rounds.items(), key=lambda item: item[0] or 0
+                    )
+                ],
+            }
+        )
+    return documents
+
+
+@cached("course_stats")
+async def fetch_course_stats_documents(
+    sb: AsyncClient, tournament_id: str, course: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Per-course `{"course", "rounds"}` documents, host course first.
+
+    Grouped by the course stats spider; `course` (a course name) is
+    filtered in the query, so other courses' holes are never read.
+    Tournaments without documents are grouped here from the flat rows.
+    """
+    query = (
+        sb.table("pga_course_stats_documents")
+        .select("document")
+        .eq("tournament_id", tournament_id)
+    )
+    if course:
+        query = query.eq("course_name", course)
+    resp = await query.order("course_order", desc=False).execute()
+    if resp.data:
+        return [r["document"] for r in resp.data]
+
+    query = (
         sb.table("pga_course_stats")
         .select(COURSE_STATS_SELECT)
         .eq("tournament_id", tournament_id)
-        .order("round", desc=False)
-        .order("hole", desc=False)
-        .execute()
     )
-    return resp.data or []
+    if course:
+        query = query.eq("course_name", course)
+    resp = await query.execute()
+    return course_stats_documents(resp.data or [])
+
+
+async def fetch_course_stats(
+    sb: AsyncClient, tournament_id: str, course: Optional[str] = None
+) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Tournament header and per-course hole-statistics, fetched concurrently.
+
+    Empty until the course stats spider has run for the tournament.
+    """
+    header, documents = await asyncio.gather(
+        fetch_tournament_header(sb, tournament_id),
+        fetch_course_stats_documents(sb, tournament_id, course),
+    )
+    if not header:
+        return None
+    return header, documents
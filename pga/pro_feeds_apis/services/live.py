@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import httpx
+import orjson
+
+from services.cache import check_versions
+
+if TYPE_CHECKING:
+    from deps import SupabasePool
+
+logger = logging.getLogger(__name__)
+
+# One watcher per streamed tournament re-reads its rows this often; a
+# "leaderboards" cache invalidation from the scraper wakes it immediately.
+LIVE_POLL_INTERVAL = float(os.environ.get("LIVE_POLL_INTERVAL", "15"))
+LIVE_KEEPALIVE = float(os.environ.get("LIVE_KEEPALIVE", "20"))
+# A client still without a snapshot after this long gets an "error" event
+LIVE_READY_TIMEOUT = float(os.environ.get("LIVE_READY_TIMEOUT", "60"))
+# Events buffered per client; a client that falls further behind is resynced
+LIVE_QUEUE_SIZE = int(os.environ.get("LIVE_QUEUE_SIZE", "32"))
+
+LIVE_FIELDS = ("position", "total", "thru", "score")
+LIVE_SELECT = "player_id,position,total,thru,score,leaderboard_sort_order"
+
+# (event name, version, data)
+Event = Tuple[str, int, Any]
+_CLOSE: Event = ("close", 0, None)
+
+
+def leaderboard_diff(
+    old: Dict[int, Dict[str, Any]], new: Dict[int, Dict[str, Any]]
+) -> Dict[str, List[Any]]:
+    """Players whose live fields changed (or who appeared) and who left."""
+    return {
+        "changed": [row for pid, row in new.items() if old.get(pid) != row],
+        "removed": [pid for pid in old if pid not in new],
+    }
+
+
+def sse_event(event: str, version: int, data: Any) -> bytes:
+    return (
+        f"event: {event}\nid: {version}\ndata: ".encode() + orjson.dumps(data) + b"\n\n"
+    )
+
+
+class LeaderboardPublisher:
+    """Watches one tournament's leaderboard and fans diffs out to clients.
+
+    Runs while at least one client is subscribed. Each client gets the
+    current snapshot first, then an "update" event per change.
+    """
+
+    def __init__(self, tournament_id: str, pool: "SupabasePool"):
+        self.tournament_id = tournament_id
+        self.pool = pool
+        self.listeners = 0
+        self.subscribers: Set["asyncio.Queue[Event]"] = set()
+        self.snapshot: Optional[Dict[int, Dict[str, Any]]] = None
+        self.version = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        for queue in self.subscribers:
+            self._offer(queue, _CLOSE)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def subscribe(self) -> "asyncio.Queue[Event]":
+        queue: "asyncio.Queue[Event]" = asyncio.Queue(LIVE_QUEUE_SIZE)
+        # No await between these two, so no update can slip in before the
+        # snapshot this client starts from. Before the first read the
+        # snapshot is queued when it lands (see _publish).
+        if self.snapshot is not None:
+            queue.put_nowait(self._snapshot_event())
+        self.subscribers.add(queue)
+        return queue
+
+    def _snapshot_event(self) -> Event:
+        return ("snapshot", self.version, list(self.snapshot.values()))
+
+    async def _fetch(self) -> List[Dict[str, Any]]:
+        sb = await self.pool.get()
+        # Streams alone still pick up version stamps from other instances'
+        # scrapes; a "leaderboards" stamp wakes every publisher
+        await check_versions(sb)
+        try:
+            resp = await (
+                sb.table("pga_tournament_leaderboards")
+                .select(LIVE_SELECT)
+                .eq("tournament_id", self.tournament_id)
+                .order("leaderboard_sort_order", desc=False)
+                .order("player_id", desc=False)
+                .execute()
+            )
+        except httpx.TransportError:
+            self.pool.invalidate()
+            raise
+        return resp.data or []
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._publish(await self._fetch())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Live leaderboard {self.tournament_id} poll failed: {e}"
+                )
+            try:
+                await asyncio.wait_for(self._wake.wait(), LIVE_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def _publish(self, rows: List[Dict[str, Any]]) -> None:
+        current = {
+            int(r["player_id"]): {
+                "player_id": int(r["player_id"]),
+                **{f: r.get(f) for f in LIVE_FIELDS},
+            }
+            for r in rows
+        }
+        if self.snapshot is None:
+            self.snapshot, self.version = current, 1
+            for queue in self.subscribers:
+                self._offer(queue, self._snapshot_event())
+            return
+        diff = leaderboard_diff(self.snapshot, current)
+        if not diff["changed"] and not diff["removed"]:
+            return
+        self.snapshot = current
+        self.version += 1
+        for queue in self.subscribers:
+            self._offer(queue, ("update", self.version, diff))
+
+    def _offer(self, queue: "asyncio.Queue[Event]", event: Event) -> None:
+        if queue.full():
+            # Slow client: drop what it has not read and resync it
+            while not queue.empty():
+                queue.get_nowait()
+            if event is not _CLOSE:
+                event = self._snapshot_event()
+        queue.put_nowait(event)
+
+
+class LeaderboardHub:
+    """One LeaderboardPublisher per tournament with connected clients."""
+
+    def __init__(self, pool: "SupabasePool"):
+        self.pool = pool
+        self._publishers: Dict[str, LeaderboardPublisher] = {}
+
+    @asynccontextmanager
+    async def subscribe(
+        self, tournament_id: str
+    ) -> AsyncIterator["asyncio.Queue[Event]"]:
+        publisher = self._publishers.get(tournament_id)
+        if publisher is None:
+            publisher = LeaderboardPublisher(tournament_id, self.pool)
+            self._publishers[tournament_id] = publisher
+            publisher.start()
+        publisher.listeners += 1
+        queue = None
+        try:
+            queue = publisher.subscribe()
+            yield queue
+        finally:
+            publisher.subscribers.discard(queue)
+            publisher.listeners -= 1
+            if publisher.listeners == 0:
+                publisher.stop()
+                if self._publishers.get(tournament_id) is publisher:
+                    del self._publishers[tournament_id]
+
+    def refresh(self) -> None:
+        """Make every publisher re-read its leaderboard now."""
+        for publisher in self._publishers.values():
+            publisher.wake()
+
+    def invalidated(self, entities: List[str]) -> None:
+        """Feed cache listener (see services.cache.on_invalidate)."""
+        if "leaderboards" in entities:
+            self.refresh()
+
+    async def close(self) -> None:
+        for publisher in list(self._publishers.values()):
+            publisher.stop()
+        self._publishers.clear()
+
+
+async def leaderboard_events(
+    hub: LeaderboardHub, tournament_id: str
+) -> AsyncIterator[bytes]:
+    """SSE body: a snapshot, then per-player diffs, with keep-alive comments.
+
+    Keep-alives also cover the wait for the first read; if no snapshot
+    arrives within LIVE_READY_TIMEOUT, an "error" event ends the stream.
+    """
+    # Sent before the first read so the response starts immediately
+    yield f"retry: {int(LIVE_POLL_INTERVAL * 1000)}\n\n".encode()
+    loop = asyncio.get_running_loop()
+    ready_by = loop.time() + LIVE_READY_TIMEOUT
+    ready = False
+    async with hub.subscribe(tournament_id) as queue:
+        while True:
+            timeout = LIVE_KEEPALIVE
+            if not ready:
+                timeout = min(timeout, max(ready_by - loop.time(), 0))
+            try:
+                event, version, data = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                if not ready and loop.time() >= ready_by:
+                    yield sse_event(
+                        "error", 0, {"detail": "Live leaderboard unavailable"}
+                    )
+                    return
+                yield b": keepalive\n\n"
+                continue
+            if event == "close":
+                return
+            ready = True
+            yield sse_event(event, version, data)
@@ -0,0 +1,135 @@
+import base64
+import binascii
+import json
+import re
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Sequence
+
+from postgrest.exceptions import APIError
+
+
+CountMode = Literal["exact", "planned", "estimated", "none"]
+
+# PostgREST answers 416 with this code when the offset is past the last row
+RANGE_NOT_SATISFIABLE = "PGRST103"
+_TOTAL_FROM_DETAILS = re.compile(r"only (\d+) rows")
+
+
+class Page(NamedTuple):
+    rows: List[Dict[str, Any]]
+    total: Optional[int]
+    has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class InvalidCursor(ValueError):
+    """A client-supplied cursor that could not be decoded."""
+
+
+def count_method(count: CountMode) -> Optional[str]:
+    """Map the public count mode to PostgREST's Prefer: count=... value."""
+    return None if count == "none" else count
+
+
+def select_columns(
+    columns: Optional[Sequence[str]], default: str, keys: Sequence[str] = ()
+) -> str:
+    """PostgREST select for a sparse fieldset, or `default` without one.
+
+    `keys` are added because paging (cursors, versions) reads them even
+    when the client did not ask for them.
+    """
+    if not columns:
+        return default
+    return ",".join(dict.fromkeys([*columns, *keys]))
+
+
+def encode_cursor(row: Dict[str, Any], keys: Sequence[str]) -> str:
+    payload = json.dumps([row.get(k) for k in keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[str]) -> List[Optional[int]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor(cursor) from e
+    # Keys are integer columns; anything else is rejected before it reaches a filter
+    if (
+        not isinstance(values, list)
+        or len(values) != len(keys)
+        or values[-1] is None
+        or not all(v is None or type(v) is int for v in values)
+    ):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def _after(query, keys: Sequence[str], values: List[Optional[int]]):
+    """Restrict `query` to rows strictly after `values` in (keys) order.
+
+    Supports a unique key, optionally preceded by one nullable sort key
+    (NULLs sort last, as with PostgREST's default ascending order).
+    """
+    if len(keys) == 1:
+        return query.gt(keys[0], values[0])
+    (sort_key, id_key), (sort_val, id_val) = keys, values
+    if sort_val is None:
+        return query.is_(sort_key, "null").gt(id_key, id_val)
+    return query.or_(
+        f"{sort_key}.gt.{sort_val},{sort_key}.is.null,"
+        f"and({sort_key}.eq.{sort_val},{id_key}.gt.{id_val})"
+    )
+
+
+def _to_page(
+    rows: List[Dict[str, Any]],
+    total: Optional[int],
+    page_size: int,
+    cursor_keys: Sequence[str],
+) -> Page:
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = (
+        encode_cursor(rows[-1], cursor_keys) if has_more and cursor_keys else None
+    )
+    return Page(rows, total, has_more, next_cursor)
+
+
+async def fetch_page(
+    query, page: int, page_size: int, cursor_keys: Sequence[str] = ()
+) -> Page:
+    """Fetch one page of `query` (rows and count) in a single round trip.
+
+    One extra row is requested so has_more is known without relying on the
+    count, which may be estimated or skipped entirely. With `cursor_keys`
+    the page also carries a next_cursor for switching to fetch_after.
+    """
+    start = (page - 1) * page_size
+    try:
+        resp = await query.range(start, start + page_size).execute()
+    except APIError as e:
+        if e.code != RANGE_NOT_SATISFIABLE:
+            raise
+        match = _TOTAL_FROM_DETAILS.search(e.details or "")
+        return Page([], int(match.group(1)) if match else None, False)
+
+    return _to_page(
+        resp.data or [], getattr(resp, "count", None), page_size, cursor_keys
+    )
+
+
+async def fetch_after(
+    query, cursor: str, page_size: int, cursor_keys: Sequence[str]
+) -> Page:
+    """Keyset page: the `page_size` rows following `cursor`.
+
+    `query` must already be ordered by `cursor_keys`. The cost is the same
+    for every page and rows upserted concurrently are neither skipped nor
+    repeated. Any count covers the rows remaining after the cursor.
+    """
+    values = decode_cursor(cursor, cursor_keys)
+    resp = await _after(query, cursor_keys, values).limit(page_size + 1).execute()
+    return _to_page(
+        resp.data or [], getattr(resp, "count", None), page_size, cursor_keys
+    )
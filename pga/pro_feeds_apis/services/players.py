@@ -1,12 +1,24 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
+from services.cache import cached, cached_many
+from services.pagination import (
+    CountMode,
+    Page,
+    count_method,
+    fetch_after,
+    fetch_page,
+    select_columns,
+)
 
-def fetch_player_profile(sb, player_id: int) -> Optional[Dict[str, Any]]:
-    resp = (
+
+PROFILE_SELECT = "player_id,first_name,last_name,height,weight,age,birthday,country,country_flag,residence,birth_place,family,college,turned_pro_year,cuts_made,events_played,career_wins,wins_current_year,runner_up,third_place,top_10,top_25,official_money,career_earnings,image_url"
+
+
+@cached("players")
+async def fetch_player_profile(sb, player_id: int) -> Optional[Dict[str, Any]]:
+    resp = await (
         sb.table("pga_players")
-        .select(
-            "player_id,first_name,last_name,height,weight,age,birthday,country,country_flag,residence,birth_place,family,college,turned_pro_year,cuts_made,events_played,career_wins,wins_current_year,runner_up,third_place,top_10,top_25,official_money,career_earnings,image_url"
-        )
+        .select(PROFILE_SELECT)
         .eq("player_id", player_id)
         .limit(1)
         .execute()
@@ -18,27 +30,37 @@ def fetch_player_profile(sb, player_id: int) -> Optional[Dict[str, Any]]:
     return r
 
 
-def fetch_players(
-    sb, page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
-    count_resp = (
-        sb.table("pga_players").select("player_id", count="exact").range(0, 0).execute()
+@cached_many("players", fetch_player_profile)
+async def fetch_player_profiles(sb, player_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    resp = await (
+        sb.table("pga_players")
+        .select(PROFILE_SELECT)
+        .in_("player_id", player_ids)
+        .execute()
     )
-    total = getattr(count_resp, "count", None)
+    return {int(r["player_id"]): r for r in resp.data or []}
+
+
+PLAYER_CURSOR_KEYS = ("player_id",)
+LIST_SELECT = "player_id,first_name,last_name,height,weight,age,birthday,country,country_flag,residence,birth_place,family,college,turned_pro_year,image_url"
 
-    start = (page - 1) * page_size
-    end = start + page_size - 1
-    if total is not None and start >= total:
-        return [], total
 
-    resp = (
+async def fetch_players(
+    sb,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    cursor: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+) -> Page:
+    base = (
         sb.table("pga_players")
         .select(
-            "player_id,first_name,last_name,height,weight,age,birthday,country,country_flag,residence,birth_place,family,college,turned_pro_year,image_url"
+            select_columns(columns, LIST_SELECT, PLAYER_CURSOR_KEYS),
+            count=count_method(count),
         )
         .order("player_id", desc=False)
-        .range(start, end)
-        .execute()
     )
-
-    return resp.data or [], total
+    if cursor:
+        return await fetch_after(base, cursor, page_size, PLAYER_CURSOR_KEYS)
+    return await fetch_page(base, page, page_size, PLAYER_CURSOR_KEYS)
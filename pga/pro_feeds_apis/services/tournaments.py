@@ -1,6 +1,15 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-from supabase import Client
+from supabase import AsyncClient
+
+from services.cache import cached, cached_many
+from services.pagination import (
+    CountMode,
+    Page,
+    count_method,
+    fetch_page,
+    select_columns,
+)
 
 
 SELECT_FIELDS = (
@@ -9,34 +18,46 @@ SELECT_FIELDS = (
 )
 
 
-def fetch_tournaments(
-    sb: Client, year: int, status_filter: Optional[str], page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+# Narrow copy of pga_tournaments (no URLs, logos or winner details) that
+# the upcoming spider keeps in step; list queries whose columns it covers
+# read it instead of the full table, others read the full table directly
+SUMMARY_TABLE = "pga_tournament_summaries"
+SUMMARY_COLUMNS = frozenset(
+    "tournament_id,tournament_name,year,month,start_date,end_date,status,"
+    "purse_amount,fedex_cup,course_name,city,state,country".split(",")
+)
+
+
+async def fetch_tournaments(
+    sb: AsyncClient,
+    year: int,
+    status_filter: Optional[str],
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    columns: Optional[List[str]] = None,
+) -> Page:
+    """One page of a season's tournaments; only `columns` when given."""
+    table = "pga_tournaments"
+    if columns and SUMMARY_COLUMNS.issuperset(columns):
+        table = SUMMARY_TABLE
     base_query = (
-        sb.table("pga_tournaments")
-        .select(SELECT_FIELDS, count="exact")
+        sb.table(table)
+        .select(select_columns(columns, SELECT_FIELDS), count=count_method(count))
         .eq("year", year)
         .order("start_date", desc=False)
     )
     if status_filter:
         base_query = base_query.eq("status", status_filter)
 
-    start = (page - 1) * page_size
-    end = start + page_size - 1
-    count_resp = base_query.range(0, 0).execute()
-    total_count: Optional[int] = getattr(count_resp, "count", None)
-
-    if total_count is not None and start >= total_count:
-        return [], total_count
-
-    resp = base_query.range(start, end).execute()
-    return resp.data or [], (
-        total_count if total_count is not None else getattr(resp, "count", None)
-    )
+    return await fetch_page(base_query, page, page_size)
 
 
-def fetch_tournament_by_id(sb: Client, tournament_id: str) -> Optional[Dict[str, Any]]:
-    resp = (
+@cached("tournaments")
+async def fetch_tournament_by_id(
+    sb: AsyncClient, tournament_id: str
+) -> Optional[Dict[str, Any]]:
+    resp = await (
         sb.table("pga_tournaments")
         .select(SELECT_FIELDS)
         .eq("tournament_id", tournament_id)
@@ -47,30 +68,40 @@ def fetch_tournament_by_id(sb: Client, tournament_id: str) -> Optional[Dict[str,
     return rows[0] if rows else None
 
 
+@cached_many("tournaments", fetch_tournament_by_id)
+async def fetch_tournaments_by_id(
+    sb: AsyncClient, tournament_ids: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    resp = await (
+        sb.table("pga_tournaments")
+        .select(SELECT_FIELDS)
+        .in_("tournament_id", tournament_ids)
+        .execute()
+    )
+    return {r["tournament_id"]: r for r in resp.data or []}
+
+
 TICKET_URL_SELECT_FIELDS = "tournament_id,tournament_name,year,month,start_date,end_date,ticket_url,tournament_logo"
 
 
-def fetch_upcoming_ticket_urls(
-    sb: Client, year: int, page: int, page_size: int
-) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+async def fetch_upcoming_ticket_urls(
+    sb: AsyncClient,
+    year: int,
+    page: int,
+    page_size: int,
+    count: CountMode = "exact",
+    columns: Optional[List[str]] = None,
+) -> Page:
     base_query = (
         sb.table("pga_tournaments")
-        .select(TICKET_URL_SELECT_FIELDS, count="exact")
+        .select(
+            select_columns(columns, TICKET_URL_SELECT_FIELDS),
+            count=count_method(count),
+        )
         .eq("year", year)
         .eq("status", "UPCOMING")
         .not_.is_("ticket_url", "null")
         .order("start_date", desc=False)
     )
 
-    start = (page - 1) * page_size
-    end = start + page_size - 1
-    count_resp = base_query.range(0, 0).execute()
-    total_count: Optional[int] = getattr(count_resp, "count", None)
-
-    if total_count is not None and start >= total_count:
-        return [], total_count
-
-    resp = base_query.range(start, end).execute()
-    return resp.data or [], (
-        total_count if total_count is not None else getattr(resp, "count", None)
-    )
+    return await fetch_page(base_query, page, page_size)
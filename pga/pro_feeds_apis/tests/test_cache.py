@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from services import cache
+from services.cache import CACHES, cached, cached_many
+from services.live import LeaderboardHub
+from tests.fakes import FakeClient
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    for c in CACHES.values():
+        c.clear()
+    monkeypatch.setattr(cache, "_versions", None)
+    monkeypatch.setattr(cache, "_checked_at", float("-inf"))
+    monkeypatch.setattr(cache, "CACHE_VERSION_CHECK_SECS", 0)
+    yield
+    for c in CACHES.values():
+        c.clear()
+
+
+def make_fetchers(calls):
+    @cached("players")
+    async def fetch_player(sb, player_id):
+        calls.append([player_id])
+        return {"id": player_id} if player_id != 404 else None
+
+    @cached_many("players", fetch_player)
+    async def fetch_players(sb, player_ids):
+        calls.append(list(player_ids))
+        return {p: {"id": p} for p in player_ids if p != 404}
+
+    return fetch_player, fetch_players
+
+
+def test_cached_serves_repeat_calls_and_skips_none():
+    calls = []
+    fetch_player, _ = make_fetchers(calls)
+    sb = FakeClient()
+
+    async def run():
+        await fetch_player(sb, 1)
+        await fetch_player(sb, 1)
+        await fetch_player(sb, 404)
+        await fetch_player(sb, 404)
+
+    asyncio.run(run())
+    assert calls == [[1], [404], [404]]
+
+
+def test_cached_many_shares_entries_with_single_fetcher():
+    calls = []
+    fetch_player, fetch_players = make_fetchers(calls)
+    sb = FakeClient()
+
+    async def run():
+        await fetch_player(sb, 1)
+        found = await fetch_players(sb, [1, 2, 404])
+        # Warmed by the batch: no further fetch
+        assert await fetch_player(sb, 2) == {"id": 2}
+        return found
+
+    found = asyncio.run(run())
+    assert found == {1: {"id": 1}, 2: {"id": 2}}
+    assert calls == [[1], [2, 404]]
+
+
+def test_changed_version_stamp_drops_only_that_entity():
+    calls = []
+    fetch_player, _ = make_fetchers(calls)
+    stamps = [{"entity": "players", "changed_at": "t1"}]
+    sb = FakeClient({"feed_cache_versions": stamps})
+    CACHES["tournaments"].set(("fetch_tournament_by_id", "T1"), {"id": "T1"})
+
+    async def run():
+        await fetch_player(sb, 1)
+        await fetch_player(sb, 1)
+        stamps[0] = {"entity": "players", "changed_at": "t2"}
+        await fetch_player(sb, 1)
+
+    asyncio.run(run())
+    assert calls == [[1], [1]]
+    assert CACHES["tournaments"].get(("fetch_tournament_by_id", "T1")) == {"id": "T1"}
+
+
+def test_version_stamp_notifies_invalidation_listeners():
+    seen = []
+    remove = cache.on_invalidate(seen.append)
+    stamps = [{"entity": "leaderboards", "changed_at": "t1"}]
+    sb = FakeClient({"feed_cache_versions": stamps})
+
+    async def run():
+        await cache.check_versions(sb)
+        stamps[0] = {"entity": "leaderboards", "changed_at": "t2"}
+        await cache.check_versions(sb)
+
+    try:
+        asyncio.run(run())
+    finally:
+        remove()
+    assert seen == [["leaderboards"]]
+    cache.invalidate(["players"])
+    assert seen == [["leaderboards"]]
+
+
+def test_leaderboard_invalidation_wakes_the_hub():
+    woken = []
+    hub = LeaderboardHub(pool=None)
+    hub.refresh = lambda: woken.append(True)
+    remove = cache.on_invalidate(hub.invalidated)
+    try:
+        cache.invalidate(["players"])
+        cache.invalidate(["leaderboards"])
+        cache.invalidate()
+    finally:
+        remove()
+    assert len(woken) == 2
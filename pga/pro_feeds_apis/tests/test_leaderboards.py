@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from postgrest.exceptions import APIError
+
+from services.leaderboards import (
+    course_stats_documents,
+    fetch_leaderboard_changes,
+    fetch_leaderboard_removals,
+)
+from tests.fakes import FakeClient
+
+HEADER = {"tournament_id": "R2025464", "name": "Open"}
+
+
+def test_changes_report_removed_players():
+    sb = FakeClient(
+        {
+            "pga_tournaments": [HEADER],
+            "pga_tournament_leaderboards": [{"player_id": 1, "version": 20}],
+            "pga_leaderboard_removals": [{"player_id": 2, "version": 15}],
+        }
+    )
+    header, rows, removals = asyncio.run(fetch_leaderboard_changes(sb, "R2025464", 10))
+    assert header == HEADER
+    assert rows == [{"player_id": 1, "version": 20}]
+    assert removals == [{"player_id": 2, "version": 15}]
+
+
+def test_changes_drop_tombstones_of_players_added_back():
+    sb = FakeClient(
+        {
+            "pga_tournaments": [{**HEADER, "tournament_id": "R2025465"}],
+            "pga_tournament_leaderboards": [{"player_id": 2, "version": 20}],
+            "pga_leaderboard_removals": [{"player_id": 2, "version": 15}],
+        }
+    )
+    _, rows, removals = asyncio.run(fetch_leaderboard_changes(sb, "R2025465", 10))
+    assert [r["player_id"] for r in rows] == [2]
+    assert removals == []
+
+
+def test_removals_are_empty_before_the_table_exists():
+    error = APIError({"code": "PGRST205", "message": "table not found"})
+    sb = FakeClient(errors={"pga_leaderboard_removals": error})
+    assert asyncio.run(fetch_leaderboard_removals(sb, "R2025464", 0)) == []
+
+
+def test_removals_raise_other_errors():
+    error = APIError({"code": "57014", "message": "statement timeout"})
+    sb = FakeClient(errors={"pga_leaderboard_removals": error})
+    with pytest.raises(APIError):
+        asyncio.run(fetch_leaderboard_removals(sb, "R2025464", 0))
+
+
+def hole(course, round_, number):
+    stats = ("par", "yards", "eagles", "birdies", "pars", "bogeys", "double_bogeys")
+    course_cols = ("yardage", "par", "record", "fairway", "design", "established")
+    return {
+        "course_name": course,
+        "round": round_,
+        "hole": number,
+        **{k: None for k in stats},
+        **{f"course_{k}": None for k in course_cols},
+        "scoring_average": None,
+        "avg_diff": None,
+        "rank": None,
+    }
+
+
+def test_course_stats_documents_tolerate_missing_rounds():
+    rows = [
+        hole("Spyglass", None, 1),
+        hole("Pebble", 2, None),
+        hole("Pebble", 2, 1),
+        hole("Pebble", None, 3),
+    ]
+    documents = course_stats_documents(rows)
+    assert [d["course"]["name"] for d in documents] == ["Pebble", "Spyglass"]
+    assert [r["number"] for r in documents[0]["rounds"]] == [None, 2]
+    assert [h["number"] for h in documents[0]["rounds"][1]["holes"]] == [None, 1]
@@ -0,0 +1,68 @@
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+
+from models import reads, row_mapper, tournament_row
+
+ROW = {
+    "tournament_id": "R2025464",
+    "tournament_name": "Open",
+    "start_date": "",
+    "course_name": "Pebble",
+    "city": "Monterey",
+}
+
+
+def test_columns_for_maps_fields_to_their_columns():
+    assert tournament_row.columns_for(None) is None
+    assert tournament_row.columns_for(["id", "name", "id"]) == [
+        "tournament_id",
+        "tournament_name",
+    ]
+    assert tournament_row.columns_for(["course"]) == [
+        "course_name",
+        "city",
+        "state",
+        "country",
+    ]
+
+
+def test_only_maps_just_the_requested_fields():
+    assert tournament_row.only(["id", "start_date"])(ROW) == {
+        "id": "R2025464",
+        "start_date": None,
+    }
+    assert tournament_row.only(None) is tournament_row
+
+
+def test_full_mapping_nests_and_fills_missing_columns():
+    out = tournament_row(ROW)
+    assert out["course"] == {
+        "name": "Pebble",
+        "city": "Monterey",
+        "state": None,
+        "country": None,
+    }
+    assert out["ticket_url"] is None
+
+
+class Score(BaseModel):
+    player: int
+    strokes: Optional[int] = None
+    label: Optional[str] = None
+
+
+def test_numbers_are_coerced_and_computed_sources_declare_columns():
+    label = reads("first", "last")(lambda r: f"{r['first']} {r['last']}")
+    mapper = row_mapper(Score, player="player_id", label=label)
+    row = {"player_id": "7", "strokes": "68", "first": "A", "last": "B"}
+    assert mapper(row) == {"player": 7, "strokes": 68, "label": "A B"}
+    assert mapper.columns_for(["label"]) == ["first", "last"]
+
+
+def test_row_mapper_rejects_unknown_fields_and_undeclared_sources():
+    with pytest.raises(ValueError):
+        row_mapper(Score, nope="x")
+    with pytest.raises(ValueError):
+        row_mapper(Score, label=lambda r: "x")
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from postgrest.exceptions import APIError
+
+from services.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    fetch_after,
+    fetch_page,
+    select_columns,
+)
+from tests.fakes import FakeQuery
+
+KEYS = ("leaderboard_sort_order", "player_id")
+
+
+def rows(n):
+    return [{"leaderboard_sort_order": i, "player_id": 100 + i} for i in range(n)]
+
+
+def test_fetch_page_requests_one_extra_row():
+    query = FakeQuery(rows(11), count=40)
+    page = asyncio.run(fetch_page(query, 2, 10))
+    assert query.called("range") == [(10, 20)]
+    assert len(page.rows) == 10
+    assert page.has_more
+    assert page.total == 40
+
+
+def test_fetch_page_last_page_has_no_more():
+    page = asyncio.run(fetch_page(FakeQuery(rows(4), count=14), 2, 10, KEYS))
+    assert len(page.rows) == 4
+    assert not page.has_more
+    assert page.next_cursor is None
+
+
+def test_fetch_page_past_the_end_returns_empty_page_with_total():
+    error = APIError(
+        {
+            "code": "PGRST103",
+            "message": "Requested range not satisfiable",
+            "details": "An offset of 40 was requested, but there are only 12 rows.",
+        }
+    )
+    page = asyncio.run(fetch_page(FakeQuery(error=error), 5, 10))
+    assert page.rows == []
+    assert page.total == 12
+    assert not page.has_more
+
+
+def test_fetch_page_reraises_other_errors():
+    error = APIError({"code": "42703", "message": "column does not exist"})
+    with pytest.raises(APIError):
+        asyncio.run(fetch_page(FakeQuery(error=error), 1, 10))
+
+
+def test_next_cursor_points_at_last_row_of_page():
+    page = asyncio.run(fetch_page(FakeQuery(rows(11)), 1, 10, KEYS))
+    assert decode_cursor(page.next_cursor, KEYS) == [9, 109]
+
+
+def test_cursor_round_trip_with_null_sort_key():
+    cursor = encode_cursor({"leaderboard_sort_order": None, "player_id": 7}, KEYS)
+    assert decode_cursor(cursor, KEYS) == [None, 7]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor({"player_id": 1}, ("player_id",)),  # wrong arity
+        encode_cursor({"leaderboard_sort_order": 1, "player_id": None}, KEYS),
+        encode_cursor({"leaderboard_sort_order": "1);drop", "player_id": 1}, KEYS),
+    ],
+)
+def test_decode_cursor_rejects_bad_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, KEYS)
+
+
+def test_fetch_after_filters_past_sort_key_and_nulls():
+    query = FakeQuery(rows(3))
+    cursor = encode_cursor({"leaderboard_sort_order": 5, "player_id": 105}, KEYS)
+    asyncio.run(fetch_after(query, cursor, 10, KEYS))
+    assert query.called("or_") == [
+        (
+            "leaderboard_sort_order.gt.5,leaderboard_sort_order.is.null,"
+            "and(leaderboard_sort_order.eq.5,player_id.gt.105)",
+        )
+    ]
+    assert query.called("limit") == [(11,)]
+
+
+def test_fetch_after_null_sort_key_stays_among_nulls():
+    query = FakeQuery()
+    cursor = encode_cursor({"leaderboard_sort_order": None, "player_id": 42}, KEYS)
+    asyncio.run(fetch_after(query, cursor, 10, KEYS))
+    assert query.called("is_") == [("leaderboard_sort_order", "null")]
+    assert query.called("gt") == [("player_id", 42)]
+    assert query.called("or_") == []
+
+
+def test_select_columns_adds_keys_only_to_sparse_selects():
+    assert select_columns(None, "a,b") == "a,b"
+    assert select_columns(["b", "player_id"], "a,b", KEYS) == (
+        "b,player_id,leaderboard_sort_order"
+    )
@@ -0,0 +1,48 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from deps import get_supabase_client
+from main import app
+from services.cache import CACHES
+from tests.fakes import FakeClient
+
+TABLES = {
+    "pga_tournaments": [{"tournament_id": "R2025464", "tournament_name": "Open"}],
+    "pga_tournament_leaderboards": [
+        {"player_id": 1, "first_name": "Scottie", "position": "1", "version": 5}
+    ],
+}
+
+
+@pytest.fixture
+def client():
+    for c in CACHES.values():
+        c.clear()
+
+    async def fake_client():
+        yield FakeClient(TABLES)
+
+    app.dependency_overrides[get_supabase_client] = fake_client
+    # Not entered as a context manager, so the lifespan (Supabase pool) never runs
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    for c in CACHES.values():
+        c.clear()
+
+
+def test_full_leaderboard_etag_varies_with_fields(client):
+    url = "/pga/tournaments/R2025464/leaderboard/full"
+    full = client.get(url)
+    sparse = client.get(url, params={"fields": "player_id"})
+    assert full.status_code == sparse.status_code == 200
+    assert full.headers["etag"] != sparse.headers["etag"]
+    assert sparse.json()["leaderboard"] == [{"player_id": 1}]
+
+    again = client.get(
+        url,
+        params={"fields": "player_id"},
+        headers={"If-None-Match": sparse.headers["etag"]},
+    )
+    assert again.status_code == 304
+    other = client.get(url, headers={"If-None-Match": sparse.headers["etag"]})
+    assert other.status_code == 200